@@ -0,0 +1,138 @@
+import time
+import numpy as np
+import maya.api.OpenMaya as om
+from maya.api.MDGContextGuard import MDGContextGuard
+
+CHANNELS = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ", "scaleX", "scaleY", "scaleZ")
+TRANSLATE_CHANNELS = slice(0, 3)
+ROTATE_CHANNELS = slice(3, 6)
+SCALE_CHANNELS = slice(6, 9)
+CHANNEL_GROUPS = {"translate" : TRANSLATE_CHANNELS, "rotate" : ROTATE_CHANNELS, "scale" : SCALE_CHANNELS}
+
+# Evaluates joint local channels at any frame through a DG context, the timeline never moves and the viewport never redraws
+class AnimSampler:
+    def __init__(self, joints):
+        self.joints = list(joints)
+        self.plugs = []
+        self.samplesPerSecond = 0.0
+
+        selection = om.MSelectionList()
+        for jnt in self.joints:
+            selection.add(jnt)
+
+        for i in range(len(self.joints)):
+            nodeFn = om.MFnDependencyNode(selection.getDependNode(i))
+            self.plugs.append([nodeFn.findPlug(channel, False) for channel in CHANNELS])
+
+    @classmethod
+    def FromRoot(cls, rootJnt):
+        selection = om.MSelectionList()
+        selection.add(rootJnt)
+        dagIt = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kJoint)
+        dagIt.reset(selection.getDependNode(0), om.MItDag.kDepthFirst, om.MFn.kJoint)
+
+        joints = []
+        while not dagIt.isDone():
+            joints.append(dagIt.getPath().partialPathName())
+            dagIt.next()
+
+        return cls(joints)
+
+    def GetFrames(self, frameMin, frameMax):
+        return np.arange(int(frameMin), int(frameMax) + 1)
+
+    def AllocateSamples(self, frameMin, frameMax):
+        return np.empty((len(self.GetFrames(frameMin, frameMax)), len(self.joints), len(CHANNELS)), dtype=np.float64)
+
+    def Sample(self, frameMin, frameMax, samples = None)->np.ndarray:
+        # samples is (frames, joints, channels), rotations in degrees like the channel box
+        frames = self.GetFrames(frameMin, frameMax)
+        if samples is None:
+            samples = self.AllocateSamples(frameMin, frameMax)
+
+        timeUnit = om.MTime.uiUnit()
+        startTime = time.perf_counter()
+        for f, frame in enumerate(frames):
+            with MDGContextGuard(om.MDGContext(om.MTime(float(frame), timeUnit))):
+                for j, jntPlugs in enumerate(self.plugs):
+                    samples[f, j] = [plug.asDouble() for plug in jntPlugs]
+
+        np.degrees(samples[:, :, ROTATE_CHANNELS], out=samples[:, :, ROTATE_CHANNELS])
+
+        elapsed = time.perf_counter() - startTime
+        self.samplesPerSecond = samples.size / elapsed if elapsed > 0 else 0.0
+        return samples
+
+def GetChannelTolerances(tolerances):
+    # {"translate" : units, "rotate" : degrees, "scale" : factor} to one tolerance per channel in CHANNELS order
+    channelTolerances = np.zeros(len(CHANNELS))
+    for group, channels in CHANNEL_GROUPS.items():
+        channelTolerances[channels] = tolerances[group]
+    return channelTolerances
+
+def ReduceKeys(samples:np.ndarray, channelTolerances:np.ndarray)->np.ndarray:
+    # douglas peucker on every joint channel at once: each pass takes every open span of every curve, finds the sample
+    # furthest off the straight line between its end keys and keeps it if it is past the channel's tolerance.
+    # samples is (frames, joints, channels), the mask that comes back is True on the keys to keep
+    frameCount = samples.shape[0]
+    curves = samples.reshape(frameCount, -1)
+    tolerances = np.broadcast_to(channelTolerances, samples.shape[1:]).ravel()
+    keep = np.zeros(curves.shape, dtype=bool)
+    keep[[0, -1]] = True
+
+    curveIds = np.arange(curves.shape[1])
+    starts = np.zeros(curves.shape[1], dtype=np.int64)
+    ends = np.full(curves.shape[1], frameCount - 1, dtype=np.int64)
+    while curveIds.size:
+        interiorCounts = ends - starts - 1
+        isOpen = interiorCounts > 0
+        curveIds, starts, ends, interiorCounts = curveIds[isOpen], starts[isOpen], ends[isOpen], interiorCounts[isOpen]
+        if not curveIds.size:
+            break
+
+        # every interior sample of every open span laid out flat, span by span
+        spanOfSample = np.repeat(np.arange(curveIds.size), interiorCounts)
+        spanOffsets = np.r_[0, np.cumsum(interiorCounts)[:-1]]
+        frames = starts[spanOfSample] + 1 + np.arange(spanOfSample.size) - spanOffsets[spanOfSample]
+        sampleCurves = curveIds[spanOfSample]
+
+        startValues = curves[starts, curveIds][spanOfSample]
+        endValues = curves[ends, curveIds][spanOfSample]
+        t = (frames - starts[spanOfSample]) / (ends - starts)[spanOfSample]
+        errors = np.abs(curves[frames, sampleCurves] - (startValues + t * (endValues - startValues)))
+
+        # the worst sample of each span: sort by span then error, the last entry of each span is its worst
+        order = np.lexsort((errors, spanOfSample))
+        worst = order[np.cumsum(interiorCounts) - 1]
+        split = errors[worst] > tolerances[curveIds]
+
+        keep[frames[worst[split]], curveIds[split]] = True
+        splitFrames = frames[worst[split]]
+        curveIds = np.r_[curveIds[split], curveIds[split]]
+        starts, ends = np.r_[starts[split], splitFrames], np.r_[splitFrames, ends[split]]
+
+    return keep.reshape(samples.shape)
+
+def ReconstructFromKeys(samples:np.ndarray, keep:np.ndarray)->np.ndarray:
+    # linear interpolation between the kept keys, what the curves play back as once the rest are removed
+    frameCount = samples.shape[0]
+    curves = samples.reshape(frameCount, -1)
+    keepFlat = keep.reshape(frameCount, -1)
+    frames = np.arange(frameCount)
+
+    # for every frame and curve, the last kept key at or before it and the next kept key at or after it
+    keyFrames = np.where(keepFlat, frames[:, None], -1)
+    previous = np.maximum.accumulate(keyFrames, axis=0)
+    nextKeys = np.where(keepFlat, frames[:, None], frameCount)
+    following = np.minimum.accumulate(nextKeys[::-1], axis=0)[::-1]
+
+    columns = np.arange(curves.shape[1])
+    span = np.maximum(following - previous, 1)
+    t = (frames[:, None] - previous) / span
+    reconstructed = curves[previous, columns] + t * (curves[following, columns] - curves[previous, columns])
+    return reconstructed.reshape(samples.shape)
+
+def GetReductionErrors(samples:np.ndarray, keep:np.ndarray):
+    # the largest error of each channel group over the whole clip
+    errors = np.abs(ReconstructFromKeys(samples, keep) - samples)
+    return {group : float(errors[:, :, channels].max()) if errors.size else 0.0 for group, channels in CHANNEL_GROUPS.items()}
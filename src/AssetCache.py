@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import maya.cmds as mc
+
+from MeshPartition import MeshTopology
+from SkinWeights import MayaSkin, GetDominantInfluences, GetArrayHash
+
+# Mesh topology and skin weights saved as .npy files, one folder per content hash, read back memory mapped.
+# A saved and unmodified scene is looked up by its file stamp, the mesh and skin names, the frame and the skin's state,
+# so a repeat run on the same asset, in maya or in a batch worker, never asks maya for the vertices or weights again.
+#   MAYATOOLS_CACHE_DIR     where the entries live, ~/.cache/MayaTools by default
+#   MAYATOOLS_CACHE_MAX_MB  least recently used entries are evicted past this, 2048 by default
+
+CACHE_DIR = os.environ.get("MAYATOOLS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "MayaTools"))
+CACHE_MAX_BYTES = int(os.environ.get("MAYATOOLS_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+# the dtypes MeshTopology and the weight code use, so loading them is a memory map and not a copy
+ARRAY_DTYPES = {
+    "points" : np.float64,
+    "faceVertCounts" : np.int64,
+    "faceVertIndices" : np.int64,
+    "uValues" : np.float64,
+    "vValues" : np.float64,
+    "faceVertUVs" : np.int64,
+    "weights" : np.float64,
+    "dominant" : np.int64,
+}
+
+# Data oriented class, everything the tools read off a skinned mesh
+class MeshSkinData:
+    def __init__(self, topology:MeshTopology, influences, weights, dominant):
+        self.topology = topology
+        self.influences = influences
+        self.weights = weights
+        self.dominant = dominant
+        self.contentHash = None
+        self.fromCache = False
+
+    @classmethod
+    def FromMaya(cls, mesh, skin):
+        skinSource = MayaSkin(skin, mesh)
+        weights = skinSource.GetWeights()
+        return cls(MeshTopology.FromMesh(mesh), skinSource.GetInfluences(), weights, GetDominantInfluences(weights))
+
+    def GetArrays(self):
+        arrays = {
+            "points" : self.topology.points,
+            "faceVertCounts" : self.topology.faceVertCounts,
+            "faceVertIndices" : self.topology.faceVertIndices,
+            "uValues" : self.topology.uValues,
+            "vValues" : self.topology.vValues,
+            "faceVertUVs" : self.topology.faceVertUVs,
+            "weights" : self.weights,
+            "dominant" : self.dominant,
+        }
+        return {name : np.asarray(array, dtype=ARRAY_DTYPES[name]) for name, array in arrays.items() if array is not None}
+
+    def GetContentHash(self):
+        if self.contentHash is None:
+            digest = hashlib.sha1(json.dumps(self.influences).encode())
+            for name, array in sorted(self.GetArrays().items()):
+                if name != "dominant": # follows from the weights
+                    digest.update(name.encode())
+                    digest.update(GetArrayHash(array).encode())
+            self.contentHash = digest.hexdigest()
+        return self.contentHash
+
+class AssetCache:
+    def __init__(self, cacheDir = CACHE_DIR, maxBytes = CACHE_MAX_BYTES):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.entriesDir = os.path.join(cacheDir, "entries")
+        self.sourcesDir = os.path.join(cacheDir, "sources")
+
+    def GetSourceKey(self, mesh, skin):
+        # only a scene that matches its file on disk can vouch for the content without reading it
+        sceneName = mc.file(q=True, sceneName=True)
+        if not sceneName or mc.file(q=True, modified=True) or not os.path.exists(sceneName):
+            return None
+
+        # the points are read deformed in world space and a frame change does not modify the scene,
+        # so the frame and the skin's state are part of the source too
+        deformerState = [mc.currentTime(q=True), mc.getAttr(skin + ".envelope"), mc.getAttr(skin + ".nodeState")]
+        stat = os.stat(sceneName)
+        source = json.dumps([os.path.normcase(os.path.abspath(sceneName)), stat.st_size, stat.st_mtime_ns, mesh, skin] + deformerState)
+        return hashlib.sha1(source.encode()).hexdigest()
+
+    def GetEntryDir(self, contentHash):
+        return os.path.join(self.entriesDir, contentHash)
+
+    def Load(self, contentHash):
+        entryDir = self.GetEntryDir(contentHash)
+        metaPath = os.path.join(entryDir, "meta.json")
+        if not os.path.exists(metaPath):
+            return None
+
+        with open(metaPath) as metaFile:
+            meta = json.load(metaFile)
+        arrays = {name : np.load(os.path.join(entryDir, name + ".npy"), mmap_mode="r") for name in meta["arrays"]}
+
+        topology = MeshTopology(arrays["points"], arrays["faceVertCounts"], arrays["faceVertIndices"], arrays.get("uValues"), arrays.get("vValues"), arrays.get("faceVertUVs"))
+        data = MeshSkinData(topology, meta["influences"], arrays["weights"], arrays["dominant"])
+        data.contentHash = contentHash
+        data.fromCache = True
+        os.utime(entryDir) # the folder time is the last use for eviction
+        return data
+
+    def Store(self, data:MeshSkinData):
+        contentHash = data.GetContentHash()
+        entryDir = self.GetEntryDir(contentHash)
+        if os.path.exists(entryDir):
+            os.utime(entryDir)
+            return contentHash
+
+        # written next to the entries and renamed in, so a batch worker never sees half an entry
+        os.makedirs(self.entriesDir, exist_ok=True)
+        tempDir = tempfile.mkdtemp(dir=self.entriesDir, prefix=".tmp")
+        arrays = data.GetArrays()
+        for name, array in arrays.items():
+            np.save(os.path.join(tempDir, name + ".npy"), array)
+        with open(os.path.join(tempDir, "meta.json"), "w") as metaFile:
+            json.dump({"influences" : data.influences, "arrays" : sorted(arrays)}, metaFile)
+
+        try:
+            os.rename(tempDir, entryDir)
+        except OSError:
+            shutil.rmtree(tempDir, ignore_errors=True) # another worker stored the same content first
+
+        self.Evict(entryDir)
+        return contentHash
+
+    def LinkSource(self, sourceKey, contentHash):
+        os.makedirs(self.sourcesDir, exist_ok=True)
+        linkPath = os.path.join(self.sourcesDir, sourceKey)
+        with open(linkPath + ".tmp", "w") as linkFile:
+            linkFile.write(contentHash)
+        os.replace(linkPath + ".tmp", linkPath)
+
+    def LoadSource(self, sourceKey):
+        linkPath = os.path.join(self.sourcesDir, sourceKey)
+        if not os.path.exists(linkPath):
+            return None
+        with open(linkPath) as linkFile:
+            return self.Load(linkFile.read().strip())
+
+    def GetEntries(self):
+        if not os.path.isdir(self.entriesDir):
+            return []
+
+        entries = []
+        for name in os.listdir(self.entriesDir):
+            entryDir = os.path.join(self.entriesDir, name)
+            if name.startswith(".tmp") or not os.path.isdir(entryDir):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entryDir))
+            entries.append((os.stat(entryDir).st_mtime, size, entryDir))
+        return entries
+
+    def Evict(self, keepDir = None):
+        # least recently used first, never the entry just stored so its source link has something to point at
+        entries = sorted(self.GetEntries())
+        totalBytes = sum(size for _, size, _ in entries)
+        entries = [entry for entry in entries if entry[2] != keepDir]
+        evicted = 0
+        while entries and totalBytes > self.maxBytes:
+            _, size, entryDir = entries.pop(0)
+            shutil.rmtree(entryDir, ignore_errors=True)
+            totalBytes -= size
+            evicted += 1
+
+        if evicted:
+            self.PruneSourceLinks()
+        return evicted
+
+    def PruneSourceLinks(self):
+        if not os.path.isdir(self.sourcesDir):
+            return
+        for name in os.listdir(self.sourcesDir):
+            linkPath = os.path.join(self.sourcesDir, name)
+            try:
+                with open(linkPath) as linkFile:
+                    contentHash = linkFile.read().strip()
+                if not os.path.isdir(self.GetEntryDir(contentHash)):
+                    os.remove(linkPath)
+            except OSError:
+                pass # another worker replaced or removed it
+
+    def LoadMeshSkin(self, mesh, skin):
+        sourceKey = self.GetSourceKey(mesh, skin)
+        if sourceKey:
+            data = self.LoadSource(sourceKey)
+            if data is not None:
+                return data
+
+        data = MeshSkinData.FromMaya(mesh, skin)
+        if sourceKey:
+            self.LinkSource(sourceKey, self.Store(data))
+        return data
+
+assetCache : AssetCache = None
+
+def GetAssetCache():
+    global assetCache
+    if assetCache is None:
+        assetCache = AssetCache()
+    return assetCache
@@ -0,0 +1,243 @@
+import argparse
+import fnmatch
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from Workers import SRC_DIR, GetWorkerEnv, PrintProgressEvent
+
+# Runs the rigging and export tools without their windows, one scene per mayapy process:
+#   mayapy Batch.py proxy D:/characters --workers 8 --manifest D:/characters/proxy_manifest.json
+#   mayapy Batch.py limbs D:/characters --targets Hips --outputDir D:/characters_rigged
+#   mayapy Batch.py export D:/characters --targets root --clip walk:1:30 --clip run:31:50 --outputDir D:/export
+#   mayapy Batch.py proxy D:/characters --traceDir D:/traces
+
+SCENE_PATTERNS = ("*.ma", "*.mb")
+
+def FindSkinnedMeshes():
+    import maya.cmds as mc
+    meshes = []
+    for skin in mc.ls(type="skinCluster") or []:
+        for shape in mc.skinCluster(skin, q=True, geometry=True) or []:
+            transform = mc.listRelatives(shape, p=True)[0]
+            if transform not in meshes:
+                meshes.append(transform)
+    return meshes
+
+def FindRootJoints():
+    import maya.cmds as mc
+    return [jnt for jnt in mc.ls(type="joint") or [] if not mc.listRelatives(jnt, p=True, type="joint")]
+
+def RunProxyJob(args):
+    import maya.cmds as mc
+    from ProxyRigger import ProxyRigger
+
+    meshes = args.targets or FindSkinnedMeshes()
+    for mesh in meshes:
+        mc.select(mesh, r=True)
+        ProxyRigger().CreateProxyRigFromSelectedMesh()
+    return {"meshes" : meshes}
+
+def RunLimbsJob(args):
+    import maya.cmds as mc
+    from LimbRiggingTool import LimbRigger
+
+    rigger = LimbRigger()
+    rigger.controllerSize = args.controllerSize
+    limbs = []
+    for root in args.targets or FindRootJoints():
+        mc.select(root, r=True)
+        limbs.extend(rigger.RigAllLimbs(args.includeFingers))
+    return {"limbs" : [list(limb) for limb in limbs]}
+
+def RunExportJob(args):
+    import maya.cmds as mc
+    from MayaToUE import MayaToUE, AnimClip
+    from MayaUtils import GetNodeHandle, GetNodeHandles
+
+    mayaToUE = MayaToUE()
+    if args.exportSettings:
+        # everything the export window was set to, written by its background export
+        with open(args.exportSettings) as settingsFile:
+            mayaToUE.ApplySettings(json.load(settingsFile))
+    else:
+        roots = args.targets or FindRootJoints()
+        if not roots:
+            raise Exception("No root joint found to export")
+
+        mayaToUE.rootJnt = GetNodeHandle(roots[0])
+        mayaToUE.meshes = GetNodeHandles(FindSkinnedMeshes())
+        mayaToUE.saveDir = os.path.join(args.outputDir or os.path.dirname(args.scene), "export")
+        mayaToUE.fileName = os.path.splitext(os.path.basename(args.scene))[0]
+        for clipArg in args.clip:
+            subfix, frameMin, frameMax = clipArg.split(":")
+            mayaToUE.animationClips.append(AnimClip(subfix, int(frameMin), int(frameMax)))
+
+        mayaToUE.reduceKeys = not args.noKeyReduction
+        for toleranceArg in args.keyTolerance:
+            group, tolerance = toleranceArg.split(":")
+            mayaToUE.keyTolerances[group] = float(tolerance)
+
+    if args.progress:
+        mayaToUE.onProgress = PrintProgressEvent
+
+    # the export bakes onto the rig and undoes it after, the worker's scene is a copy but undo still has to be on
+    mc.undoInfo(state=True)
+
+    return {"files" : mayaToUE.ExportAll(), "keys" : mayaToUE.clipReports}
+
+JOBS = {
+    "proxy" : RunProxyJob,
+    "limbs" : RunLimbsJob,
+    "export" : RunExportJob,
+}
+
+def RunWorker(args):
+    # inside the mayapy process: open the scene, run the job, save if asked and leave the result for the pool
+    result = {"scene" : args.scene, "job" : args.job, "status" : "failed"}
+    startTime = time.perf_counter()
+    try:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        import maya.cmds as mc
+
+        mc.file(args.scene, o=True, f=True)
+        openTime = time.perf_counter()
+        result["openSeconds"] = openTime - startTime
+
+        if args.traceDir:
+            from MayaUtils import StartInstrumentation
+            StartInstrumentation()
+
+        try:
+            result["output"] = JOBS[args.job](args)
+        finally:
+            if args.traceDir:
+                from MayaUtils import StopInstrumentation
+                os.makedirs(args.traceDir, exist_ok=True)
+                result["trace"] = os.path.join(args.traceDir, os.path.splitext(os.path.basename(args.scene))[0] + "_trace.json")
+                StopInstrumentation(result["trace"])
+        result["jobSeconds"] = time.perf_counter() - openTime
+
+        if args.outputDir and args.job != "export":
+            os.makedirs(args.outputDir, exist_ok=True)
+            savePath = os.path.join(args.outputDir, os.path.basename(args.scene))
+            mc.file(rename=savePath)
+            mc.file(save=True, f=True, type="mayaBinary" if savePath.endswith(".mb") else "mayaAscii")
+            result["savedAs"] = savePath
+
+        result["status"] = "ok"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = time.perf_counter() - startTime
+    with open(args.result, "w") as resultFile:
+        json.dump(result, resultFile)
+
+    if "maya.standalone" in sys.modules:
+        sys.modules["maya.standalone"].uninitialize()
+
+def FindScenes(sceneDir):
+    scenes = []
+    for fileName in sorted(os.listdir(sceneDir)):
+        if any(fnmatch.fnmatch(fileName, pattern) for pattern in SCENE_PATTERNS):
+            scenes.append(os.path.join(sceneDir, fileName))
+    return scenes
+
+def GetWorkerCommand(args, scene, resultPath):
+    command = [args.mayapy, os.path.abspath(__file__), args.job, scene, "--worker", "--result", resultPath, "--controllerSize", str(args.controllerSize)]
+    if args.outputDir:
+        command += ["--outputDir", args.outputDir]
+    if args.traceDir:
+        command += ["--traceDir", args.traceDir]
+    if args.includeFingers:
+        command.append("--includeFingers")
+    for target in args.targets:
+        command += ["--targets", target]
+    for clip in args.clip:
+        command += ["--clip", clip]
+    for tolerance in args.keyTolerance:
+        command += ["--keyTolerance", tolerance]
+    if args.exportSettings:
+        command += ["--exportSettings", args.exportSettings]
+    if args.noKeyReduction:
+        command.append("--noKeyReduction")
+    return command
+
+def RunSceneInWorker(args, scene):
+    resultFile, resultPath = tempfile.mkstemp(suffix=".json")
+    os.close(resultFile)
+
+    startTime = time.perf_counter()
+    process = subprocess.run(GetWorkerCommand(args, scene, resultPath), env=GetWorkerEnv(), capture_output=True, text=True)
+
+    try:
+        with open(resultPath) as resultFile:
+            result = json.load(resultFile)
+    except (OSError, ValueError):
+        # the worker died before it could write anything, keep what it printed
+        result = {"scene" : scene, "job" : args.job, "status" : "crashed", "error" : process.stderr[-2000:]}
+    finally:
+        os.remove(resultPath)
+
+    result["returnCode"] = process.returncode
+    result["processSeconds"] = time.perf_counter() - startTime
+    print(f"[{result['status']}] {scene} in {result['processSeconds']:.1f}s")
+    return result
+
+def RunPool(args):
+    scenes = FindScenes(args.scene)
+    if not scenes:
+        raise Exception(f"No scenes found in {args.scene}")
+
+    startTime = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda scene: RunSceneInWorker(args, scene), scenes))
+
+    manifest = {
+        "job" : args.job,
+        "sceneDir" : args.scene,
+        "workers" : args.workers,
+        "seconds" : time.perf_counter() - startTime,
+        "failed" : sum(1 for result in results if result["status"] != "ok"),
+        "scenes" : results,
+    }
+    manifestPath = args.manifest or os.path.join(args.scene, f"{args.job}_manifest.json")
+    with open(manifestPath, "w") as manifestFile:
+        json.dump(manifest, manifestFile, indent=4)
+
+    print(f"{len(scenes) - manifest['failed']}/{len(scenes)} scenes done in {manifest['seconds']:.1f}s, manifest at {manifestPath}")
+    return manifest
+
+def ParseArgs(argv = None):
+    parser = argparse.ArgumentParser(description="Run the rigging and export tools on a folder of scenes with a pool of mayapy processes")
+    parser.add_argument("job", choices=sorted(JOBS))
+    parser.add_argument("scene", help="folder of scenes, or a single scene with --worker")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--mayapy", default=sys.executable)
+    parser.add_argument("--manifest")
+    parser.add_argument("--outputDir")
+    parser.add_argument("--targets", action="append", default=[], help="meshes for proxy, root joints for limbs and export")
+    parser.add_argument("--clip", action="append", default=[], help="subfix:min:max for export")
+    parser.add_argument("--keyTolerance", action="append", default=[], help="translate:value, rotate:value or scale:value for export key reduction")
+    parser.add_argument("--noKeyReduction", action="store_true", help="export every baked key")
+    parser.add_argument("--controllerSize", type=float, default=5)
+    parser.add_argument("--includeFingers", action="store_true")
+    parser.add_argument("--traceDir", help="write a chrome trace of the tool operations and maya.cmds calls for every scene")
+    parser.add_argument("--exportSettings", help="json of MayaToUE settings for export, in place of --targets and --clip")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--progress", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = ParseArgs()
+    if args.worker:
+        sys.path.insert(0, SRC_DIR)
+        RunWorker(args)
+    else:
+        manifest = RunPool(args)
+        sys.exit(1 if manifest["failed"] else 0)
@@ -0,0 +1,174 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+# Measures the tools against the recording stand in for maya, no maya or license needed:
+#   python src/Benchmark.py
+#   python src/Benchmark.py --operation CreateProxyRig --json bench.json
+# Fails when an operation makes more maya.cmds calls than its budget or scales worse than its allowed curve.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(SRC_DIR, "..", "vendor", "mayaSDK"))
+
+import MayaUtils
+import MeshPartition
+import ControllerShapes
+import AssetCache
+import LimbRiggingTool
+import ProxyRigger
+import MayaToUE
+from RecordingMaya import FakeScene, RecordingMaya
+
+TOOL_MODULES = [MayaUtils, MeshPartition, AssetCache, ControllerShapes, LimbRiggingTool, ProxyRigger, MayaToUE]
+
+def BuildLimbScene(size):
+    scene = FakeScene()
+    scene.selection = [scene.AddSkeleton(size)]
+    return scene
+
+def RunRigAllLimbs(scene):
+    LimbRiggingTool.LimbRigger().RigAllLimbs()
+
+def BuildProxyScene(size):
+    scene = FakeScene()
+    scene.selection = [scene.AddSkinnedMesh("body", size, 20, size * 20)]
+    return scene
+
+def RunCreateProxyRig(scene):
+    ProxyRigger.ProxyRigger().CreateProxyRigFromSelectedMesh()
+
+def RunCreateRigidProxyRig(scene):
+    rigger = ProxyRigger.ProxyRigger()
+    rigger.useRigidSegments = True
+    rigger.CreateProxyRigFromSelectedMesh()
+
+def PrepareUpdateProxyRig(scene):
+    ProxyRigger.ProxyRigger().CreateProxyRigFromSelectedMesh()
+
+    # repaint a few vertices from the first joint to the second, the same small edit at every size
+    skin = scene.skins["body_skinCluster"]
+    ownedByFirst = np.flatnonzero(np.argmax(skin.weights, axis=1) == 0)[:10]
+    skin.weights[ownedByFirst] = np.eye(skin.weights.shape[1])[1]
+
+def RunUpdateProxyRig(scene):
+    ProxyRigger.ProxyRigger().UpdateProxyRigFromSelectedMesh()
+
+def BuildControllerScene(size):
+    scene = FakeScene()
+    scene.AddControllers(size)
+    return scene
+
+def RunRecolorBySide(scene):
+    ControllerShapes.RecolorControllersBySide()
+
+def BuildMeshScene(size):
+    scene = FakeScene()
+    scene.selection = scene.AddMeshes(size)
+    return scene
+
+def RunAddMeshs(scene):
+    MayaToUE.MayaToUE().AddMeshs()
+
+# sizes are limbs, joints, controllers and meshes. cmdsPerUnit is the maya.cmds call budget per unit of size at the largest size,
+# prepare runs untimed before the operation, callExponent and timeExponent cap the slope of calls and time against size on a log-log fit (1 is linear)
+OPERATIONS = {
+    "RigAllLimbs" : {"build" : BuildLimbScene, "run" : RunRigAllLimbs, "sizes" : (1, 10, 40), "cmdsPerUnit" : 75, "callExponent" : 1.1, "timeExponent" : 1.5},
+    "CreateProxyRig" : {"build" : BuildProxyScene, "run" : RunCreateProxyRig, "sizes" : (5, 20, 50), "cmdsPerUnit" : 15, "callExponent" : 1.1, "timeExponent" : 1.5},
+    "CreateRigidProxyRig" : {"build" : BuildProxyScene, "run" : RunCreateRigidProxyRig, "sizes" : (5, 20, 50), "cmdsPerUnit" : 12, "callExponent" : 1.1, "timeExponent" : 1.5},
+    "UpdateProxyRig" : {"build" : BuildProxyScene, "prepare" : PrepareUpdateProxyRig, "run" : RunUpdateProxyRig, "sizes" : (5, 20, 50), "cmdsPerUnit" : 2, "callExponent" : 0.5, "timeExponent" : 1.5},
+    "RecolorBySide" : {"build" : BuildControllerScene, "run" : RunRecolorBySide, "sizes" : (30, 300, 2000), "cmdsPerUnit" : 0.05, "callExponent" : 1.1, "timeExponent" : 1.5},
+    "AddMeshs" : {"build" : BuildMeshScene, "run" : RunAddMeshs, "sizes" : (10, 100, 500), "cmdsPerUnit" : 3, "callExponent" : 1.1, "timeExponent" : 1.5},
+}
+
+def IsCmdsCall(name):
+    return not name.startswith(("om.", "mel."))
+
+def MeasureOperation(operation, size):
+    scene = operation["build"](size)
+    with RecordingMaya(scene, TOOL_MODULES) as recording:
+        if "prepare" in operation:
+            # setup the operation needs, like an existing rig to update, is not part of the measurement
+            with contextlib.redirect_stdout(io.StringIO()):
+                operation["prepare"](scene)
+            recording.recorder.Reset()
+
+        tracemalloc.start()
+        startTime = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            operation["run"](scene)
+        seconds = time.perf_counter() - startTime
+        _, peakBytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    counts = recording.recorder.counts
+    return {
+        "size" : size,
+        "seconds" : seconds,
+        "peakBytes" : peakBytes,
+        "cmdsCalls" : sum(count for name, count in counts.items() if IsCmdsCall(name)),
+        "apiCalls" : sum(count for name, count in counts.items() if not IsCmdsCall(name)),
+        "counts" : dict(sorted(counts.items(), key=lambda item: -item[1])),
+        "unknownFlags" : {name : sorted(flags) for name, flags in recording.recorder.unknownFlags.items()},
+    }
+
+def GetScalingExponent(sizes, values):
+    values = np.maximum(np.asarray(values, dtype=np.float64), 1e-9)
+    return float(np.polyfit(np.log(sizes), np.log(values), 1)[0])
+
+def CheckBudgets(name, operation, runs):
+    failures = []
+    largest = runs[-1]
+    cmdsPerUnit = largest["cmdsCalls"] / largest["size"]
+    if cmdsPerUnit > operation["cmdsPerUnit"]:
+        failures.append(f"{name}: {cmdsPerUnit:.1f} maya.cmds calls per unit at size {largest['size']}, budget is {operation['cmdsPerUnit']}")
+
+    sizes = [run["size"] for run in runs]
+    callExponent = GetScalingExponent(sizes, [run["cmdsCalls"] + run["apiCalls"] for run in runs])
+    if callExponent > operation["callExponent"]:
+        failures.append(f"{name}: calls grow with size^{callExponent:.2f}, allowed size^{operation['callExponent']}")
+
+    # small runs are mostly timer noise, only hold the time curve once the work is measurable
+    if largest["seconds"] > 0.05:
+        timeExponent = GetScalingExponent(sizes, [run["seconds"] for run in runs])
+        if timeExponent > operation["timeExponent"]:
+            failures.append(f"{name}: time grows with size^{timeExponent:.2f}, allowed size^{operation['timeExponent']}")
+
+    return failures
+
+def RunBenchmarks(operationNames):
+    results = {}
+    failures = []
+    for name in operationNames:
+        operation = OPERATIONS[name]
+        MeasureOperation(operation, operation["sizes"][0]) # warm up imports and caches so they don't land on the first size
+        runs = [MeasureOperation(operation, size) for size in operation["sizes"]]
+        results[name] = runs
+        failures.extend(CheckBudgets(name, operation, runs))
+
+        for run in runs:
+            print(f"{name:<20} size {run['size']:>4}  cmds {run['cmdsCalls']:>6}  api {run['apiCalls']:>5}  {run['seconds'] * 1000:>9.1f} ms  peak {run['peakBytes'] / 1e6:>7.2f} MB")
+        for command, flags in runs[-1]["unknownFlags"].items():
+            print(f"  warning: {command} called with flags the stubs don't list: {', '.join(flags)}")
+
+    return results, failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="maya.cmds call budget benchmark for the tools, runs without maya")
+    parser.add_argument("--operation", action="append", choices=sorted(OPERATIONS))
+    parser.add_argument("--json", help="write every run to this file")
+    args = parser.parse_args()
+
+    results, failures = RunBenchmarks(args.operation or list(OPERATIONS))
+    if args.json:
+        with open(args.json, "w") as jsonFile:
+            json.dump({"results" : results, "failures" : failures}, jsonFile, indent=4)
+
+    for failure in failures:
+        print("FAILED " + failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,230 @@
+import json
+import os
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.cmds as mc
+
+from MayaUtils import DoModifier
+from Skeleton import GetSideOfName
+
+# Controller shapes kept as cv and knot arrays, built with one curve call each, already scaled and colored
+
+USER_SHAPES_PATH = os.environ.get("MAYATOOLS_CONTROLLER_SHAPES", os.path.join(os.path.expanduser("~"), "maya", "MayaTools", "controllerShapes.json"))
+
+# Data oriented class, one nurbs curve of a controller shape
+class CurvePiece:
+    def __init__(self, degree, points, knots, periodic = False):
+        self.degree = int(degree)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.knots = [float(knot) for knot in knots]
+        self.periodic = bool(periodic)
+
+    def GetScaledPoints(self, size):
+        return [tuple(point) for point in (self.points * size).tolist()]
+
+    def ToDict(self):
+        return {"degree" : self.degree, "points" : self.points.tolist(), "knots" : self.knots, "periodic" : self.periodic}
+
+    @classmethod
+    def FromDict(cls, data):
+        return cls(data["degree"], data["points"], data["knots"], data["periodic"])
+
+# Data oriented class, a controller shape can have several curves under the one transform
+class ControllerShape:
+    def __init__(self, name, pieces):
+        self.name = name
+        self.pieces = pieces
+
+    def ToDict(self):
+        return {"name" : self.name, "pieces" : [piece.ToDict() for piece in self.pieces]}
+
+    @classmethod
+    def FromDict(cls, data):
+        return cls(data["name"], [CurvePiece.FromDict(piece) for piece in data["pieces"]])
+
+def GetLinearKnots(pointCount):
+    return list(range(pointCount))
+
+def MakeCircle():
+    # the same cvs makeNurbCircle gives for radius 1 with the normal on x, 8 sections wrapped for a periodic curve
+    a, b = 0.783612, 1.108194
+    points = [(0, a, -a), (0, 0, -b), (0, -a, -a), (0, -b, 0), (0, -a, a), (0, 0, b), (0, a, a), (0, b, 0)]
+    points += points[:3]
+    return CurvePiece(3, points, range(-2, 11), True)
+
+def MakeBox():
+    points = [(0.5, 0.5, 0.5), (-0.5, 0.5, 0.5), (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5),
+              (-0.5, -0.5, 0.5), (-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (0.5, -0.5, -0.5), (-0.5, -0.5, -0.5)]
+    return CurvePiece(1, points, GetLinearKnots(len(points)))
+
+def MakePlus():
+    points = [(-3, -1, 0), (-3, 1, 0), (-1, 1, 0), (-1, 3, 0), (1, 3, 0), (1, 1, 0), (3, 1, 0), (3, -1, 0), (1, -1, 0), (1, -3, 0), (-1, -3, 0), (-1, -1, 0), (-3, -1, 0)]
+    return CurvePiece(1, points, GetLinearKnots(len(points)))
+
+BUILTIN_SHAPES = {
+    "circle" : ControllerShape("circle", [MakeCircle()]),
+    "box" : ControllerShape("box", [MakeBox()]),
+    "plus" : ControllerShape("plus", [MakePlus()]),
+}
+
+SIDE_PALETTE = {
+    "left" : (0.0, 0.25, 1.0),
+    "right" : (1.0, 0.0, 0.0),
+    "center" : (1.0, 0.85, 0.0),
+}
+
+def SetOverrideColor(shapes, colorRGB):
+    ApplyOverrideColors({shape : colorRGB for shape in shapes})
+
+def GetControllerShapes(objs = None, includeDescendants = True):
+    # every curve shape under the given controllers or rig groups in one query, the whole scene when objs is None
+    if objs is None:
+        return mc.ls(type="nurbsCurve", long=True) or []
+    if includeDescendants:
+        return mc.listRelatives(objs, ad=True, type="nurbsCurve", fullPath=True) or []
+    return mc.listRelatives(objs, s=True, type="nurbsCurve", fullPath=True) or []
+
+def GetTransformOfShape(shapePath):
+    return shapePath.rsplit("|", 1)[0].rsplit("|", 1)[-1]
+
+def ApplyOverrideColors(shapeColors):
+    # every shape resolved through one selection list and every override plug set by one MDGModifier,
+    # run as a single undoable command
+    if not shapeColors:
+        return 0
+
+    selection = om.MSelectionList()
+    for shape in shapeColors:
+        selection.add(shape)
+
+    modifier = om.MDGModifier()
+    for i, colorRGB in enumerate(shapeColors.values()):
+        shapeFn = om.MFnDependencyNode(selection.getDependNode(i))
+        modifier.newPlugValueBool(shapeFn.findPlug("overrideEnabled", False), True)
+        modifier.newPlugValueBool(shapeFn.findPlug("overrideRGBColors", False), True)
+        colorPlug = shapeFn.findPlug("overrideColorRGB", False)
+        for c, value in enumerate(colorRGB):
+            modifier.newPlugValueFloat(colorPlug.child(c), value)
+    DoModifier(modifier)
+    return len(shapeColors)
+
+def RecolorControllers(objs, colorRGB, includeDescendants = True):
+    return ApplyOverrideColors({shape : colorRGB for shape in GetControllerShapes(objs, includeDescendants)})
+
+def RecolorControllersBySide(objs = None, palette = SIDE_PALETTE):
+    # left, right and center picked from the controller name, like the limb finder picks them from the joints
+    shapeColors = {}
+    for shape in GetControllerShapes(objs):
+        side = GetSideOfName(GetTransformOfShape(shape))
+        if side in palette:
+            shapeColors[shape] = palette[side]
+    return ApplyOverrideColors(shapeColors)
+
+# Data oriented class, one controller to build
+class ControllerSpec:
+    def __init__(self, name, shapeName, size = 1.0, colorRGB = None):
+        self.name = name
+        self.shapeName = shapeName
+        self.size = size
+        self.colorRGB = colorRGB
+
+class ControllerShapeLibrary:
+    def __init__(self, userShapesPath = USER_SHAPES_PATH):
+        self.userShapesPath = userShapesPath
+        self.shapes = dict(BUILTIN_SHAPES)
+        self.userShapeNames = []
+        self.scaledPointsCache = {}
+        self.LoadUserShapes()
+
+    def LoadUserShapes(self):
+        if not os.path.exists(self.userShapesPath):
+            return
+
+        with open(self.userShapesPath) as shapesFile:
+            for data in json.load(shapesFile):
+                self.AddShape(ControllerShape.FromDict(data), False)
+
+    def SaveUserShapes(self):
+        os.makedirs(os.path.dirname(self.userShapesPath), exist_ok=True)
+        with open(self.userShapesPath, "w") as shapesFile:
+            json.dump([self.shapes[name].ToDict() for name in self.userShapeNames], shapesFile)
+
+    def AddShape(self, shape:ControllerShape, save = True):
+        if shape.name in BUILTIN_SHAPES:
+            raise Exception(f"{shape.name} is a built in controller shape, pick another name")
+
+        self.shapes[shape.name] = shape
+        if shape.name not in self.userShapeNames:
+            self.userShapeNames.append(shape.name)
+        self.scaledPointsCache = {key : points for key, points in self.scaledPointsCache.items() if key[0] != shape.name}
+        if save:
+            self.SaveUserShapes()
+
+    def CaptureShape(self, curve, shapeName):
+        # the curves under the transform in its object space, so the saved shape comes back the way it was drawn
+        selection = om.MSelectionList()
+        selection.add(curve)
+        transformFn = om.MFnDagNode(selection.getDagPath(0))
+
+        pieces = []
+        for i in range(transformFn.childCount()):
+            child = transformFn.child(i)
+            if not child.hasFn(om.MFn.kNurbsCurve):
+                continue
+
+            curveFn = om.MFnNurbsCurve(child)
+            points = [(p.x, p.y, p.z) for p in curveFn.cvPositions(om.MSpace.kObject)]
+            periodic = curveFn.form == om.MFnNurbsCurve.kPeriodic
+            pieces.append(CurvePiece(curveFn.degree, points, list(curveFn.knots()), periodic))
+
+        if not pieces:
+            raise Exception(f"{curve} has no nurbs curve to save as a controller shape")
+
+        shape = ControllerShape(shapeName, pieces)
+        self.AddShape(shape)
+        return shape
+
+    def GetShapeNames(self):
+        return list(self.shapes)
+
+    def GetScaledPoints(self, shapeName, size):
+        key = (shapeName, size)
+        if key not in self.scaledPointsCache:
+            self.scaledPointsCache[key] = [piece.GetScaledPoints(size) for piece in self.shapes[shapeName].pieces]
+        return self.scaledPointsCache[key]
+
+    def CreateController(self, name, shapeName, size = 1.0, colorRGB = None):
+        return self.CreateControllers([ControllerSpec(name, shapeName, size, colorRGB)])[0]
+
+    def CreateControllers(self, specs):
+        # the curves stay maya commands so they are on the undo queue with the rest of a BuildTransaction,
+        # the colors are set after all of them with one shape query per color and one batched override edit
+        ctrls = []
+        ctrlsOfColor = {}
+        for spec in specs:
+            pieces = self.shapes[spec.shapeName].pieces
+            piecePoints = self.GetScaledPoints(spec.shapeName, spec.size)
+            ctrl = mc.curve(n=spec.name, d=pieces[0].degree, p=piecePoints[0], k=pieces[0].knots, per=pieces[0].periodic)
+            for i, piece in enumerate(pieces[1:], 1):
+                # the rest of the curves move their shapes under the first transform
+                extraCurve = mc.curve(d=piece.degree, p=piecePoints[i], k=piece.knots, per=piece.periodic)
+                mc.parent(mc.listRelatives(extraCurve, s=True, fullPath=True), ctrl, s=True, r=True)
+                mc.delete(extraCurve)
+
+            if spec.colorRGB is not None:
+                ctrlsOfColor.setdefault(tuple(spec.colorRGB), []).append(ctrl)
+            ctrls.append(ctrl)
+
+        shapeColors = {}
+        for colorRGB, coloredCtrls in ctrlsOfColor.items():
+            shapeColors.update({shape : colorRGB for shape in mc.listRelatives(coloredCtrls, s=True, fullPath=True)})
+        ApplyOverrideColors(shapeColors)
+        return ctrls
+
+shapeLibrary : ControllerShapeLibrary = None
+
+def GetShapeLibrary():
+    global shapeLibrary
+    if shapeLibrary is None:
+        shapeLibrary = ControllerShapeLibrary()
+    return shapeLibrary
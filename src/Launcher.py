@@ -0,0 +1,85 @@
+import importlib
+import os
+import sys
+
+# Opens the tools without paying for them up front: nothing here imports maya widgets, numpy or the tools themselves,
+# a tool module is imported the first time it is launched and its window is reused after that.
+#   import Launcher; Launcher.Launch("ProxyRigger")
+#   import Launcher; Launcher.InstallShelf()                     once, puts a button per tool on a MayaTools shelf
+#   import Launcher; Launcher.Launch("ProxyRigger", reload=True) while working on the tool itself
+# Setting MAYATOOLS_DEV=1 makes every launch reload, like reload=True.
+
+# Data oriented class
+class ToolEntry:
+    def __init__(self, name, moduleName, label, annotation):
+        self.name = name
+        self.moduleName = moduleName
+        self.label = label
+        self.annotation = annotation
+
+TOOLS = {
+    "ProxyRigger" : ToolEntry("ProxyRigger", "ProxyRigger", "Proxy", "Build a proxy rig from the selected skinned mesh"),
+    "LimbRigger" : ToolEntry("LimbRigger", "LimbRiggingTool", "Limb", "Rig three jointed limbs with ik fk controls"),
+    "MayaToUE" : ToolEntry("MayaToUE", "MayaToUE", "UE", "Export the skeletal mesh and animation clips for unreal"),
+}
+
+# every module in dependency order, a module is reloaded after everything it imports so it picks up the reloaded versions
+RELOAD_ORDER = [
+    "MayaUtils", "SkinWeights", "MeshPartition", "Skeleton", "AnimSampling", "AssetCache", "ControllerShapes", "Workers", "Batch",
+    "MayaWidgets", "LimbRiggingTool", "LimbRiggingToolUI", "ProxyRigger", "ProxyRiggerUI", "MayaToUE", "MayaToUEUI",
+    "RecordingMaya", "Benchmark", "PlaybackBenchmark",
+]
+
+# module state that holds on to the old code, called before the module is reloaded: an instrumentation session that
+# patched maya.cmds and the scene index callbacks
+RELOAD_TEARDOWN = {
+    "MayaUtils" : ["StopInstrumentation", "DisableSceneIndex"],
+}
+
+SHELF_NAME = "MayaTools"
+
+def RegisterTool(name, moduleName, label, annotation = ""):
+    TOOLS[name] = ToolEntry(name, moduleName, label, annotation)
+
+def IsDevMode():
+    return os.environ.get("MAYATOOLS_DEV") == "1"
+
+def TearDownModuleState(moduleNames):
+    # every loaded module takes down its state before any of them is reloaded, the new code starts with none of it
+    for moduleName in moduleNames:
+        module = sys.modules.get(moduleName)
+        if module is None:
+            continue
+        for teardownName in RELOAD_TEARDOWN.get(moduleName, []):
+            getattr(module, teardownName)()
+
+def ReloadTool(entry:ToolEntry):
+    moduleNames = RELOAD_ORDER if entry.moduleName in RELOAD_ORDER else RELOAD_ORDER + [entry.moduleName]
+    TearDownModuleState(moduleNames)
+    for moduleName in moduleNames:
+        if moduleName in sys.modules:
+            importlib.reload(sys.modules[moduleName])
+    return sys.modules[entry.moduleName]
+
+def Launch(name, reload = False):
+    entry = TOOLS[name]
+    if (reload or IsDevMode()) and entry.moduleName in sys.modules:
+        module = ReloadTool(entry)
+    else:
+        module = importlib.import_module(entry.moduleName)
+    return module.Show()
+
+def InstallShelf():
+    import maya.cmds as mc
+    import maya.mel as mel
+
+    topLevelShelf = mel.eval("$tempShelfTopLevel = $gShelfTopLevel")
+    if mc.shelfLayout(SHELF_NAME, exists=True):
+        for button in mc.shelfLayout(SHELF_NAME, q=True, childArray=True) or []:
+            mc.deleteUI(button)
+    else:
+        mc.shelfLayout(SHELF_NAME, parent=topLevelShelf)
+
+    for entry in TOOLS.values():
+        mc.shelfButton(parent=SHELF_NAME, label=entry.label, imageOverlayLabel=entry.label, annotation=entry.annotation,
+                       image="pythonFamily.png", sourceType="python", command=f"import Launcher; Launcher.Launch({entry.name!r})")
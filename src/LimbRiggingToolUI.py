@@ -0,0 +1,212 @@
+from PySide2.QtGui import QColor
+import maya.cmds as mc 
+
+from PySide2.QtWidgets import (QCheckBox,
+                               QColorDialog, 
+                               QComboBox, 
+                               QLineEdit, 
+                               QMessageBox, 
+                               QWidget, 
+                               QVBoxLayout, 
+                               QHBoxLayout, 
+                               QLabel, 
+                               QSlider, 
+                               QPushButton)
+from PySide2.QtCore import Qt
+
+from MayaWidgets import QMayaWindow
+from LimbRiggingTool import LimbRigger
+from ControllerShapes import GetShapeLibrary, RecolorControllers, RecolorControllersBySide
+
+class ColorPicker(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.masterLayout = QVBoxLayout()
+        self.setLayout(self.masterLayout)
+        self.colorPickerBtn = QPushButton()
+        self.colorPickerBtn.setStyleSheet(f"background-color:black")
+        self.masterLayout.addWidget(self.colorPickerBtn)
+        self.colorPickerBtn.clicked.connect(self.ColorPickerBtnClicked)
+        self.color = QColor(0,0,0)
+
+    def ColorPickerBtnClicked(self):
+        self.color = QColorDialog.getColor()
+        self.colorPickerBtn.setStyleSheet(f"background-color:{self.color.name()}")
+
+class LimbRigToolWidget(QMayaWindow): 
+    def __init__(self): 
+        super().__init__()
+        self.setWindowTitle("Limb Rigging Tool") 
+        self.rigger = LimbRigger()
+
+        self.masterLayout = QVBoxLayout()
+        self.setLayout(self.masterLayout)
+
+        self.tipLabel = QLabel("Select the First Joint of the Limb, and click on the Auto Find Button") 
+        self.masterLayout.addWidget(self.tipLabel)
+
+        self.jointSelectionText = QLineEdit()
+        self.masterLayout.addWidget(self.jointSelectionText)
+        self.jointSelectionText.setEnabled(False)
+
+        self.autoFindBtn = QPushButton("Auto Find") 
+        self.masterLayout.addWidget(self.autoFindBtn)
+        self.autoFindBtn.clicked.connect(self.AutoFindBtnClicked)
+
+        rigAllLayout = QHBoxLayout()
+        self.includeFingersCheckbox = QCheckBox("Include Fingers")
+        rigAllLayout.addWidget(self.includeFingersCheckbox)
+        self.rigAllLimbsBtn = QPushButton("Rig All Limbs Under Selected")
+        self.rigAllLimbsBtn.clicked.connect(self.RigAllLimbsBtnClicked)
+        rigAllLayout.addWidget(self.rigAllLimbsBtn)
+        self.masterLayout.addLayout(rigAllLayout)
+
+        ctrlSliderLayout = QHBoxLayout()
+        self.ctrlSizeSlider = QSlider()
+        self.ctrlSizeSlider.setValue(self.rigger.controllerSize)
+        self.ctrlSizeSlider.valueChanged.connect(self.CtrlSizeValueChanged)
+        self.ctrlSizeSlider.setRange(1, 30)
+        self.ctrlSizeSlider.setOrientation(Qt.Horizontal)
+        ctrlSliderLayout.addWidget(self.ctrlSizeSlider)
+        self.ctrlSizeLabel = QLabel(f"{self.rigger.controllerSize}")
+        ctrlSliderLayout.addWidget(self.ctrlSizeLabel)
+
+        self.masterLayout.addLayout(ctrlSliderLayout)
+
+        self.colorPicker = ColorPicker()
+        self.masterLayout.addWidget(self.colorPicker)
+
+        shapeLayout = QHBoxLayout()
+        shapeLayout.addWidget(QLabel("FK Shape:"))
+        self.fkShapeComboBox = QComboBox()
+        self.fkShapeComboBox.addItems(GetShapeLibrary().GetShapeNames())
+        self.fkShapeComboBox.setCurrentText(self.rigger.fkShapeName)
+        self.fkShapeComboBox.currentTextChanged.connect(self.FkShapeChanged)
+        shapeLayout.addWidget(self.fkShapeComboBox)
+        self.shapeNameText = QLineEdit()
+        self.shapeNameText.setPlaceholderText("new shape name")
+        shapeLayout.addWidget(self.shapeNameText)
+        self.saveShapeBtn = QPushButton("Save Selected Curve as Shape")
+        self.saveShapeBtn.clicked.connect(self.SaveShapeBtnClicked)
+        shapeLayout.addWidget(self.saveShapeBtn)
+        self.masterLayout.addLayout(shapeLayout)
+
+        self.rigLimbBtn = QPushButton("Rig Limb")
+        self.masterLayout.addWidget(self.rigLimbBtn)
+        self.rigLimbBtn.clicked.connect(self.RigLimbBtnClicked)
+
+        batchLayout = QHBoxLayout()
+        self.addToBatchBtn = QPushButton("Add Limb to Batch")
+        self.addToBatchBtn.clicked.connect(self.AddToBatchBtnClicked)
+        batchLayout.addWidget(self.addToBatchBtn)
+        self.rigBatchBtn = QPushButton("Rig Batch (0)")
+        self.rigBatchBtn.clicked.connect(self.RigBatchBtnClicked)
+        batchLayout.addWidget(self.rigBatchBtn)
+        self.masterLayout.addLayout(batchLayout)
+
+        recolorLayout = QHBoxLayout()
+        self.recolorBtn = QPushButton("Recolor Selected Controllers")
+        recolorLayout.addWidget(self.recolorBtn)
+        self.recolorBtn.clicked.connect(self.RecolorSelectedControllers)
+        self.recolorBySideBtn = QPushButton("Recolor by Side")
+        recolorLayout.addWidget(self.recolorBySideBtn)
+        self.recolorBySideBtn.clicked.connect(self.RecolorBySideBtnClicked)
+        self.masterLayout.addLayout(recolorLayout)
+
+        self.checkEvaluationBtn = QPushButton("Check Parallel Evaluation")
+        self.masterLayout.addWidget(self.checkEvaluationBtn)
+        self.checkEvaluationBtn.clicked.connect(self.CheckEvaluationBtnClicked)
+
+        self.setWindowTitle("Limb Rigging Tool")
+
+    def CtrlSizeValueChanged(self, newValue): 
+        self.rigger.controllerSize = newValue
+        self.ctrlSizeLabel.setText(f"{self.rigger.controllerSize}")
+
+    def FkShapeChanged(self, shapeName):
+        self.rigger.fkShapeName = shapeName
+
+    def SaveShapeBtnClicked(self):
+        curves = mc.ls(sl=True, type="transform")
+        shapeName = self.shapeNameText.text()
+        if not curves or not shapeName:
+            QMessageBox.warning(self, "Warning", "Select a curve and give the shape a name to save it.")
+            return
+
+        try:
+            GetShapeLibrary().CaptureShape(curves[0], shapeName)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"{e}")
+            return
+
+        if self.fkShapeComboBox.findText(shapeName) < 0:
+            self.fkShapeComboBox.addItem(shapeName)
+
+    def RigLimbBtnClicked(self): 
+        qcolor = self.colorPicker.color
+        r, g, b, _ = qcolor.getRgbF()
+        self.rigger.controllerColorRGB = (r, g, b)
+        self.rigger.RigLimbs([self.rigger.GetCurrentLimbPlan()])
+
+    def RigAllLimbsBtnClicked(self):
+        qcolor = self.colorPicker.color
+        r, g, b, _ = qcolor.getRgbF()
+        self.rigger.controllerColorRGB = (r, g, b)
+        try:
+            limbs = self.rigger.RigAllLimbs(self.includeFingersCheckbox.isChecked())
+            self.jointSelectionText.setText(f"Rigged {len(limbs)} limbs")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Select the root joint of the skeleton: {e}")
+
+    def AddToBatchBtnClicked(self):
+        qcolor = self.colorPicker.color
+        r, g, b, _ = qcolor.getRgbF()
+        self.rigger.controllerColorRGB = (r, g, b)
+        self.rigger.AddCurrentLimbToPlan()
+        self.rigBatchBtn.setText(f"Rig Batch ({len(self.rigger.plannedLimbs)})")
+
+    def RigBatchBtnClicked(self):
+        try:
+            self.rigger.RigPlannedLimbs()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Batch rig failed and was undone: {e}")
+        self.rigBatchBtn.setText(f"Rig Batch ({len(self.rigger.plannedLimbs)})")
+
+    def AutoFindBtnClicked(self): 
+        try: 
+            self.rigger.AutoFindJnts()
+            self.jointSelectionText.setText(f"{self.rigger.root}, {self.rigger.mid}, {self.rigger.end}")
+        except Exception as e: 
+            QMessageBox.critical(self, "Error", "Wrong Selection! Please select the first joint of the limb")
+
+    def CheckEvaluationBtnClicked(self):
+        blockers = {}
+        for topGrp in self.rigger.builtRigs:
+            if topGrp.IsValid():
+                blockers.update(self.rigger.CheckRigEvaluation(topGrp.GetName()))
+
+        if not blockers:
+            QMessageBox.information(self, "Parallel Evaluation", "No nodes in the built rigs block parallel evaluation.")
+            return
+
+        report = "\n".join(f"{node}: {reason}" for node, reason in blockers.items())
+        QMessageBox.warning(self, "Parallel Evaluation", f"These nodes block parallel evaluation:\n{report}")
+
+    def RecolorSelectedControllers(self):
+        qcolor = self.colorPicker.color
+        r, g, b, _ = qcolor.getRgbF()
+        
+        selected = mc.ls(sl=True, type="transform")
+        if not selected:
+            QMessageBox.warning(self, "Warning", "Please select one or more controllers to recolor.")
+            return
+        
+        # only the selected controllers, not the controllers parented under them
+        RecolorControllers(selected, (r, g, b), includeDescendants=False)
+
+    def RecolorBySideBtnClicked(self):
+        # the selected controllers and rig groups, or every controller in the scene when nothing is selected
+        selected = mc.ls(sl=True, type="transform")
+        recolored = RecolorControllersBySide(selected or None)
+        print(f"Recolored {recolored} controller shapes by side")
+
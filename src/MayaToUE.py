@@ -1,36 +1,115 @@
+import csv
+import json
+import os
+import re
+import sys
+import time
+import numpy as np
 from MayaUtils import *
-from PySide2.QtGui import QIntValidator, QRegExpValidator
-from PySide2.QtWidgets import QCheckBox, QHBoxLayout, QLabel, QLineEdit, QListWidget, QMessageBox, QPushButton, QVBoxLayout, QWidget
+from AnimSampling import AnimSampler, CHANNELS, GetChannelTolerances, ReduceKeys, GetReductionErrors
+from SkinWeights import MayaSkin, PruneWeights, QuantizeWeights, GetInfluenceCountHistogram, RemapWeightsByName
 import maya.cmds as mc
+import maya.mel as mel
 
 
-def TryAction(action):
-    def wrapper(*args, **kwargs):
-        try:
-            action(*args, **kwargs)
-        except Exception as e:
-            QMessageBox().critical(None, "Error", f"{e}")
+SUBFIX_PATTERN = "[a-zA-Z0-9_]+"
 
-    return wrapper
-
-# Data oriented class
+# Data oriented class, slotted so hundreds of clips stay small
 class AnimClip:
-    def __init__(self):
-        self.subfix = ""
-        self.frameMin = mc.playbackOptions(q=True, min=True)
-        self.frameMax = mc.playbackOptions(q=True, max=True)
-        self.shouldExport = True
+    __slots__ = ("subfix", "frameMin", "frameMax", "shouldExport")
+
+    def __init__(self, subfix = "", frameMin = None, frameMax = None, shouldExport = True):
+        self.subfix = subfix
+        self.frameMin = int(mc.playbackOptions(q=True, min=True) if frameMin is None else frameMin)
+        self.frameMax = int(mc.playbackOptions(q=True, max=True) if frameMax is None else frameMax)
+        self.shouldExport = shouldExport
+
+    @classmethod
+    def FromDict(cls, data):
+        return cls(data["subfix"], data["frameMin"], data["frameMax"], data.get("shouldExport", True))
+
+def GetSubfixFromName(name):
+    return re.sub("[^a-zA-Z0-9_]", "_", name.strip())
 
 class MayaToUE:
     def __init__(self):
-        self.rootJnt = ""
-        self.meshes = []
+        self.rootJnt : NodeHandle = None
+        self.meshes : list[NodeHandle] = []
         self.animationClips : list[AnimClip] = []
+        self.saveDir = ""
+        self.fileName = ""
+        self.pruneWeights = True
+        self.maxInfluences = 4
+        self.minWeight = 0.001
+        self.quantizeWeights = False
+        self.reduceKeys = True
+        self.keyTolerances = {"translate" : 0.01, "rotate" : 0.05, "scale" : 0.001} # scene units, degrees and scale factor
+        self.clipReports = {}
+        self.exportSkeletalMesh = True
+        self.onProgress = None # called with a dict per exported file, the background export streams these back
+
+    def GetSettings(self):
+        return {
+            "rootJnt" : self.rootJnt.GetLongName() if self.rootJnt else "",
+            "meshes" : [mesh.GetLongName() for mesh in self.meshes],
+            "saveDir" : self.saveDir,
+            "fileName" : self.fileName,
+            "pruneWeights" : self.pruneWeights,
+            "maxInfluences" : self.maxInfluences,
+            "minWeight" : self.minWeight,
+            "quantizeWeights" : self.quantizeWeights,
+            "reduceKeys" : self.reduceKeys,
+            "keyTolerances" : dict(self.keyTolerances),
+            "exportSkeletalMesh" : self.exportSkeletalMesh,
+            "clips" : [self.GetClipSettings(clip) for clip in self.GetEnabledClips()],
+        }
+
+    def GetClipSettings(self, clip:AnimClip):
+        return {"subfix" : clip.subfix, "frameMin" : clip.frameMin, "frameMax" : clip.frameMax}
+
+    def ApplySettings(self, settings):
+        for name, value in settings.items():
+            if name == "rootJnt":
+                value = GetNodeHandle(value) if value else None
+            elif name == "meshes":
+                value = GetNodeHandles(value)
+            if name != "clips":
+                setattr(self, name, value)
+
+        self.animationClips = [AnimClip.FromDict(clipSettings) for clipSettings in settings.get("clips", [])]
+
+    def ReportProgress(self, **event):
+        if self.onProgress:
+            self.onProgress(event)
 
     def AddNewAnimClipEntry(self):
         self.animationClips.append(AnimClip())
         return self.animationClips[-1]
 
+    def GetClipsFromBookmarks(self):
+        # time slider bookmarks name a range of the timeline, each one becomes a clip
+        clips = []
+        for bookmark in mc.ls(type="timeSliderBookmark") or []:
+            name = mc.getAttr(f"{bookmark}.name") or bookmark
+            clips.append(AnimClip(GetSubfixFromName(name), mc.getAttr(f"{bookmark}.timeRangeStart"), mc.getAttr(f"{bookmark}.timeRangeStop")))
+        return sorted(clips, key=lambda clip: clip.frameMin)
+
+    def GetClipsFromFile(self, path):
+        # json is a list of clip dicts like GetSettings writes, csv is subfix, min, max and an optional export column
+        if path.lower().endswith(".json"):
+            with open(path) as clipsFile:
+                data = json.load(clipsFile)
+            return [AnimClip.FromDict(clipData) for clipData in (data["clips"] if isinstance(data, dict) else data)]
+
+        clips = []
+        with open(path, newline="") as clipsFile:
+            for row in csv.reader(clipsFile):
+                if len(row) < 3 or not row[1].strip().lstrip("-").isdigit():
+                    continue # the header or a blank line
+                shouldExport = len(row) < 4 or row[3].strip().lower() not in ("0", "false", "no")
+                clips.append(AnimClip(GetSubfixFromName(row[0]), int(row[1]), int(row[2]), shouldExport))
+        return clips
+
     def SetSelectedAsRootJnt(self):
         selection = mc.ls(sl=True)
         if not selection:
@@ -40,22 +119,29 @@ class MayaToUE:
         if not IsJoint(selectedJnt):
             raise Exception(f"{selectedJnt} is not a joint, Please select the Root Joint of the Rig")
 
-        self.rootJnt = selectedJnt
+        self.rootJnt = GetNodeHandle(selectedJnt)
+
+    def GetRootJntName(self):
+        return self.rootJnt.GetName() if self.rootJnt else ""
+
+    def HasRootJnt(self):
+        return self.rootJnt is not None and self.rootJnt.IsValid()
 
     def AddRootJoint(self):
-        if (not self.rootJnt) or (not mc.objExists(self.rootJnt)):
+        if not self.HasRootJnt():
             raise Exception("No Root Joint Assigned, please set the current root joint of the rig first by selecting the pelivs")
 
-        currentRootJntPosX, currentRootJntPosY, currentRootJntPosZ = mc.xform(self.rootJnt, q=True, t=True, ws=True)
+        currentRootJnt = self.rootJnt.GetName()
+        currentRootJntPosX, currentRootJntPosY, currentRootJntPosZ = mc.xform(currentRootJnt, q=True, t=True, ws=True)
         if currentRootJntPosX == 0 and currentRootJntPosY ==0 and currentRootJntPosZ == 0:
             raise Exception("Current Root Joint is already at origin")
 
         mc.select(cl=True)
-        rootJntName = self.rootJnt + "_root"
-        mc.joint(n=rootJntName)
-        mc.parent(self.rootJnt, rootJntName)
-        self.rootJnt = rootJntName
+        rootJntName = mc.joint(n=self.rootJnt.GetShortName() + "_root")
+        mc.parent(currentRootJnt, rootJntName)
+        self.rootJnt = GetNodeHandle(rootJntName)
 
+    @InstrumentedOperation()
     def AddMeshs(self):
         selection = mc.ls(sl=True)
         if not selection:
@@ -70,127 +156,257 @@ class MayaToUE:
         if len(meshes) == 0:
             raise Exception("No Mesh Selected")
         
-        self.meshes = list(meshes)
-
-class AnimClipEntryWidget(QWidget):
-    def __init__(self, animClip: AnimClip):
-        super().__init__()
-        self.animClip = animClip
-        self.masterLayout = QHBoxLayout()
-        self.setLayout(self.masterLayout)
-
-        shouldExportCheckbox = QCheckBox()
-        shouldExportCheckbox.setChecked(self.animClip.shouldExport)
-        self.masterLayout.addWidget(shouldExportCheckbox)
-        shouldExportCheckbox.toggled.connect(self.ShouldExportCheckBoxToggled)
-
-        self.masterLayout.addWidget(QLabel("Subfix: "))
-
-        subfixLineEdit = QLineEdit()
-        subfixLineEdit.setValidator(QRegExpValidator("[a-zA-z0-9_]+"))
-        subfixLineEdit.setText(self.animClip.subfix)
-        subfixLineEdit.textChanged.connect(self.SubfixTextChanged)
-        self.masterLayout.addWidget(subfixLineEdit)
-
-        self.masterLayout.addWidget(QLabel("Min: "))
-        minFrameLineEdit = QLineEdit()
-        minFrameLineEdit.setValidator(QIntValidator())
-        minFrameLineEdit.setText(str(int(self.animClip.frameMin)))
-        minFrameLineEdit.textChanged.connect(self.MinFrameChanged)
-        self.masterLayout.addWidget(minFrameLineEdit)
-
-        self.masterLayout.addWidget(QLabel("Max: "))
-        maxFrameLineEdit = QLineEdit()
-        maxFrameLineEdit.setValidator(QIntValidator())
-        maxFrameLineEdit.setText(str(int(self.animClip.frameMax)))
-        maxFrameLineEdit.textChanged.connect(self.MaxFrameChanged)
-        self.masterLayout.addWidget(maxFrameLineEdit)
-
-        setRangeBtn = QPushButton("[-]")
-        setRangeBtn.clicked.connect(self.setRangeBtnClicked)
-        self.masterLayout.addWidget(setRangeBtn)
-
-        deleteBtn = QPushButton("X")
-        deleteBtn.clicked.connect(self.DeleteButtonClicked)
-        self.masterLayout.addWidget(deleteBtn)
-
-    def DeleteButtonClicked(self):
-        self.deleteLater()
-
-    def setRangeBtnClicked(self):
-        mc.playbackOptions(e=True, min=self.animClip.frameMin, max=self.animClip.frameMax)
-        mc.playbackOptions(e=True, ast=self.animClip.frameMin, aet=self.animClip.frameMax)
-
-    def MinFrameChanged(self, newVal):
-        self.animClip.frameMin = int(newVal)
-
-    def MaxFrameChanged(self, newVal):
-        self.animClip.frameMax = int(newVal)
-
-    def SubfixTextChanged(self, newText):
-        self.animClip.subfix = newText
-
-    def ShouldExportCheckBoxToggled(self):
-        self.animClip.shouldExport = not self.animClip.shouldExport
-
-class MayaToEUWidget(QMayaWindow):
-    def GetWindowHash(self):
-        return "MAYATOUEAWDOAWNONOLR"
+        self.meshes = GetNodeHandles(list(meshes))
+
+    def GetMeshSkins(self):
+        meshSkins = []
+        for mesh in GetNodeNames(self.meshes):
+            skins = GraphWalk(mc.listRelatives(mesh, s=True)[0], True, 10).GetNodesOfType("skinCluster")
+            if skins:
+                meshSkins.append((mesh, skins[0]))
+        return meshSkins
+
+    @InstrumentedOperation()
+    def PruneSkinWeights(self, apply = True):
+        # caps influences per vertex, drops tiny weights and optionally quantizes to 8 bit, one read per skin,
+        # applied to an export copy of each mesh so the source skin is never written
+        report = {}
+        exportMeshes = {}
+        for mesh, skin in self.GetMeshSkins():
+            skinSource = MayaSkin(skin, mesh)
+            weights = skinSource.GetWeights()
+            pruned = PruneWeights(weights, self.maxInfluences, self.minWeight)
+            if self.quantizeWeights:
+                pruned = QuantizeWeights(pruned)
+
+            report[mesh] = {
+                "skin" : skin,
+                "before" : GetInfluenceCountHistogram(weights).tolist(),
+                "after" : GetInfluenceCountHistogram(pruned).tolist(),
+                "maxChange" : float(abs(pruned - weights).max()) if weights.size else 0.0,
+            }
+            if apply:
+                # keyed by handle, the source is renamed out of the copy's way
+                exportMeshes[GetNodeHandle(mesh)] = self.CreatePrunedExportMesh(mesh, skinSource.GetInfluences(), pruned)
+
+        return report, exportMeshes
+
+    def CreatePrunedExportMesh(self, mesh, influences, pruned):
+        # bound at the bind pose so the copy deforms like the source, it takes over the source's name so the fbx matches,
+        # the duplicate, bind and renames are undoable and only the new skin is written through the api
+        shortName = GetShortName(mesh)
+        source = mc.rename(mesh, shortName + "_exportSource")
+        exportMesh = GetNodeHandle(mc.duplicate(source, rr=True, n=shortName)[0])
+        exportSkin = mc.skinCluster(influences, exportMesh.GetName(), tsb=True, n=shortName + "_exportSkin")[0]
+        skinTarget = MayaSkin(exportSkin, exportMesh.GetName())
+        skinTarget.SetWeights(RemapWeightsByName(pruned, influences, skinTarget.GetInfluences()))
+        return exportMesh
+
+    def GoToBindPose(self):
+        mc.dagPose(self.GetRootHierarchy(), restore=True, bindPose=True)
+
+    def GetWeightReportText(self, report):
+        lines = []
+        for mesh, meshReport in report.items():
+            lines.append(f"{mesh} ({meshReport['skin']}), largest weight change {meshReport['maxChange']:.4f}")
+            for label in ("before", "after"):
+                counts = ", ".join(f"{n}: {count}" for n, count in enumerate(meshReport[label]) if count)
+                lines.append(f"  {label} - verts per influence count {counts}")
+        return "\n".join(lines)
+
+    def GetEnabledClips(self):
+        return [clip for clip in self.animationClips if clip.shouldExport]
+
+    def GetBakeRange(self, clips):
+        # one range covering every clip, so the rig is baked once instead of once per clip
+        return min(clip.frameMin for clip in clips), max(clip.frameMax for clip in clips)
+
+    def GetRootHierarchy(self):
+        rootJnt = self.rootJnt.GetName()
+        return [rootJnt] + (mc.listRelatives(rootJnt, ad=True, type="joint") or [])
+
+    def SampleRootHierarchy(self, frameMin, frameMax):
+        sampler = AnimSampler.FromRoot(self.rootJnt.GetName())
+        samples = sampler.Sample(frameMin, frameMax)
+        print(f"Sampled {len(sampler.joints)} joints over {samples.shape[0]} frames at {sampler.samplesPerSecond:.0f} samples per second")
+        return sampler, samples
+
+    @InstrumentedOperation()
+    def SampleClips(self, clips):
+        # one sampling pass over the union range, every clip is a slice of it
+        frameMin, frameMax = self.GetBakeRange(clips)
+        sampler, samples = self.SampleRootHierarchy(frameMin, frameMax)
+        clipSamples = {}
+        for clip in clips:
+            clipSamples[clip] = samples[int(clip.frameMin) - int(frameMin) : int(clip.frameMax) - int(frameMin) + 1]
+
+        return sampler, clipSamples
+
+    def GetFrameRanges(self, frames):
+        # runs of consecutive frames as (first, last), so cutting a long flat stretch is one range
+        if not len(frames):
+            return []
+        breaks = np.flatnonzero(np.diff(frames) != 1)
+        firsts = np.r_[frames[0], frames[breaks + 1]]
+        lasts = np.r_[frames[breaks], frames[-1]]
+        return [(float(first), float(last)) for first, last in zip(firsts, lasts)]
+
+    @InstrumentedOperation()
+    def ReduceClipKeys(self, clip:AnimClip, jnts, samples):
+        # tolerance based on the sampled clip, then every channel whose removed frames match is cut in one call,
+        # a still channel loses all its inner keys and most still channels share that
+        keep = ReduceKeys(samples, GetChannelTolerances(self.keyTolerances))
+        frames = np.arange(int(clip.frameMin), int(clip.frameMax) + 1)
+
+        plugsByRanges = {}
+        for j, jnt in enumerate(jnts):
+            for c, channel in enumerate(CHANNELS):
+                ranges = tuple(self.GetFrameRanges(frames[~keep[:, j, c]]))
+                if ranges:
+                    plugsByRanges.setdefault(ranges, []).append(f"{jnt}.{channel}")
+
+        for ranges, plugs in plugsByRanges.items():
+            mc.cutKey(plugs, time=list(ranges), clear=True)
+
+        # the error was measured against straight lines between the kept keys, so that is how they have to play back
+        mc.keyTangent(jnts, time=(float(frames[0]), float(frames[-1])), itt="linear", ott="linear")
+
+        return {
+            "frames" : len(frames),
+            "keysBefore" : int(keep.size),
+            "keysAfter" : int(keep.sum()),
+            "maxError" : GetReductionErrors(samples, keep),
+        }
+
+    def ClipsOverlap(self, clip:AnimClip, otherClips):
+        return any(clip.frameMin <= other.frameMax and other.frameMin <= clip.frameMax for other in otherClips)
+
+    def CopyBakedKeys(self, jnts, frameMin, frameMax):
+        mc.copyKey(jnts, attribute=CHANNELS, time=(float(frameMin), float(frameMax)))
+
+    @InstrumentedOperation()
+    def RestoreBakedKeys(self, jnts, frameMin, frameMax):
+        # the copy starts at the bake's first frame, so pasting over the whole bake range lines every key back up
+        mc.pasteKey(jnts, attribute=CHANNELS, time=(float(frameMin), float(frameMax)), option="replace")
+
+    def GetKeyReportText(self, clipReports):
+        lines = []
+        for subfix, report in clipReports.items():
+            errors = ", ".join(f"{group} {error:.4f}" for group, error in report["maxError"].items())
+            lines.append(f"{subfix}: {report['keysAfter']} of {report['keysBefore']} keys over {report['frames']} frames, max error {errors}")
+        return "\n".join(lines)
+
+    def GetSkeletalMeshPath(self):
+        return os.path.join(self.saveDir, self.fileName + ".fbx")
+
+    def GetAnimClipPath(self, clip:AnimClip):
+        return os.path.join(self.saveDir, self.fileName + "_" + clip.subfix + ".fbx")
+
+    @InstrumentedOperation()
+    def BakeRootHierarchy(self, frameMin, frameMax):
+        mc.bakeResults(self.GetRootHierarchy(), t=(frameMin, frameMax), simulation=True, sampleBy=1, preserveOutsideKeys=True, disableImplicitControl=True)
+
+    @InstrumentedOperation()
+    def ExportFbx(self, path, objects, animationOnly, takeName = None, frameMin = None, frameMax = None):
+        mc.select(objects, r=True)
+        mel.eval("FBXResetExport")
+        mel.eval("FBXExportInputConnections -v false")
+        mel.eval("FBXExportBakeComplexAnimation -v false") # the keys are already baked
+        mel.eval(f"FBXExportAnimationOnly -v {'true' if animationOnly else 'false'}")
+        mel.eval("FBXExportSplitAnimationIntoTakes -c")
+        if takeName is not None:
+            mel.eval(f'FBXExportSplitAnimationIntoTakes -v "{takeName}" {frameMin} {frameMax}')
+        mel.eval(f'FBXExport -f "{path.replace(os.sep, "/")}" -s')
+
+    def ExportSkeletalMesh(self, exportMeshes = None):
+        # exportMeshes maps a source mesh to the pruned copy that goes in the file instead
+        exportMeshes = exportMeshes or {}
+        meshes = GetNodeNames([exportMeshes.get(mesh, mesh) for mesh in self.meshes])
+        path = self.GetSkeletalMeshPath()
+        self.ExportFbx(path, [self.rootJnt.GetName()] + meshes, False)
+        return path
+
+    def ExportAnimClip(self, clip:AnimClip):
+        path = self.GetAnimClipPath(clip)
+        self.ExportFbx(path, [self.rootJnt.GetName()], True, clip.subfix, int(clip.frameMin), int(clip.frameMax))
+        return path
+
+    def ValidateExport(self):
+        if not self.HasRootJnt():
+            raise Exception("No Root Joint Assigned, please set the root joint of the rig first")
+        if not self.saveDir or not self.fileName:
+            raise Exception("Set the save directory and file name before exporting")
+
+    @InstrumentedOperation()
+    def ExportAll(self):
+        self.ValidateExport()
+        mc.loadPlugin("fbxmaya", quiet=True)
+        os.makedirs(self.saveDir, exist_ok=True)
+        clips = self.GetEnabledClips()
+        selection = mc.ls(sl=True)
 
-    def __init__(self):
-        super().__init__()
-        self.mayaToUE = MayaToUE()
-        self.setWindowTitle("Maya to UE")
-        
-        self.masterLayout = QVBoxLayout()
-        self.setLayout(self.masterLayout)
-
-        self.rootJntText = QLineEdit()
-        self.rootJntText.setEnabled(False)
-        self.masterLayout.addWidget(self.rootJntText)
-
-        setSelectionAsRootJntBtn = QPushButton("Set Root Joint")
-        setSelectionAsRootJntBtn.clicked.connect(self.SetSelectionAsRootJointBtnClicked)
-        self.masterLayout.addWidget(setSelectionAsRootJntBtn)
-
-        addRootJntBtn = QPushButton("Add Root Joint")
-        addRootJntBtn.clicked.connect(self.AddRootJntButtonClicked)
-        self.masterLayout.addWidget(addRootJntBtn)
-
-        self.meshList = QListWidget()
-        self.masterLayout.addWidget(self.meshList)
-        self.meshList.setFixedHeight(80)
-        addMeshBtn = QPushButton("Add Meshes")
-        addMeshBtn.clicked.connect(self.AddMeshBtnClicked)
-        self.masterLayout.addWidget(addMeshBtn)
-
-        addNewAnimClipEntryBtn = QPushButton("Add Animation Clip")
-        addNewAnimClipEntryBtn.clicked.connect(self.AddNewAnimClipEntryBtnClicked)
-        self.masterLayout.addWidget(addNewAnimClipEntryBtn)
-
-        self.animEntryLayout = QVBoxLayout()
-        self.masterLayout.addLayout(self.animEntryLayout)
-
-    def AddNewAnimClipEntryBtnClicked(self):
-        newEntry = self.mayaToUE.AddNewAnimClipEntry()
-        self.animEntryLayout.addWidget(AnimClipEntryWidget(newEntry))
-
-    @TryAction
-    def AddMeshBtnClicked(self):
-        self.mayaToUE.AddMeshs()
-        self.meshList.clear()
-        self.meshList.addItems(self.mayaToUE.meshes)
-
-    @TryAction
-    def AddRootJntButtonClicked(self):
-        self.mayaToUE.AddRootJoint()
-        self.rootJntText.setText(self.mayaToUE.rootJnt)
-
-    @TryAction
-    def SetSelectionAsRootJointBtnClicked(self):
-        self.mayaToUE.SetSelectedAsRootJnt()
-        self.rootJntText.setText(self.mayaToUE.rootJnt)
-
-MayaToEUWidget().show()
-
-#AnimClipEntryWidget(AnimClip()).show()
\ No newline at end of file
+        exported = []
+        self.clipReports = {}
+        # the prune copies and the bake are scratch work, all of it is undone once every file is written
+        with BuildTransaction("MayaToUEExport", keepChanges=False):
+            if clips and self.reduceKeys:
+                sampler, clipSamples = self.SampleClips(clips)
+
+            exportMeshes = {}
+            if self.pruneWeights and self.meshes and self.exportSkeletalMesh:
+                self.GoToBindPose()
+                report, exportMeshes = self.PruneSkinWeights()
+                print(self.GetWeightReportText(report))
+
+            if clips:
+                self.BakeRootHierarchy(*self.GetBakeRange(clips))
+            # every clip is reduced from the full bake, a copy of it puts back the keys an earlier overlapping clip cut
+            overlapping = self.reduceKeys and any(self.ClipsOverlap(clip, clips[:i]) for i, clip in enumerate(clips))
+            if overlapping:
+                self.CopyBakedKeys(sampler.joints, *self.GetBakeRange(clips))
+
+            if self.exportSkeletalMesh:
+                startTime = time.perf_counter()
+                exported.append(self.ExportSkeletalMesh(exportMeshes))
+                self.ReportProgress(kind="mesh", path=exported[-1], seconds=time.perf_counter() - startTime)
+
+            for i, clip in enumerate(clips):
+                startTime = time.perf_counter()
+                if self.reduceKeys:
+                    if overlapping and self.ClipsOverlap(clip, clips[:i]):
+                        self.RestoreBakedKeys(sampler.joints, *self.GetBakeRange(clips))
+                    self.clipReports[clip.subfix] = self.ReduceClipKeys(clip, sampler.joints, clipSamples[clip])
+                exported.append(self.ExportAnimClip(clip))
+                self.ReportProgress(kind="clip", clip=clip.subfix, path=exported[-1], seconds=time.perf_counter() - startTime)
+
+        if self.clipReports:
+            print(self.GetKeyReportText(self.clipReports))
+
+        if selection:
+            mc.select(selection, r=True)
+        else:
+            mc.select(cl=True)
+        return exported
+
+def GetMayapyPath():
+    # mayapy sits next to the maya executable
+    if "MAYATOOLS_MAYAPY" in os.environ:
+        return os.environ["MAYATOOLS_MAYAPY"]
+    return os.path.join(os.path.dirname(sys.executable), "mayapy.exe" if os.name == "nt" else "mayapy")
+
+def SplitClipsForWorkers(clips, workerCount):
+    # longest clips first onto whichever worker has the fewest frames so far
+    groups = [[] for _ in range(max(1, min(workerCount, len(clips))))]
+    frameCounts = [0] * len(groups)
+    for clip in sorted(clips, key=lambda clip: clip.frameMin - clip.frameMax):
+        i = frameCounts.index(min(frameCounts))
+        groups[i].append(clip)
+        frameCounts[i] += clip.frameMax - clip.frameMin + 1
+    return groups
+
+def Show():
+    from MayaToUEUI import MayaToEUWidget
+    return MayaToEUWidget.ShowWindow()
+
+if __name__ == "__main__":
+    Show()
\ No newline at end of file
@@ -0,0 +1,464 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from MayaUtils import *
+from MayaWidgets import QMayaWindow, TryAction
+from MayaToUE import MayaToUE, AnimClip, SUBFIX_PATTERN, GetMayapyPath, SplitClipsForWorkers
+from Workers import SRC_DIR, PROGRESS_PREFIX, GetWorkerEnv
+from PySide2.QtCore import QAbstractTableModel, QModelIndex, QProcess, QProcessEnvironment, Qt
+from PySide2.QtGui import QDoubleValidator, QRegExpValidator
+from PySide2.QtWidgets import QAbstractItemView, QCheckBox, QComboBox, QFileDialog, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QListWidget, QMessageBox, QProgressBar, QPushButton, QTableView, QVBoxLayout
+import maya.cmds as mc
+
+# The export run by mayapy workers on a snapshot of the scene, their events come back through QProcess on the
+# maya event loop so the artist keeps working while it runs
+class BackgroundExport:
+    def __init__(self, mayaToUE:MayaToUE, workerCount, onEvent, parent = None):
+        self.mayaToUE = mayaToUE
+        self.workerCount = workerCount
+        self.onEvent = onEvent
+        self.parent = parent
+        self.isStarting = False
+        self.processes = []
+        self.tempDir = ""
+        self.fileCount = 0
+        self.startTime = 0.0
+
+    def SaveSnapshot(self):
+        # the scene as it is right now, saved or not, without renaming the artist's scene
+        snapshotPath = os.path.join(self.tempDir, self.mayaToUE.fileName + ".mb")
+        mc.file(snapshotPath, exportAll=True, type="mayaBinary", preserveReferences=True, force=True)
+        return snapshotPath
+
+    def Start(self):
+        self.mayaToUE.ValidateExport()
+        self.tempDir = tempfile.mkdtemp(prefix="MayaToUE")
+        self.startTime = time.perf_counter()
+        snapshotPath = self.SaveSnapshot()
+
+        clipGroups = SplitClipsForWorkers(self.mayaToUE.GetEnabledClips(), self.workerCount)
+        self.fileCount = sum(len(group) for group in clipGroups) + 1
+        env = QProcessEnvironment()
+        for name, value in GetWorkerEnv().items():
+            env.insert(name, value)
+
+        self.isStarting = True
+        for i, group in enumerate(clipGroups):
+            # the first worker also writes the skeletal mesh, the rest only need their clips
+            settings = self.mayaToUE.GetSettings()
+            settings["clips"] = [self.mayaToUE.GetClipSettings(clip) for clip in group]
+            settings["exportSkeletalMesh"] = i == 0
+            settings["pruneWeights"] = settings["pruneWeights"] and i == 0
+            settingsPath = os.path.join(self.tempDir, f"worker{i}_settings.json")
+            with open(settingsPath, "w") as settingsFile:
+                json.dump(settings, settingsFile)
+
+            resultPath = os.path.join(self.tempDir, f"worker{i}_result.json")
+            # parented to the window so qt owns the process while it runs, it is deleted once the export is over
+            process = QProcess(self.parent)
+            process.setProcessEnvironment(env)
+            process.readyReadStandardOutput.connect(lambda process=process: self.ReadEvents(process))
+            process.finished.connect(lambda exitCode, exitStatus, process=process, resultPath=resultPath: self.WorkerFinished(process, resultPath))
+            process.errorOccurred.connect(lambda error, process=process: self.WorkerFailed(process, error))
+            process.start(GetMayapyPath(), [os.path.join(SRC_DIR, "Batch.py"), "export", snapshotPath, "--worker", "--progress",
+                                            "--result", resultPath, "--exportSettings", settingsPath])
+            self.processes.append(process)
+        self.isStarting = False
+
+        self.onEvent({"kind" : "start", "files" : self.fileCount, "workers" : len(self.processes)})
+        if not self.IsRunning():
+            self.Finish("done")
+
+    def IsRunning(self):
+        return any(process.state() != QProcess.NotRunning for process in self.processes)
+
+    def ReadEvents(self, process:QProcess):
+        while process.canReadLine():
+            line = bytes(process.readLine()).decode(errors="replace").strip()
+            if line.startswith(PROGRESS_PREFIX):
+                self.onEvent(json.loads(line[len(PROGRESS_PREFIX):]))
+
+    def WorkerFinished(self, process:QProcess, resultPath):
+        self.ReadEvents(process)
+        try:
+            with open(resultPath) as resultFile:
+                result = json.load(resultFile)
+        except (OSError, ValueError):
+            result = {"status" : "crashed", "error" : bytes(process.readAllStandardError()).decode(errors="replace")[-2000:]}
+
+        if result["status"] != "ok":
+            self.onEvent({"kind" : "error", "error" : result.get("error", "")})
+
+        if not self.IsRunning():
+            self.Finish("done")
+
+    def WorkerFailed(self, process:QProcess, error):
+        # a worker that never started sends no finished signal, this is the only word of it
+        if error != QProcess.FailedToStart:
+            return
+
+        self.onEvent({"kind" : "error", "error" : f"mayapy did not start: {process.errorString()}"})
+        if not self.isStarting and not self.IsRunning():
+            self.Finish("done")
+
+    def Cancel(self):
+        for process in self.processes:
+            process.finished.disconnect()
+            process.errorOccurred.disconnect()
+            process.kill()
+            process.waitForFinished(1000)
+        self.Finish("cancelled")
+
+    def Finish(self, status):
+        # a failed start and the last finished worker can both end the export, only the first one does
+        if not self.tempDir:
+            return
+
+        # this runs inside a process's finished slot, so the processes are only deleted once the slot has returned
+        for process in self.processes:
+            process.deleteLater()
+        self.processes = []
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+        self.tempDir = ""
+        self.onEvent({"kind" : status, "seconds" : time.perf_counter() - self.startTime})
+
+# Table model straight over MayaToUE.animationClips, the view only asks for the rows it shows
+class AnimClipTableModel(QAbstractTableModel):
+    COLUMNS = ("Export", "Subfix", "Min", "Max")
+
+    def __init__(self, mayaToUE:MayaToUE):
+        super().__init__()
+        self.mayaToUE = mayaToUE
+
+    def GetClips(self):
+        return self.mayaToUE.animationClips
+
+    def rowCount(self, parent = None):
+        return 0 if parent is not None and parent.isValid() else len(self.GetClips())
+
+    def columnCount(self, parent = None):
+        return 0 if parent is not None and parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role = Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, index, role = Qt.DisplayRole):
+        clip = self.GetClips()[index.row()]
+        column = index.column()
+        if column == 0:
+            return (Qt.Checked if clip.shouldExport else Qt.Unchecked) if role == Qt.CheckStateRole else None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return (clip.subfix, clip.frameMin, clip.frameMax)[column - 1]
+        return None
+
+    def setData(self, index, value, role = Qt.EditRole):
+        # edits are parsed once when the cell is committed, not on every keystroke
+        clip = self.GetClips()[index.row()]
+        column = index.column()
+        if column == 0 and role == Qt.CheckStateRole:
+            clip.shouldExport = Qt.CheckState(value) == Qt.Checked
+        elif column == 1 and role == Qt.EditRole and re.fullmatch(SUBFIX_PATTERN, str(value)):
+            clip.subfix = str(value)
+        elif column in (2, 3) and role == Qt.EditRole:
+            try:
+                frame = int(value)
+            except (TypeError, ValueError):
+                return False
+            if column == 2:
+                clip.frameMin = frame
+            else:
+                clip.frameMax = frame
+        else:
+            return False
+
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def AddClips(self, clips):
+        if not clips:
+            return
+        first = len(self.GetClips())
+        self.beginInsertRows(QModelIndex(), first, first + len(clips) - 1)
+        self.GetClips().extend(clips)
+        self.endInsertRows()
+
+    def RemoveRows(self, rows):
+        # from the bottom up in contiguous runs, so the clips leave the export with their rows
+        rows = sorted(set(rows), reverse=True)
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.GetClips()[first : last + 1]
+            self.endRemoveRows()
+
+class MayaToEUWidget(QMayaWindow):
+    usesSceneIndex = True
+
+    @classmethod
+    def GetWindowHash(cls):
+        return "MAYATOUEAWDOAWNONOLR"
+
+    def __init__(self):
+        super().__init__()
+        self.mayaToUE = MayaToUE()
+        self.setWindowTitle("Maya to UE")
+        
+        self.masterLayout = QVBoxLayout()
+        self.setLayout(self.masterLayout)
+
+        self.rootJntText = QLineEdit()
+        self.rootJntText.setEnabled(False)
+        self.masterLayout.addWidget(self.rootJntText)
+
+        setSelectionAsRootJntBtn = QPushButton("Set Root Joint")
+        setSelectionAsRootJntBtn.clicked.connect(self.SetSelectionAsRootJointBtnClicked)
+        self.masterLayout.addWidget(setSelectionAsRootJntBtn)
+
+        addRootJntBtn = QPushButton("Add Root Joint")
+        addRootJntBtn.clicked.connect(self.AddRootJntButtonClicked)
+        self.masterLayout.addWidget(addRootJntBtn)
+
+        self.meshList = QListWidget()
+        self.masterLayout.addWidget(self.meshList)
+        self.meshList.setFixedHeight(80)
+        addMeshBtn = QPushButton("Add Meshes")
+        addMeshBtn.clicked.connect(self.AddMeshBtnClicked)
+        self.masterLayout.addWidget(addMeshBtn)
+
+        clipButtonsLayout = QHBoxLayout()
+        addNewAnimClipEntryBtn = QPushButton("Add Animation Clip")
+        addNewAnimClipEntryBtn.clicked.connect(self.AddNewAnimClipEntryBtnClicked)
+        clipButtonsLayout.addWidget(addNewAnimClipEntryBtn)
+        importBookmarksBtn = QPushButton("From Bookmarks")
+        importBookmarksBtn.clicked.connect(self.ImportBookmarksBtnClicked)
+        clipButtonsLayout.addWidget(importBookmarksBtn)
+        importClipsFileBtn = QPushButton("From File")
+        importClipsFileBtn.clicked.connect(self.ImportClipsFileBtnClicked)
+        clipButtonsLayout.addWidget(importClipsFileBtn)
+        setRangeBtn = QPushButton("Set Range")
+        setRangeBtn.clicked.connect(self.SetRangeBtnClicked)
+        clipButtonsLayout.addWidget(setRangeBtn)
+        removeClipsBtn = QPushButton("Remove")
+        removeClipsBtn.clicked.connect(self.RemoveClipsBtnClicked)
+        clipButtonsLayout.addWidget(removeClipsBtn)
+        self.masterLayout.addLayout(clipButtonsLayout)
+
+        self.clipModel = AnimClipTableModel(self.mayaToUE)
+        self.clipTable = QTableView()
+        self.clipTable.setModel(self.clipModel)
+        self.clipTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.clipTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.clipTable.verticalHeader().setDefaultSectionSize(20)
+        self.masterLayout.addWidget(self.clipTable)
+
+        saveDirLayout = QHBoxLayout()
+        saveDirLayout.addWidget(QLabel("Save Directory: "))
+        self.saveDirText = QLineEdit()
+        self.saveDirText.setEnabled(False)
+        saveDirLayout.addWidget(self.saveDirText)
+        pickSaveDirBtn = QPushButton("...")
+        pickSaveDirBtn.clicked.connect(self.PickSaveDirBtnClicked)
+        saveDirLayout.addWidget(pickSaveDirBtn)
+        self.masterLayout.addLayout(saveDirLayout)
+
+        fileNameLayout = QHBoxLayout()
+        fileNameLayout.addWidget(QLabel("File Name: "))
+        self.fileNameText = QLineEdit()
+        self.fileNameText.setValidator(QRegExpValidator("[a-zA-Z0-9_]+"))
+        self.fileNameText.textChanged.connect(self.FileNameTextChanged)
+        fileNameLayout.addWidget(self.fileNameText)
+        self.masterLayout.addLayout(fileNameLayout)
+
+        weightsLayout = QHBoxLayout()
+        pruneWeightsCheckbox = QCheckBox("Prune Weights, Max Influences:")
+        pruneWeightsCheckbox.setChecked(self.mayaToUE.pruneWeights)
+        pruneWeightsCheckbox.toggled.connect(self.PruneWeightsCheckboxToggled)
+        weightsLayout.addWidget(pruneWeightsCheckbox)
+        maxInfluencesComboBox = QComboBox()
+        maxInfluencesComboBox.addItems(["4", "8", "12"])
+        maxInfluencesComboBox.setCurrentText(str(self.mayaToUE.maxInfluences))
+        maxInfluencesComboBox.currentTextChanged.connect(self.MaxInfluencesChanged)
+        weightsLayout.addWidget(maxInfluencesComboBox)
+        weightsLayout.addWidget(QLabel("Min Weight:"))
+        minWeightText = QLineEdit(str(self.mayaToUE.minWeight))
+        minWeightText.setValidator(QDoubleValidator(0.0, 0.5, 4))
+        minWeightText.textChanged.connect(self.MinWeightTextChanged)
+        weightsLayout.addWidget(minWeightText)
+        quantizeCheckbox = QCheckBox("8 Bit")
+        quantizeCheckbox.setChecked(self.mayaToUE.quantizeWeights)
+        quantizeCheckbox.toggled.connect(self.QuantizeCheckboxToggled)
+        weightsLayout.addWidget(quantizeCheckbox)
+        previewWeightsBtn = QPushButton("Preview")
+        previewWeightsBtn.clicked.connect(self.PreviewWeightsBtnClicked)
+        weightsLayout.addWidget(previewWeightsBtn)
+        self.masterLayout.addLayout(weightsLayout)
+
+        keysLayout = QHBoxLayout()
+        reduceKeysCheckbox = QCheckBox("Reduce Keys, Tolerance")
+        reduceKeysCheckbox.setChecked(self.mayaToUE.reduceKeys)
+        reduceKeysCheckbox.toggled.connect(self.ReduceKeysCheckboxToggled)
+        keysLayout.addWidget(reduceKeysCheckbox)
+        for group, label in (("translate", "Move:"), ("rotate", "Rotate:"), ("scale", "Scale:")):
+            keysLayout.addWidget(QLabel(label))
+            toleranceText = QLineEdit(str(self.mayaToUE.keyTolerances[group]))
+            toleranceText.setValidator(QDoubleValidator(0.0, 10.0, 4))
+            toleranceText.textChanged.connect(lambda newText, group=group: self.KeyToleranceTextChanged(group, newText))
+            keysLayout.addWidget(toleranceText)
+        self.masterLayout.addLayout(keysLayout)
+
+        exportBtn = QPushButton("Export")
+        exportBtn.clicked.connect(self.ExportBtnClicked)
+        self.masterLayout.addWidget(exportBtn)
+
+        backgroundLayout = QHBoxLayout()
+        self.backgroundExportBtn = QPushButton("Export in Background")
+        self.backgroundExportBtn.clicked.connect(self.BackgroundExportBtnClicked)
+        backgroundLayout.addWidget(self.backgroundExportBtn)
+        backgroundLayout.addWidget(QLabel("Workers:"))
+        self.workerCountComboBox = QComboBox()
+        self.workerCountComboBox.addItems(["1", "2", "4", "8"])
+        self.workerCountComboBox.setCurrentText("2")
+        backgroundLayout.addWidget(self.workerCountComboBox)
+        self.cancelExportBtn = QPushButton("Cancel")
+        self.cancelExportBtn.setEnabled(False)
+        self.cancelExportBtn.clicked.connect(self.CancelExportBtnClicked)
+        backgroundLayout.addWidget(self.cancelExportBtn)
+        self.masterLayout.addLayout(backgroundLayout)
+
+        self.exportProgressBar = QProgressBar()
+        self.masterLayout.addWidget(self.exportProgressBar)
+        self.exportLog = QListWidget()
+        self.exportLog.setFixedHeight(80)
+        self.masterLayout.addWidget(self.exportLog)
+        self.backgroundExport : BackgroundExport = None
+
+    def PickSaveDirBtnClicked(self):
+        saveDir = QFileDialog().getExistingDirectory(self, "Pick Save Directory")
+        if saveDir:
+            self.mayaToUE.saveDir = saveDir
+            self.saveDirText.setText(saveDir)
+
+    def FileNameTextChanged(self, newText):
+        self.mayaToUE.fileName = newText
+
+    def PruneWeightsCheckboxToggled(self, checked):
+        self.mayaToUE.pruneWeights = checked
+
+    def MaxInfluencesChanged(self, newText):
+        self.mayaToUE.maxInfluences = int(newText)
+
+    def MinWeightTextChanged(self, newText):
+        try:
+            self.mayaToUE.minWeight = float(newText)
+        except ValueError:
+            pass
+
+    def QuantizeCheckboxToggled(self, checked):
+        self.mayaToUE.quantizeWeights = checked
+
+    def ReduceKeysCheckboxToggled(self, checked):
+        self.mayaToUE.reduceKeys = checked
+
+    def KeyToleranceTextChanged(self, group, newText):
+        try:
+            self.mayaToUE.keyTolerances[group] = float(newText)
+        except ValueError:
+            pass
+
+    @TryAction
+    def PreviewWeightsBtnClicked(self):
+        report, _ = self.mayaToUE.PruneSkinWeights(apply=False)
+        QMessageBox().information(self, "Weight Pruning", self.mayaToUE.GetWeightReportText(report) or "No skinned meshes added")
+
+    @TryAction
+    def ExportBtnClicked(self):
+        exported = self.mayaToUE.ExportAll()
+        message = "Exported:\n" + "\n".join(exported)
+        if self.mayaToUE.clipReports:
+            message += "\n\nKeys:\n" + self.mayaToUE.GetKeyReportText(self.mayaToUE.clipReports)
+        QMessageBox().information(self, "Export", message)
+
+    @TryAction
+    def BackgroundExportBtnClicked(self):
+        self.exportLog.clear()
+        self.backgroundExport = BackgroundExport(self.mayaToUE, int(self.workerCountComboBox.currentText()), self.BackgroundExportEvent, self)
+        self.backgroundExport.Start()
+
+    def CancelExportBtnClicked(self):
+        if self.backgroundExport:
+            self.backgroundExport.Cancel()
+
+    def BackgroundExportEvent(self, event):
+        kind = event["kind"]
+        if kind == "start":
+            self.exportProgressBar.setRange(0, event["files"])
+            self.exportProgressBar.setValue(0)
+            self.exportLog.addItem(f"Exporting {event['files']} files with {event['workers']} workers")
+        elif kind in ("mesh", "clip"):
+            self.exportProgressBar.setValue(self.exportProgressBar.value() + 1)
+            self.exportLog.addItem(f"{event.get('clip', 'skeletal mesh')}: {event['seconds']:.1f}s {event['path']}")
+        elif kind == "error":
+            self.exportLog.addItem(f"Error: {event['error']}")
+        else:
+            self.exportLog.addItem(f"Export {kind} after {event['seconds']:.1f}s")
+        self.exportLog.scrollToBottom()
+
+        running = kind not in ("done", "cancelled")
+        self.backgroundExportBtn.setEnabled(not running)
+        self.cancelExportBtn.setEnabled(running)
+
+    def AddNewAnimClipEntryBtnClicked(self):
+        self.clipModel.AddClips([AnimClip()])
+
+    @TryAction
+    def ImportBookmarksBtnClicked(self):
+        clips = self.mayaToUE.GetClipsFromBookmarks()
+        if not clips:
+            raise Exception("No time slider bookmarks in the scene")
+        self.clipModel.AddClips(clips)
+
+    @TryAction
+    def ImportClipsFileBtnClicked(self):
+        path, _ = QFileDialog().getOpenFileName(self, "Import Clips", "", "Clips (*.csv *.json)")
+        if path:
+            self.clipModel.AddClips(self.mayaToUE.GetClipsFromFile(path))
+
+    def GetSelectedClipRows(self):
+        return sorted({index.row() for index in self.clipTable.selectionModel().selectedRows()})
+
+    def SetRangeBtnClicked(self):
+        rows = self.GetSelectedClipRows()
+        if rows:
+            clip = self.mayaToUE.animationClips[rows[0]]
+            mc.playbackOptions(e=True, min=clip.frameMin, max=clip.frameMax, ast=clip.frameMin, aet=clip.frameMax)
+
+    def RemoveClipsBtnClicked(self):
+        self.clipModel.RemoveRows(self.GetSelectedClipRows())
+
+    @TryAction
+    def AddMeshBtnClicked(self):
+        self.mayaToUE.AddMeshs()
+        self.meshList.clear()
+        self.meshList.addItems(GetNodeNames(self.mayaToUE.meshes))
+
+    @TryAction
+    def AddRootJntButtonClicked(self):
+        self.mayaToUE.AddRootJoint()
+        self.rootJntText.setText(self.mayaToUE.GetRootJntName())
+
+    @TryAction
+    def SetSelectionAsRootJointBtnClicked(self):
+        self.mayaToUE.SetSelectedAsRootJnt()
+        self.rootJntText.setText(self.mayaToUE.GetRootJntName())
@@ -1,45 +1,598 @@
 import maya.cmds as mc 
-import maya.OpenMayaUI as omui 
-import shiboken2 
 import maya.mel as mel
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import functools
+import json
+import os
+import threading
+import time
 
-from PySide2.QtWidgets import (QMainWindow, QWidget)
-from PySide2.QtCore import Qt
+# Runs a block of maya.cmds as one undo step with the viewport refresh suspended, undoing the whole block if it fails,
+# or always when keepChanges is off (scratch work like baking for an export). Scratch work needs undo to be on,
+# deleting the new nodes would not take back what it changed on the nodes that were already there.
+class BuildTransaction:
+    activeDepth = 0
+    chunkCount = 0
 
-def GetMayaMainWindow()->QMainWindow:
-    mayaMainWindow = omui.MQtUtil.mainWindow()
-    return shiboken2.wrapInstance(int(mayaMainWindow), QMainWindow)
+    def __init__(self, chunkName = "BuildTransaction", keepChanges = True):
+        self.chunkName = chunkName
+        self.keepChanges = keepChanges
+        self.undoWasOn = True
+        self.nodesBefore = None
+        self.undoNameBefore = None
 
-def DeleteWindowWithName(name):
-    for window in GetMayaMainWindow().findChildren(QWidget, name):
-        window.deleteLater()
+    def __enter__(self):
+        if BuildTransaction.activeDepth > 0:
+            BuildTransaction.activeDepth += 1
+            return self
 
-class QMayaWindow(QWidget):
+        self.undoWasOn = mc.undoInfo(q=True, state=True)
+        if not self.undoWasOn and not self.keepChanges:
+            raise Exception(f"{self.chunkName} changes the scene only for a while and needs undo to take it back, turn undo on first")
+
+        BuildTransaction.activeDepth += 1
+        if not self.undoWasOn:
+            # without undo the only way back is deleting whatever the build made
+            self.nodesBefore = set(mc.ls(long=True))
+
+        # numbered so the chunk never has the name of the step before it, an unchanged undo name means nothing was pushed
+        BuildTransaction.chunkCount += 1
+        self.undoNameBefore = mc.undoInfo(q=True, undoName=True)
+        mc.undoInfo(openChunk=True, chunkName=f"{self.chunkName} {BuildTransaction.chunkCount}")
+        mc.refresh(suspend=True)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        BuildTransaction.activeDepth -= 1
+        if BuildTransaction.activeDepth > 0:
+            return False
+
+        mc.refresh(suspend=False)
+        mc.undoInfo(closeChunk=True)
+        if excType is not None or not self.keepChanges:
+            self.Rollback()
+
+        return False
+
+    def Rollback(self):
+        if self.undoWasOn:
+            # a block that failed before its first undoable command left no chunk, an undo would take the user's last step
+            if mc.undoInfo(q=True, undoName=True) != self.undoNameBefore:
+                mc.undo()
+            return
+
+        newNodes = [node for node in mc.ls(long=True) if node not in self.nodesBefore]
+        if newNodes:
+            mc.delete([node for node in newNodes if mc.objExists(node)])
+
+MODIFIER_PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ModifierCommand.py")
+
+# modifiers waiting for the plugin command to pick them up, one at a time
+pendingModifiers = []
+
+def DoModifier(modifier):
+    # runs the modifier through an undoable command, so ctrl+z and an enclosing BuildTransaction take it back
+    if not mc.pluginInfo("ModifierCommand", q=True, loaded=True):
+        mc.loadPlugin(MODIFIER_PLUGIN_PATH, quiet=True)
+
+    pendingModifiers.append(modifier)
+    try:
+        mc.mayaToolsDoModifier()
+    finally:
+        pendingModifiers.clear()
+
+# Times tool operations and every maya.cmds call made inside them while a session is running. The maya.cmds functions
+# are swapped for timed ones only for the length of the session, so nothing is paid when no one is measuring.
+class InstrumentationSession:
     def __init__(self):
-        DeleteWindowWithName(self.GetWindowHash())
-        super().__init__(parent = GetMayaMainWindow())
-        self.setWindowFlags(Qt.WindowType.Window)
-        self.setObjectName(self.GetWindowHash())
+        self.startTime = time.perf_counter()
+        self.events = []
+        self.stack = []
+        self.commandCounts = {}
+        self.commandSeconds = {}
+        self.operationCounts = {}
+        self.operationSeconds = {}
+        self.originalCommands = {}
+
+    def GetMicroseconds(self, seconds):
+        return (seconds - self.startTime) * 1e6
+
+    def Record(self, name, category, start, end, args = None):
+        event = {"name" : name, "cat" : category, "ph" : "X", "ts" : self.GetMicroseconds(start), "dur" : (end - start) * 1e6, "pid" : 1, "tid" : threading.get_ident()}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+        counts, seconds = (self.commandCounts, self.commandSeconds) if category == "cmds" else (self.operationCounts, self.operationSeconds)
+        counts[name] = counts.get(name, 0) + 1
+        seconds[name] = seconds.get(name, 0.0) + end - start
+
+    def TimeCommand(self, name, command):
+        @functools.wraps(command)
+        def TimedCommand(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return command(*args, **kwargs)
+            finally:
+                self.Record(name, "cmds", start, time.perf_counter())
+        return TimedCommand
+
+    def PatchCommands(self):
+        for name, command in list(vars(mc).items()):
+            if callable(command) and not name.startswith("_"):
+                self.originalCommands[name] = command
+                setattr(mc, name, self.TimeCommand(name, command))
+
+    def RestoreCommands(self):
+        for name, command in self.originalCommands.items():
+            setattr(mc, name, command)
+        self.originalCommands = {}
+
+    def GetSummary(self):
+        def Table(counts, seconds):
+            rows = {name : {"count" : counts[name], "seconds" : seconds[name], "average" : seconds[name] / counts[name]} for name in counts}
+            return dict(sorted(rows.items(), key=lambda item: -item[1]["seconds"]))
+
+        return {
+            "seconds" : time.perf_counter() - self.startTime,
+            "cmdsCalls" : sum(self.commandCounts.values()),
+            "operations" : Table(self.operationCounts, self.operationSeconds),
+            "commands" : Table(self.commandCounts, self.commandSeconds),
+        }
+
+    def WriteChromeTrace(self, path):
+        # opens in chrome://tracing or ui.perfetto.dev
+        with open(path, "w") as traceFile:
+            json.dump({"traceEvents" : self.events, "displayTimeUnit" : "ms", "otherData" : self.GetSummary()}, traceFile)
+
+    def PrintSummary(self, top = 15):
+        summary = self.GetSummary()
+        print(f"{summary['cmdsCalls']} maya.cmds calls in {summary['seconds']:.3f}s")
+        for title in ("operations", "commands"):
+            for name, row in list(summary[title].items())[:top]:
+                print(f"  {name:<40} {row['count']:>7}  {row['seconds'] * 1000:>10.1f} ms")
+
+instrumentationSession : InstrumentationSession = None
+
+def StartInstrumentation():
+    global instrumentationSession
+    if instrumentationSession is None:
+        instrumentationSession = InstrumentationSession()
+        instrumentationSession.PatchCommands()
+    return instrumentationSession
+
+def StopInstrumentation(tracePath = None):
+    global instrumentationSession
+    session = instrumentationSession
+    if session is None:
+        return None
+
+    session.RestoreCommands()
+    instrumentationSession = None
+    if tracePath:
+        session.WriteChromeTrace(tracePath)
+    return session
+
+# Marks a tool operation in the trace, as a decorator or a with block. Costs one check when no session is running.
+class InstrumentedOperation:
+    def __init__(self, name = None):
+        self.name = name
+        self.starts = []
+
+    def __call__(self, func):
+        name = self.name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if instrumentationSession is None:
+                return func(*args, **kwargs)
+            with InstrumentedOperation(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.starts.append((instrumentationSession, time.perf_counter()))
+        if instrumentationSession is not None:
+            instrumentationSession.stack.append(self.name)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        session, start = self.starts.pop()
+        if session is not None:
+            session.stack.pop()
+            args = {"parent" : session.stack[-1]} if session.stack else None
+            if excType is not None:
+                args = dict(args or {}, error=f"{excType.__name__}: {excValue}")
+            session.Record(self.name, "operation", start, time.perf_counter(), args)
+        return False
+
+def TimePlayback(frameMin = None, frameMax = None, pullPlugs = None):
+    # steps the timeline with a forced redraw per frame, the frame rate an animator would see while scrubbing.
+    # with no viewport to redraw, pullPlugs are evaluated every frame in its place
+    frameMin = mc.playbackOptions(q=True, min=True) if frameMin is None else frameMin
+    frameMax = mc.playbackOptions(q=True, max=True) if frameMax is None else frameMax
+    currentFrame = mc.currentTime(q=True)
+    frames = range(int(frameMin), int(frameMax) + 1)
+
+    startTime = time.perf_counter()
+    for frame in frames:
+        mc.currentTime(frame, update=True)
+        if pullPlugs:
+            mc.dgeval(pullPlugs)
+        else:
+            mc.refresh(force=True)
+    elapsed = time.perf_counter() - startTime
+
+    mc.currentTime(currentFrame)
+    return len(frames) / elapsed if elapsed > 0 else 0.0
+
+# node types the evaluation manager always runs on its own, on top of any scheduling overrides set in the scene
+SERIAL_NODE_TYPES = {"expression" : "expression, globally serialized"}
+
+def GetParallelEvaluationBlockers(nodes):
+    nodes = list(nodes)
+    neighbours = mc.listConnections(nodes, s=True, d=True, sh=True) or []
+    nodeTypes = MayaGraph().GetNodeTypes(list(set(nodes + neighbours)))
+
+    blockingTypes = dict(SERIAL_NODE_TYPES)
+    for flag, reason in (("ntu", "untrusted"), ("ntg", "globally serialized"), ("nts", "serialized")):
+        for typeName in mc.evaluationManager(q=True, **{flag: True}) or []:
+            blockingTypes.setdefault(typeName, f"{typeName}, {reason} override")
+
+    return {node : blockingTypes[nodeType] for node, nodeType in nodeTypes.items() if nodeType in blockingTypes}
+
+def GetNodeName(obj):
+    if obj.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(obj).partialPathName()
+    return om.MFnDependencyNode(obj).name()
+
+def GetShortName(name):
+    # the node's own name without the dag path, what new node names are built from
+    return name.rsplit("|", 1)[-1]
+
+# A node held by its MObjectHandle and uuid instead of its name. The name is read off the node when a command needs it,
+# so a rename, a reparent or another node taking the same short name never sends a command to the wrong node.
+class NodeHandle:
+    __slots__ = ("handle", "uuid", "dagPath", "longName")
+
+    def __init__(self, obj):
+        self.handle = om.MObjectHandle(obj)
+        self.uuid = om.MFnDependencyNode(obj).uuid().asString()
+        self.dagPath = om.MDagPath.getAPathTo(obj) if obj.hasFn(om.MFn.kDagNode) else None
+        # tells apart the nodes that share the uuid, a file referenced twice gives both copies the same uuids
+        self.longName = self.dagPath.fullPathName() if self.dagPath else om.MFnDependencyNode(obj).name()
+
+    def IsValid(self):
+        return self.handle.isValid() or bool(mc.ls(self.uuid))
+
+    def GetObject(self):
+        if not self.handle.isValid():
+            # a reopened scene or an undone delete brings the node back as a new MObject with the same uuid
+            names = mc.ls(self.uuid, long=True)
+            if not names:
+                raise Exception(f"The node {self.uuid} no longer exists")
+            if len(names) > 1:
+                if self.longName not in names:
+                    raise Exception(f"The node {self.longName} is gone and {len(names)} other nodes share its uuid")
+                names = [self.longName]
+            selection = om.MSelectionList()
+            selection.add(names[0])
+            self.handle = om.MObjectHandle(selection.getDependNode(0))
+            self.dagPath = None
+        return self.handle.object()
+
+    def GetDagPath(self):
+        obj = self.GetObject()
+        if self.dagPath is None or not self.dagPath.isValid():
+            self.dagPath = om.MDagPath.getAPathTo(obj)
+            self.longName = self.dagPath.fullPathName()
+        return self.dagPath
+
+    def GetName(self):
+        obj = self.GetObject()
+        if obj.hasFn(om.MFn.kDagNode):
+            return self.GetDagPath().partialPathName()
+        return om.MFnDependencyNode(obj).name()
+
+    def GetLongName(self):
+        obj = self.GetObject()
+        if obj.hasFn(om.MFn.kDagNode):
+            self.longName = self.GetDagPath().fullPathName()
+        else:
+            self.longName = om.MFnDependencyNode(obj).name()
+        return self.longName
+
+    def GetShortName(self):
+        return GetShortName(self.GetName())
+
+    # the live MObject decides while both handles are valid, two referenced copies of a node share a uuid.
+    # the uuid outlives the MObject, so it only stands in for a handle that went stale after an undo or reopen
+    def __eq__(self, other):
+        if not isinstance(other, NodeHandle):
+            return False
+        if self.handle.isValid() and other.handle.isValid():
+            return self.handle.object() == other.handle.object()
+        return self.uuid == other.uuid
+
+    # equal handles always share a uuid, nodes that only share the uuid just land in the same bucket
+    def __hash__(self):
+        return hash(self.uuid)
+
+    def __repr__(self):
+        return f"NodeHandle({self.GetName() if self.handle.isValid() else self.uuid})"
+
+def GetComponentIndices(components):
+    # "mesh.f[12]" to 12 for flattened components, whatever path the mesh has
+    return {int(component.rsplit("[", 1)[1].rstrip("]")) for component in components}
+
+def GetNodeHandles(names):
+    # the whole batch goes through one selection list, a name that is missing or matches more than one node fails here
+    selection = om.MSelectionList()
+    indexOfName = {}
+    for name in names:
+        if name in indexOfName:
+            continue
+
+        length = selection.length()
+        try:
+            selection.add(name)
+        except RuntimeError:
+            raise Exception(f"{name} does not exist or matches more than one node")
+        if selection.length() == length:
+            # the same node under another of its names, the list merged it into the entry it already had
+            single = om.MSelectionList()
+            single.add(name)
+            indexOfName[name] = next(i for i in range(length) if selection.getDependNode(i) == single.getDependNode(0))
+        else:
+            indexOfName[name] = length
+
+    handles = [NodeHandle(selection.getDependNode(i)) for i in range(selection.length())]
+    return [handles[indexOfName[name]] for name in names]
+
+def GetNodeHandle(name):
+    return GetNodeHandles([name])[0]
+
+def GetNodeNames(handles):
+    return [handle.GetName() for handle in handles]
+
+# Node types, transform to shapes and shape to deformers for the whole scene, built with one pass over the scene
+# and kept current by node added/removed/renamed callbacks. Changed nodes are re-read the next time the index is asked.
+class SceneIndex:
+    def __init__(self):
+        self.Clear()
+        self.callbackIds = []
+        self.sceneCallbackIds = []
+
+    def Clear(self):
+        self.nodeTypes = {}
+        self.typeToNodes = {}
+        self.shapesOfTransform = {}
+        self.transformOfShape = {}
+        self.deformersOfShape = {}
+        self.shapesOfDeformer = {}
+        self.nameOfHandle = {}
+        self.pending = {}
+
+    def Build(self):
+        nodeIt = om.MItDependencyNodes()
+        while not nodeIt.isDone():
+            self.AddNode(nodeIt.thisNode())
+            nodeIt.next()
+
+        deformerIt = om.MItDependencyNodes(om.MFn.kGeometryFilt)
+        while not deformerIt.isDone():
+            self.ReadDeformer(GetNodeName(deformerIt.thisNode()))
+            deformerIt.next()
+
+        self.AddCallbacks()
+
+    def AddSceneCallbacks(self):
+        # a new or opened scene removes or replaces every node, the node callbacks are off for that and the index is read again after
+        for message in (om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen):
+            self.sceneCallbackIds.append(om.MSceneMessage.addCallback(message, self.SceneClosing))
+        for message in (om.MSceneMessage.kAfterNew, om.MSceneMessage.kAfterOpen):
+            self.sceneCallbackIds.append(om.MSceneMessage.addCallback(message, self.SceneOpened))
+
+    def SceneClosing(self, clientData):
+        self.RemoveCallbacks()
+        self.Clear()
+
+    def SceneOpened(self, clientData):
+        self.Clear()
+        self.Build()
+
+    def AddCallbacks(self):
+        self.callbackIds.append(om.MDGMessage.addNodeAddedCallback(self.NodeAdded, "dependNode"))
+        self.callbackIds.append(om.MDGMessage.addNodeRemovedCallback(self.NodeRemoved, "dependNode"))
+        self.callbackIds.append(om.MNodeMessage.addNameChangedCallback(om.MObject(), self.NodeRenamed))
+        self.callbackIds.append(om.MDagMessage.addParentAddedCallback(self.ParentAdded))
+        self.callbackIds.append(om.MDGMessage.addConnectionCallback(self.ConnectionChanged))
+
+    def RemoveCallbacks(self):
+        if self.callbackIds:
+            om.MMessage.removeCallbacks(self.callbackIds)
+        self.callbackIds = []
+
+    def RemoveSceneCallbacks(self):
+        if self.sceneCallbackIds:
+            om.MMessage.removeCallbacks(self.sceneCallbackIds)
+        self.sceneCallbackIds = []
+
+    def MarkPending(self, obj):
+        handle = om.MObjectHandle(obj)
+        self.pending[handle.hashCode()] = handle
+
+    def NodeAdded(self, obj, clientData):
+        self.MarkPending(obj)
+
+    def NodeRemoved(self, obj, clientData):
+        hashCode = om.MObjectHandle(obj).hashCode()
+        self.pending.pop(hashCode, None)
+        if hashCode in self.nameOfHandle:
+            self.RemoveName(self.nameOfHandle.pop(hashCode))
+
+    def NodeRenamed(self, obj, prevName, clientData):
+        hashCode = om.MObjectHandle(obj).hashCode()
+        if hashCode in self.nameOfHandle:
+            self.RemoveName(self.nameOfHandle.pop(hashCode))
+        self.MarkPending(obj)
+
+    def ParentAdded(self, child, parent, clientData):
+        self.NodeRenamed(child.node(), "", clientData)
+
+    def ConnectionChanged(self, srcPlug, dstPlug, made, clientData):
+        if srcPlug.node().hasFn(om.MFn.kGeometryFilt):
+            self.MarkPending(srcPlug.node())
+
+    def AddNode(self, obj):
+        name = GetNodeName(obj)
+        nodeType = om.MFnDependencyNode(obj).typeName
+        self.nameOfHandle[om.MObjectHandle(obj).hashCode()] = name
+        self.nodeTypes[name] = nodeType
+        self.typeToNodes.setdefault(nodeType, set()).add(name)
+
+        if obj.hasFn(om.MFn.kShape):
+            dagFn = om.MFnDagNode(obj)
+            if dagFn.parentCount():
+                self.LinkShape(name, GetNodeName(dagFn.parent(0)))
+        elif obj.hasFn(om.MFn.kTransform):
+            dagFn = om.MFnDagNode(obj)
+            for i in range(dagFn.childCount()):
+                child = dagFn.child(i)
+                if child.hasFn(om.MFn.kShape):
+                    self.LinkShape(GetNodeName(child), name)
+
+        return name
+
+    def LinkShape(self, shape, transform):
+        self.transformOfShape[shape] = transform
+        shapes = self.shapesOfTransform.setdefault(transform, [])
+        if shape not in shapes:
+            shapes.append(shape)
+
+    def ReadDeformer(self, deformer):
+        selection = om.MSelectionList()
+        selection.add(deformer)
+        self.UnlinkDeformer(deformer)
+        shapes = [GetNodeName(obj) for obj in oma.MFnGeometryFilter(selection.getDependNode(0)).getOutputGeometry()]
+        self.shapesOfDeformer[deformer] = shapes
+        for shape in shapes:
+            self.deformersOfShape.setdefault(shape, []).append(deformer)
+
+    def UnlinkDeformer(self, deformer):
+        for shape in self.shapesOfDeformer.pop(deformer, []):
+            deformers = self.deformersOfShape.get(shape, [])
+            if deformer in deformers:
+                deformers.remove(deformer)
+
+    def RemoveName(self, name):
+        nodeType = self.nodeTypes.pop(name, None)
+        if nodeType:
+            self.typeToNodes[nodeType].discard(name)
+
+        transform = self.transformOfShape.pop(name, None)
+        if name in self.shapesOfTransform.get(transform, []):
+            self.shapesOfTransform[transform].remove(name)
+
+        for shape in self.shapesOfTransform.pop(name, []):
+            self.transformOfShape.pop(shape, None)
+
+        self.UnlinkDeformer(name)
+        for deformer in self.deformersOfShape.pop(name, []):
+            if name in self.shapesOfDeformer.get(deformer, []):
+                self.shapesOfDeformer[deformer].remove(name)
+
+    def Flush(self):
+        if not self.pending:
+            return
+
+        pending = list(self.pending.values())
+        self.pending = {}
+        for handle in pending:
+            if not handle.isValid():
+                continue
+
+            obj = handle.object()
+            oldName = self.nameOfHandle.get(handle.hashCode())
+            if oldName:
+                self.RemoveName(oldName)
+
+            name = self.AddNode(obj)
+            if obj.hasFn(om.MFn.kGeometryFilt):
+                self.ReadDeformer(name)
+
+    def GetType(self, obj):
+        self.Flush()
+        return self.nodeTypes.get(obj)
+
+    def GetNodesOfType(self, nodeType):
+        self.Flush()
+        return list(self.typeToNodes.get(nodeType, []))
+
+    def GetShapes(self, obj):
+        self.Flush()
+        return list(self.shapesOfTransform.get(obj, []))
+
+    def GetDeformers(self, shape):
+        self.Flush()
+        return list(self.deformersOfShape.get(shape, []))
+
+    def IsMesh(self, obj):
+        return any(self.nodeTypes.get(shape) == "mesh" for shape in self.GetShapes(obj))
+
+sceneIndex : SceneIndex = None
+
+# the open windows that use the index, it goes away with the last of them
+sceneIndexUsers = set()
+
+def EnableSceneIndex(user = None):
+    global sceneIndex
+    if user is not None:
+        sceneIndexUsers.add(user)
+    if sceneIndex is None:
+        sceneIndex = SceneIndex()
+        sceneIndex.Build()
+        sceneIndex.AddSceneCallbacks()
+    return sceneIndex
+
+def DisableSceneIndex(user = None):
+    global sceneIndex
+    sceneIndexUsers.discard(user)
+    if user is not None and sceneIndexUsers:
+        return
+
+    if sceneIndex is not None:
+        sceneIndex.RemoveCallbacks()
+        sceneIndex.RemoveSceneCallbacks()
+    sceneIndex = None
 
-    def GetWindowHash(self):
-        return "dasdaasdawdawsdaefsddfgds"
-    
 def IsMesh(obj):
+    if sceneIndex is not None and sceneIndex.GetType(obj) is not None:
+        return sceneIndex.IsMesh(obj)
+
     shapes = mc.listRelatives(obj, s=True)
     if not shapes:
         return False
     
     for s in shapes:
-        if mc.objectTypes(s) == "mesh":
+        if mc.objectType(s) == "mesh":
             return True
         
     return False
 
+def GetObjectType(obj):
+    if sceneIndex is not None:
+        nodeType = sceneIndex.GetType(obj)
+        if nodeType is not None:
+            return nodeType
+    return mc.objectType(obj)
+
 def IsSkin(obj):
-    return mc.objectType(obj) == "skinCluster"
+    return GetObjectType(obj) == "skinCluster"
 
 def IsJoint(obj):
-    return mc.objectType(obj) == "joint"
+    return GetObjectType(obj) == "joint"
 
 def GetUpperStream(obj):
     return mc.listConnections(obj, s=True, d=False, sh=True)
@@ -47,25 +600,62 @@ def GetUpperStream(obj):
 def GetLowerStream(obj):
     return mc.listConnections(obj, s=False, d=True, sh=True)
 
-def GetAllConnectIn(obj, NextFunc, searchDepth = 10, Filter = None):
-    AllFound = set()
-    nexts = NextFunc(obj)
-    while nexts and searchDepth > 0:
-        for next in nexts:
-            AllFound.add(next)
+def GetAllConnectIn(obj, upstream = True, searchDepth = 10, nodeType = None, Filter = None):
+    # nodeType is answered from the types the walk already read, Filter is any other check made per node
+    walk = GraphWalk(obj, upstream, searchDepth)
+    found = walk.GetNodesOfType(nodeType) if nodeType else walk.nodes
+    if not Filter:
+        return list(found)
+
+    return [node for node in found if Filter(node)]
 
-        nexts = NextFunc(nexts)
-        if nexts:
-            nexts = [x for x in nexts if x not in AllFound]
+# Answers the graph questions for a GraphWalk with one maya.cmds call per search level
+class MayaGraph:
+    def GetNeighbours(self, nodes, upstream):
+        if upstream:
+            return mc.listConnections(nodes, s=True, d=False, sh=True) or []
+        return mc.listConnections(nodes, s=False, d=True, sh=True) or []
 
-        searchDepth -=1
+    def GetNodeTypes(self, nodes):
+        nodesAndTypes = mc.ls(nodes, showType=True) or []
+        return dict(zip(nodesAndTypes[::2], nodesAndTypes[1::2]))
 
-    if not Filter:
-        return list(AllFound)
-    
-    filtered = []
-    for found in AllFound:
-        if Filter(found):
-            filtered.append(found)
+# One breadth first walk up or down the graph from obj, every filter asked of it afterwards is answered from the walk
+class GraphWalk:
+    def __init__(self, obj, upstream = True, searchDepth = None, graph = None):
+        self.obj = obj
+        self.upstream = upstream
+        self.searchDepth = searchDepth
+        self.graph = graph if graph else MayaGraph()
+        self.nodes = []
+        self.nodeTypes = {}
+        self.filterCache = {}
+        self.Walk()
+
+    def Walk(self):
+        visited = {self.obj}
+        frontier = [self.obj]
+        depth = 0
+        while frontier and (self.searchDepth is None or depth < self.searchDepth):
+            nexts = []
+            for node in self.graph.GetNeighbours(frontier, self.upstream):
+                if node not in visited:
+                    visited.add(node)
+                    nexts.append(node)
+
+            if nexts:
+                self.nodeTypes.update(self.graph.GetNodeTypes(nexts))
+                self.nodes.extend(nexts)
+
+            frontier = nexts
+            depth += 1
+
+    def IterNodesOfType(self, *typeNames):
+        for node in self.nodes:
+            if self.nodeTypes.get(node) in typeNames:
+                yield node
 
-    return filtered
\ No newline at end of file
+    def GetNodesOfType(self, *typeNames):
+        if typeNames not in self.filterCache:
+            self.filterCache[typeNames] = list(self.IterNodesOfType(*typeNames))
+        return self.filterCache[typeNames]
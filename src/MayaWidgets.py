@@ -0,0 +1,72 @@
+# The Qt side of the tools, kept out of MayaUtils so batch jobs and scripts can use the tools without PySide2
+from MayaUtils import InstrumentedOperation, EnableSceneIndex, DisableSceneIndex
+from PySide2.QtWidgets import (QMainWindow, QMessageBox, QWidget)
+from PySide2.QtCore import Qt
+
+def GetMayaMainWindow()->QMainWindow:
+    # imported here so the rest of the utils can load outside of a maya ui session
+    import maya.OpenMayaUI as omui 
+    import shiboken2 
+    mayaMainWindow = omui.MQtUtil.mainWindow()
+    return shiboken2.wrapInstance(int(mayaMainWindow), QMainWindow)
+
+# open tool windows by window hash, kept across a reload of this module so a reloaded tool can still find its old window
+liveWindows = globals().get("liveWindows", {})
+
+def IsWindowAlive(window):
+    import shiboken2
+    return window is not None and shiboken2.isValid(window)
+
+def DeleteLiveWindow(name):
+    window = liveWindows.pop(name, None)
+    if IsWindowAlive(window):
+        window.close()
+        window.deleteLater()
+
+class QMayaWindow(QWidget):
+    def __init__(self):
+        DeleteLiveWindow(self.GetWindowHash())
+        super().__init__(parent = GetMayaMainWindow())
+        self.setWindowFlags(Qt.WindowType.Window)
+        self.setObjectName(self.GetWindowHash())
+        liveWindows[self.GetWindowHash()] = self
+
+    @classmethod
+    def GetWindowHash(cls):
+        return "dasdaasdawdawsdaefsddfgds"
+
+    # the scene index is kept only while a window that reads it is open
+    usesSceneIndex = False
+
+    def showEvent(self, event):
+        if self.usesSceneIndex:
+            EnableSceneIndex(self.GetWindowHash())
+        super().showEvent(event)
+
+    def closeEvent(self, event):
+        if self.usesSceneIndex:
+            DisableSceneIndex(self.GetWindowHash())
+        super().closeEvent(event)
+
+    @classmethod
+    def ShowWindow(cls):
+        # brings back the window that is already built, only the first open or a reloaded class builds a new one
+        window = liveWindows.get(cls.GetWindowHash())
+        if not IsWindowAlive(window) or type(window) is not cls:
+            window = cls()
+
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        return window
+
+# a button action that shows its error in a message box instead of only the script editor
+def TryAction(action):
+    action = InstrumentedOperation(action.__qualname__)(action)
+    def wrapper(*args, **kwargs):
+        try:
+            action(*args, **kwargs)
+        except Exception as e:
+            QMessageBox().critical(None, "Error", f"{e}")
+
+    return wrapper
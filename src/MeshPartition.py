@@ -0,0 +1,133 @@
+import copy
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.cmds as mc
+
+# Data oriented class, the face-vertex topology of a mesh read once as flat arrays
+class MeshTopology:
+    def __init__(self, points, faceVertCounts, faceVertIndices, uValues = None, vValues = None, faceVertUVs = None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.faceVertCounts = np.asarray(faceVertCounts, dtype=np.int64)
+        self.faceVertIndices = np.asarray(faceVertIndices, dtype=np.int64)
+        self.uValues = uValues
+        self.vValues = vValues
+        self.faceVertUVs = faceVertUVs
+        self.faceOffsets = np.r_[0, np.cumsum(self.faceVertCounts)[:-1]]
+        self.faceOfFaceVert = np.repeat(np.arange(self.GetFaceCount()), self.faceVertCounts)
+
+    @classmethod
+    def FromMesh(cls, mesh):
+        selection = om.MSelectionList()
+        selection.add(mesh)
+        meshPath = selection.getDagPath(0)
+        meshPath.extendToShape()
+        meshFn = om.MFnMesh(meshPath)
+
+        faceVertCounts, faceVertIndices = meshFn.getVertices()
+        points = [(p.x, p.y, p.z) for p in meshFn.getPoints(om.MSpace.kWorld)]
+
+        uValues, vValues, faceVertUVs = None, None, None
+        uvCounts, uvIds = meshFn.getAssignedUVs()
+        if len(uvIds) == len(faceVertIndices): # only carry uvs over when every face is mapped
+            us, vs = meshFn.getUVs()
+            uValues = np.array(us, dtype=np.float64)
+            vValues = np.array(vs, dtype=np.float64)
+            faceVertUVs = np.array(uvIds, dtype=np.int64)
+
+        return cls(points, np.array(faceVertCounts), np.array(faceVertIndices), uValues, vValues, faceVertUVs)
+
+    # Stand in for a real mesh, a rows by cols quad grid on the xz plane
+    @classmethod
+    def Grid(cls, rows, cols, size = 1.0):
+        xs, zs = np.meshgrid(np.arange(cols + 1) * size, np.arange(rows + 1) * size)
+        points = np.stack([xs.ravel(), np.zeros(xs.size), zs.ravel()], axis=1)
+
+        corners = (np.arange(rows)[:, None] * (cols + 1) + np.arange(cols)).ravel()
+        faceVertIndices = np.stack([corners, corners + 1, corners + cols + 2, corners + cols + 1], axis=1).ravel()
+        return cls(points, np.full(rows * cols, 4), faceVertIndices)
+
+    def GetVertCount(self):
+        return self.points.shape[0]
+
+    def GetFaceCount(self):
+        return self.faceVertCounts.shape[0]
+
+    def GetFaceVertSlots(self, faces):
+        # index into faceVertIndices for every face-vertex of the given faces, in face order
+        counts = self.faceVertCounts[faces]
+        starts = np.repeat(self.faceOffsets[faces] - np.r_[0, np.cumsum(counts)[:-1]], counts)
+        return starts + np.arange(counts.sum())
+
+# Data oriented class, one compacted piece of the source mesh
+class MeshSegment:
+    def __init__(self, owner, faces, vertMap, points, faceVertCounts, faceVertIndices):
+        self.owner = owner
+        self.faces = faces
+        self.vertMap = vertMap # segment vertex i is source vertex vertMap[i]
+        self.points = points
+        self.faceVertCounts = faceVertCounts
+        self.faceVertIndices = faceVertIndices
+        self.uValues = None
+        self.vValues = None
+        self.faceVertUVs = None
+
+def GetFaceOwnerPairs(topology:MeshTopology, vertOwners:np.ndarray):
+    # a face goes to every owner of any of its vertices, same as converting the owned verts to faces
+    owners = vertOwners[topology.faceVertIndices]
+    keys = np.unique(owners * topology.GetFaceCount() + topology.faceOfFaceVert)
+    return keys // topology.GetFaceCount(), keys % topology.GetFaceCount()
+
+def BuildSegment(topology:MeshTopology, owner, faces):
+    slots = topology.GetFaceVertSlots(faces)
+    vertMap, localIndices = np.unique(topology.faceVertIndices[slots], return_inverse=True)
+    segment = MeshSegment(owner, faces, vertMap, topology.points[vertMap], topology.faceVertCounts[faces], localIndices)
+
+    if topology.faceVertUVs is not None:
+        uvMap, localUVs = np.unique(topology.faceVertUVs[slots], return_inverse=True)
+        segment.uValues = topology.uValues[uvMap]
+        segment.vValues = topology.vValues[uvMap]
+        segment.faceVertUVs = localUVs
+
+    return segment
+
+def GetSegmentInSpace(segment:MeshSegment, worldMatrix):
+    # a copy with the points moved into the space of worldMatrix (16 floats, maya's row vector order), the topology is shared
+    inverse = np.linalg.inv(np.asarray(worldMatrix, dtype=np.float64).reshape(4, 4))
+    localSegment = copy.copy(segment)
+    localSegment.points = segment.points @ inverse[:3, :3] + inverse[3, :3]
+    return localSegment
+
+def GetFacesPerOwner(topology:MeshTopology, vertOwners:np.ndarray, influenceCount):
+    owners, faces = GetFaceOwnerPairs(topology, np.asarray(vertOwners))
+    counts = np.bincount(owners, minlength=influenceCount)
+    return np.split(faces, np.cumsum(counts)[:-1])
+
+def GetSegmentVertMaps(topology:MeshTopology, facesPerOwner, owners):
+    # the source vertices of those owners' segments without building them
+    return {owner : np.unique(topology.faceVertIndices[topology.GetFaceVertSlots(facesPerOwner[owner])]) for owner in owners if facesPerOwner[owner].size}
+
+def PartitionMesh(topology:MeshTopology, vertOwners:np.ndarray, influenceCount, ownersToBuild = None, facesPerOwner = None):
+    # ownersToBuild limits the segments built to those owners, the rest come back as None.
+    # facesPerOwner is GetFacesPerOwner's result when the caller already has it
+    if facesPerOwner is None:
+        facesPerOwner = GetFacesPerOwner(topology, vertOwners, influenceCount)
+
+    segments = []
+    for owner, ownedFaces in enumerate(facesPerOwner):
+        shouldBuild = ownedFaces.size and (ownersToBuild is None or owner in ownersToBuild)
+        segments.append(BuildSegment(topology, owner, ownedFaces) if shouldBuild else None)
+
+    return segments
+
+def CreateMeshFromSegment(segment:MeshSegment, name):
+    meshFn = om.MFnMesh()
+    transform = meshFn.create(om.MPointArray(segment.points.tolist()), segment.faceVertCounts.tolist(), segment.faceVertIndices.tolist())
+    if segment.faceVertUVs is not None:
+        meshFn.setUVs(segment.uValues.tolist(), segment.vValues.tolist())
+        meshFn.assignUVs(segment.faceVertCounts.tolist(), segment.faceVertUVs.tolist())
+
+    return mc.rename(om.MFnDagNode(transform).partialPathName(), name)
+
+def AssignShadingLike(meshes, sourceShape):
+    shadingGroups = mc.listConnections(sourceShape, type="shadingEngine") or ["initialShadingGroup"]
+    mc.sets(meshes, e=True, forceElement=shadingGroups[0])
@@ -0,0 +1,39 @@
+import maya.api.OpenMaya as om
+
+# Maya plugin with one command that runs an MDGModifier handed over by MayaUtils.DoModifier, so the api edits of the
+# modifier are one step on maya's undo queue like any maya.cmds call. Loaded on first use, never imported by the tools.
+
+COMMAND_NAME = "mayaToolsDoModifier"
+
+def maya_useNewAPI():
+    pass
+
+class DoModifierCommand(om.MPxCommand):
+    def __init__(self):
+        super().__init__()
+        self.modifier = None
+
+    def doIt(self, args):
+        # imported when the command runs, so a reloaded MayaUtils hands over its own modifiers
+        import MayaUtils
+        self.modifier = MayaUtils.pendingModifiers.pop(0)
+        self.modifier.doIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+    @staticmethod
+    def Create():
+        return DoModifierCommand()
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, "MayaTools").registerCommand(COMMAND_NAME, DoModifierCommand.Create)
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)
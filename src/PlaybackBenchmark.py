@@ -0,0 +1,221 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+import maya.cmds as mc
+
+# Plays reference rigs built by the tools in DG, EM serial and EM parallel evaluation and keeps the frame rates in a json history:
+#   mayapy src/PlaybackBenchmark.py
+#   mayapy src/PlaybackBenchmark.py --rig limbs --size 1 --size 10 --size 50 --history D:/perf/playback.json
+#   inside maya: import PlaybackBenchmark; PlaybackBenchmark.RunPlaybackBenchmarks(["proxy", "skinned"], [10])
+# Fails when a rig plays slower than its last recorded run on the same maya version by more than --tolerance.
+# Each run starts a new scene, so it refuses to start over unsaved changes unless discardChanges is set.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.environ.get("MAYATOOLS_PLAYBACK_HISTORY", os.path.join(os.path.expanduser("~"), ".cache", "MayaTools", "playbackHistory.json"))
+
+# emModeManager names for each evaluation mode
+EVALUATION_MODES = {"dg" : "dg", "serial" : "ems", "parallel" : "emp"}
+FRAME_RANGE = (1, 120)
+PROFILED_FRAMES = 24
+
+def BuildSkeleton(limbCount):
+    # the same layout as the benchmark's fake skeleton: a root, a spine and three joint limbs side by side
+    mc.select(cl=True)
+    root = mc.joint(n="root_jnt", p=(0, 12, 0))
+    mc.joint(n="spine_01", p=(0, 14, 0))
+    limbs = []
+    for i in range(limbCount):
+        side = "L" if i % 2 == 0 else "R"
+        mc.select(root, r=True)
+        limb = []
+        for part, position in zip(("upper", "lower", "end"), ((i * 10.0, 10.0, 0.0), (i * 10.0, 5.0, 1.0), (i * 10.0, 0.0, 0.0))):
+            limb.append(mc.joint(n=f"limb_{i:02d}_{side}_{part}", p=position))
+        limbs.append(limb)
+
+    mc.select(cl=True)
+    return root, limbs
+
+def KeySwing(objs, frameMin, frameMax, attributes = ("rotateX", "rotateZ")):
+    # a swing out and back, one setKeyframe call per key for every object
+    frameMid = (frameMin + frameMax) / 2
+    for attribute in attributes:
+        for frame, value in ((frameMin, 0), (frameMid, 35), (frameMax, 0)):
+            mc.setKeyframe(objs, attribute=attribute, t=frame, v=value)
+
+def BuildLimbRig(limbCount, frameMin, frameMax):
+    from LimbRiggingTool import LimbRigger
+    from ControllerShapes import GetControllerShapes, GetTransformOfShape
+
+    root, _ = BuildSkeleton(limbCount)
+    mc.select(root, r=True)
+    LimbRigger().RigAllLimbs()
+
+    fkCtrls = sorted({GetTransformOfShape(shape) for shape in GetControllerShapes()} & set(mc.ls("ac_fk_*", type="transform")))
+    KeySwing(fkCtrls, frameMin, frameMax)
+    return [f"{jnt}.worldMatrix" for jnt in mc.ls("limb_*_end", type="joint")]
+
+def BuildSkinnedLimbs(limbCount):
+    # a cylinder down every limb combined into one mesh, bound to the whole skeleton
+    root, limbs = BuildSkeleton(limbCount)
+    cylinders = []
+    for i in range(limbCount):
+        cylinder = mc.polyCylinder(r=1.5, h=10, sx=24, sy=20, n=f"limb_{i:02d}_geo")[0]
+        mc.move(i * 10.0, 5.0, 0.0, cylinder)
+        cylinders.append(cylinder)
+
+    body = mc.polyUnite(cylinders, ch=False, n="body")[0] if len(cylinders) > 1 else mc.rename(cylinders[0], "body")
+    jnts = [root] + [jnt for limb in limbs for jnt in limb]
+    mc.skinCluster(jnts, body, tsb=True, mi=4, n="body_skinCluster")
+    return body, limbs
+
+def BuildProxyRig(limbCount, frameMin, frameMax, proxyPlayback):
+    from ProxyRigger import ProxyRigger
+
+    body, limbs = BuildSkinnedLimbs(limbCount)
+    mc.select(body, r=True)
+    globalProxyCtrl = ProxyRigger().CreateProxyRigFromSelectedMesh()
+    mc.setAttr(globalProxyCtrl + ".proxyPlayback", proxyPlayback)
+
+    # the proxy locators only switch visibility, the joints are what animate the skin and the segments
+    KeySwing([limb[0] for limb in limbs] + [limb[1] for limb in limbs], frameMin, frameMax)
+    if proxyPlayback:
+        return [f"{seg}.worldMesh" for seg in mc.listRelatives(body + "_proxy_grp", c=True, type="transform") or []]
+    return [body + ".worldMesh"]
+
+RIGS = {
+    "limbs" : lambda size, frameMin, frameMax: BuildLimbRig(size, frameMin, frameMax),
+    "skinned" : lambda size, frameMin, frameMax: BuildProxyRig(size, frameMin, frameMax, 0),
+    "proxy" : lambda size, frameMin, frameMax: BuildProxyRig(size, frameMin, frameMax, 1),
+}
+
+def BuildRig(rigName, size, frameMin, frameMax):
+    mc.file(new=True, force=True)
+    mc.playbackOptions(min=frameMin, max=frameMax, ast=frameMin, aet=frameMax)
+    mc.currentTime(frameMin)
+    return RIGS[rigName](size, frameMin, frameMax)
+
+def GetHotspots(frameMin, frameMax, pullPlugs, count = 10):
+    # the profiler's events for a short stretch of playback, added up per node
+    from MayaUtils import TimePlayback
+
+    mc.profiler(reset=True)
+    mc.profiler(sampling=True)
+    TimePlayback(frameMin, frameMax, pullPlugs)
+    mc.profiler(sampling=False)
+
+    nodeMicroseconds = {}
+    nodeExists = {}
+    for i in range(mc.profiler(q=True, eventCount=True)):
+        node = mc.profiler(q=True, eventIndex=i, eventName=True).split(":")[0].strip()
+        if node not in nodeExists:
+            nodeExists[node] = bool(node) and mc.objExists(node)
+        if nodeExists[node]:
+            nodeMicroseconds[node] = nodeMicroseconds.get(node, 0.0) + mc.profiler(q=True, eventIndex=i, eventDuration=True)
+
+    hotspots = sorted(nodeMicroseconds.items(), key=lambda item: -item[1])[:count]
+    return [[node, microseconds / 1000.0] for node, microseconds in hotspots]
+
+def MeasureModes(frameMin, frameMax, pullPlugs, iterations = 3):
+    from MayaUtils import TimePlayback
+    from maya.debug.emModeManager import emModeManager
+
+    modes = {}
+    for modeName, emMode in EVALUATION_MODES.items():
+        with emModeManager() as manager:
+            manager.setMode(emMode)
+            # the first pass builds the evaluation and scheduling graphs, a one time cost that is not playback
+            TimePlayback(frameMin, frameMax, pullPlugs)
+            fps = [TimePlayback(frameMin, frameMax, pullPlugs) for _ in range(iterations)]
+            modes[modeName] = {
+                "fps" : max(fps),
+                "fpsMean" : sum(fps) / len(fps),
+                "hotspots" : GetHotspots(frameMin, min(frameMax, frameMin + PROFILED_FRAMES - 1), pullPlugs),
+            }
+    return modes
+
+def LoadHistory(path):
+    if not os.path.exists(path):
+        return {"runs" : []}
+    with open(path) as historyFile:
+        return json.load(historyFile)
+
+def SaveHistory(path, history):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "w") as historyFile:
+        json.dump(history, historyFile, indent=4)
+    os.replace(path + ".tmp", path)
+
+def FindPreviousRun(history, run):
+    for previous in reversed(history["runs"]):
+        # batch runs pull the rig outputs and interactive runs draw the viewport, their frame rates do not compare
+        if (previous["rig"], previous["size"], previous["mayaVersion"], previous.get("batch")) == (run["rig"], run["size"], run["mayaVersion"], run["batch"]):
+            return previous
+    return None
+
+def CheckRegressions(previous, run, tolerance):
+    failures = []
+    for modeName, mode in run["modes"].items():
+        previousFps = previous["modes"].get(modeName, {}).get("fps")
+        if previousFps and mode["fps"] < previousFps * (1.0 - tolerance):
+            failures.append(f"{run['rig']} size {run['size']} {modeName}: {mode['fps']:.1f} fps, was {previousFps:.1f} on {previous['time']}")
+    return failures
+
+def RunPlaybackBenchmarks(rigNames, sizes, historyPath = HISTORY_PATH, tolerance = 0.15, iterations = 3, frameRange = FRAME_RANGE, discardChanges = False):
+    if mc.file(q=True, modified=True) and not discardChanges:
+        raise Exception("The scene has unsaved changes and every benchmark run starts a new scene, save it first or pass discardChanges=True")
+
+    frameMin, frameMax = frameRange
+    history = LoadHistory(historyPath)
+    # with no viewport nothing pulls the rig, so batch playback evaluates the rig outputs every frame instead
+    isBatch = mc.about(batch=True)
+
+    failures = []
+    for rigName in rigNames:
+        for size in sizes:
+            pullPlugs = BuildRig(rigName, size, frameMin, frameMax)
+            run = {
+                "time" : datetime.datetime.now().isoformat(timespec="seconds"),
+                "mayaVersion" : mc.about(version=True),
+                "rig" : rigName,
+                "size" : size,
+                "frames" : frameMax - frameMin + 1,
+                "batch" : isBatch,
+                "modes" : MeasureModes(frameMin, frameMax, pullPlugs if isBatch else None, iterations),
+            }
+
+            previous = FindPreviousRun(history, run)
+            if previous:
+                failures.extend(CheckRegressions(previous, run, tolerance))
+            history["runs"].append(run)
+
+            fpsText = "  ".join(f"{modeName} {mode['fps']:>7.1f} fps" for modeName, mode in run["modes"].items())
+            print(f"{rigName:<8} size {size:>3}  {fpsText}")
+            for modeName, mode in run["modes"].items():
+                if mode["hotspots"]:
+                    print(f"  {modeName:<8} " + ", ".join(f"{node} {ms:.1f} ms" for node, ms in mode["hotspots"][:3]))
+
+    SaveHistory(historyPath, history)
+    mc.file(new=True, force=True)
+    return history, failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="playback frame rate of reference rigs in DG, EM serial and EM parallel, kept in a json history")
+    parser.add_argument("--rig", action="append", choices=sorted(RIGS))
+    parser.add_argument("--size", action="append", type=int, help="limbs in the reference rig, 1, 10 and 50 by default")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed fps drop against the last run, 0.15 is 15 percent")
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC_DIR)
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    _, failures = RunPlaybackBenchmarks(args.rig or list(RIGS), args.size or [1, 10, 50], args.history, args.tolerance, args.iterations)
+    for failure in failures:
+        print("SLOWER " + failure)
+
+    maya.standalone.uninitialize()
+    sys.exit(1 if failures else 0)
@@ -1,80 +1,375 @@
-import importlib
-import MayaUtils
-importlib.reload(MayaUtils)
-
+import json
 from MayaUtils import *
-from PySide2.QtWidgets import QPushButton, QVBoxLayout
+from SkinWeights import MayaSkin, GetActiveInfluences, RemapWeightsByName, GetOwnershipHashes, GetArrayHash
+from AssetCache import MeshSkinData, GetAssetCache
+from MeshPartition import PartitionMesh, GetFacesPerOwner, GetSegmentVertMaps, CreateMeshFromSegment, AssignShadingLike, GetSegmentInSpace
 import maya.cmds as mc
 
 class ProxyRigger:
     def __init__(self):
-        self.skin = ""
-        self.model = ""
+        self.skinHandle = None
+        self.modelHandle = None
         self.jnts = []
-
-    def CreateProxyRigFromSelectedMesh(self):
-        mesh = mc.ls(sl=True)[0]
+        self.useBulkWeights = True
+        self.useIndexWeightTransfer = True
+        self.influences = []
+        self.skinWeights = None
+        self.segments = {}
+        self.segmentVertMaps = {}
+        self.useRigidSegments = False
+        self.useAssetCache = True
+        self.topology = None
+        self.vertOwners = None
+
+    # the model and skin are read off their handles, so a rename or reparent during the build is followed
+    @property
+    def model(self):
+        return self.modelHandle.GetName() if self.modelHandle else ""
+
+    @property
+    def skin(self):
+        return self.skinHandle.GetName() if self.skinHandle else ""
+
+    def SetModel(self, mesh):
         if not IsMesh(mesh):
             raise TypeError(f"{mesh} is NOT a Mesh! Select a Mesh!")
         
-        self.model = mesh
+        self.modelHandle = GetNodeHandle(mesh)
         modelShape = mc.listRelatives(self.model, s=True)[0]
         print(f"Found Mesh {mesh} and Shape {modelShape}")
         
-        skin = GetAllConnectIn(modelShape, GetUpperStream, 10, IsSkin)
+        upstreamWalk = GraphWalk(modelShape, True, 10)
+        skin = upstreamWalk.GetNodesOfType("skinCluster")
         if not skin:
             raise Exception(f"{mesh} has no Skin! Tool Only Works with a Rigged Model")
-        self.skin = skin[0]
 
-        jnts = GetAllConnectIn(modelShape, GetUpperStream, 10, IsJoint)
+        jnts = upstreamWalk.GetNodesOfType("joint")
         if not jnts:
             raise Exception(f"{mesh} has no Joint Bound! Tool Only Works with a Rigged Model")
-        self.jnts = jnts
+        self.skinHandle, *self.jnts = GetNodeHandles([skin[0]] + jnts)
+        return modelShape
 
-        print(f"Start Build with Mesh: {self.model}, Skin: {self.skin}, and Joints: {self.jnts}")
+    def GetProxyTopGrp(self):
+        return GetShortName(self.model) + "_proxy_grp"
 
-        jntVertMap = self.GenerateJntVertDict()
-        segments = []
-        ctrls = []
-        for jnt, verts, in jntVertMap.items():
-            print (f"Joint {jnt} controls {verts} primarily")
-            newSeg = self.CreateProxyModelForJntAndVerts
-            if newSeg is None:
-                continue
+    def GetCtrlTopGrp(self):
+        return "ac_" + GetShortName(self.model) + "_proxy_grp"
 
-            newSkinCluster = mc.skinCluster(self.jnts, newSeg)[0]
-            mc.copySkinWeights(ss=self.skin, ds=newSkinCluster, nm=True, sa="closestPoint", ia="closestJoint")
-            segments.append(newSeg)
+    def GetGlobalProxyCtrl(self):
+        return "ac_" + GetShortName(self.model) + "_proxy_global"
 
-            ctrlLocator = "ac_" + jnt + "_proxy"
-            mc.spaceLocator(n=ctrlLocator)
-            ctrlLocatorGrp = ctrlLocator + "_grp"
-            mc.group(ctrlLocator, n=ctrlLocatorGrp)
-            mc.matchTransform(ctrlLocatorGrp, jnt)
+    def GetSegmentName(self, jnt):
+        return GetShortName(self.model) + "_" + GetShortName(jnt) + "_proxy"
+
+    def GetProxyLocator(self, jnt):
+        return "ac_" + GetShortName(jnt) + "_proxy"
+
+    @InstrumentedOperation()
+    def CreateProxyRigFromSelectedMesh(self):
+        modelShape = self.SetModel(mc.ls(sl=True)[0])
+        print(f"Start Build with Mesh: {self.model}, Skin: {self.skin}, and Joints: {GetNodeNames(self.jnts)}")
+
+        rigid = self.useRigidSegments
+        # a build that fails half way takes back the nodes it made
+        with BuildTransaction("CreateProxyRig"):
+            self.segments = {}
+            isPartitioned = self.useBulkWeights or rigid
+            if isPartitioned:
+                self.ReadSourceSkin()
+                jntSegMap = self.GenerateProxySegments(modelShape, rigid)
+            else:
+                jntSegMap = {}
+                for jnt, verts, in self.GenerateJntVertDict().items():
+                    print (f"Joint {jnt} controls {verts} primarily")
+                    newSeg = self.CreateProxyModelForJntAndVerts(jnt, verts)
+                    if newSeg is None:
+                        continue
+
+                    jntSegMap[jnt] = newSeg
+
+            segments = []
+            ctrls = []
+            segSkins = {}
+            for jnt, newSeg in jntSegMap.items():
+                segSkins[jnt] = self.BindSegment(jnt, newSeg, rigid)
+                segments.append(newSeg)
+                ctrls.append(self.CreateProxyLocator(jnt, newSeg))
+
+            # maya may give a node another name than the one asked for, so the returned names are the ones used
+            proxyTopGrp = mc.group(segments, n=self.GetProxyTopGrp())
+            ctrlTopGrp = mc.group(ctrls, n=self.GetCtrlTopGrp())
+            globalProxyCtrl = mc.circle(n=self.GetGlobalProxyCtrl(), r=30)[0]
+            proxyTopGrp, ctrlTopGrp = mc.parent(proxyTopGrp, ctrlTopGrp, globalProxyCtrl)
+            mc.setAttr(proxyTopGrp + ".inheritsTransform", 0)
+
+            # the groups hang off message attributes, the update finds them there whatever they are called by then
+            for groupAttr, grp in (("proxyGroup", proxyTopGrp), ("ctrlGroup", ctrlTopGrp)):
+                mc.addAttr(globalProxyCtrl, ln=groupAttr, at="message")
+                mc.connectAttr(grp + ".message", globalProxyCtrl + "." + groupAttr)
 
             visibilityAttr = "vis"
-            mc.addAttr(ctrlLocator, ln=visibilityAttr, min=0, max=1, dv=1, k=True)
-            mc.connectAttr(ctrlLocator + "." + visibilityAttr, newSeg + ".v")
-            ctrls.append(ctrlLocatorGrp)
+            mc.addAttr(globalProxyCtrl, ln=visibilityAttr, min=0, max=1, dv=1, k=True)
+            mc.connectAttr(globalProxyCtrl + "." + visibilityAttr, proxyTopGrp + ".v")
 
-        proxyTopGrp = self.model + "_proxy_grp"
-        mc.group(segments, n=proxyTopGrp)
+            self.AddProxyPlaybackToggle(globalProxyCtrl, proxyTopGrp, segSkins.values())
+            if isPartitioned:
+                mc.addAttr(globalProxyCtrl, ln="proxyOwnership", dt="string")
+                self.SaveOwnershipRecord(globalProxyCtrl, self.BuildOwnershipRecord(jntSegMap, segSkins, rigid))
 
-        ctrlTopGrp = "ac_" + self.model + "_proxy_grp"
-        mc.group(ctrls, n=ctrlTopGrp)
+        return globalProxyCtrl
 
-        globalProxyCtrl = "ac_" + self.model + "_proxy_global"
-        mc.circle(n=globalProxyCtrl, r=30)
-        mc.parent(proxyTopGrp, globalProxyCtrl)
-        mc.parent(ctrlTopGrp, globalProxyCtrl)
-        mc.setAttr(proxyTopGrp + ".inheritsTransform", 0)
+    def BindSegment(self, jnt, seg, rigid):
+        if rigid:
+            self.AttachRigidSegment(jnt, seg)
+            return None
 
+        if self.useIndexWeightTransfer and jnt in self.segments:
+            return self.TransferWeightsByIndex(jnt, seg)
+
+        newSkinCluster = mc.skinCluster(GetNodeNames(self.jnts), seg)[0]
+        mc.copySkinWeights(ss=self.skin, ds=newSkinCluster, nm=True, sa="closestPoint", ia="closestJoint")
+        return newSkinCluster
+
+    def CreateProxyLocator(self, jnt, seg):
+        ctrlLocator = mc.spaceLocator(n=self.GetProxyLocator(jnt))[0]
         visibilityAttr = "vis"
-        mc.addAttr(globalProxyCtrl, ln=visibilityAttr, min=0, max=1, dv=1, k=True)
-        mc.connectAttr(globalProxyCtrl + "." + visibilityAttr, proxyTopGrp + ".v")
+        mc.addAttr(ctrlLocator, ln=visibilityAttr, min=0, max=1, dv=1, k=True)
+        mc.connectAttr(ctrlLocator + "." + visibilityAttr, seg + ".v")
+
+        ctrlLocatorGrp = mc.group(ctrlLocator, n=GetShortName(ctrlLocator) + "_grp")
+        mc.matchTransform(ctrlLocatorGrp, jnt)
+        return ctrlLocatorGrp
+
+    def GetRigGroup(self, globalProxyCtrl, groupAttr, defaultName):
+        # rigs built before the message attributes only have the group names to go by
+        groups = mc.listConnections(globalProxyCtrl + "." + groupAttr, s=True, d=False) if mc.objExists(globalProxyCtrl + "." + groupAttr) else None
+        return groups[0] if groups else defaultName
+
+    def FindSegmentLocator(self, jnt, seg):
+        # the locator that drives the segment's visibility, by name when the segment is gone
+        if mc.objExists(seg):
+            drivers = mc.listConnections(seg + ".v", s=True, d=False, type="transform")
+            if drivers:
+                return drivers[0]
+
+        ctrlLocator = self.GetProxyLocator(jnt)
+        return ctrlLocator if mc.objExists(ctrlLocator) else None
+
+    # the ownership record lives on the global proxy controller as json, so the rig can be updated in a later session
+
+    def BuildOwnershipRecord(self, jntSegMap, segSkins, rigid):
+        ownedHashes = GetOwnershipHashes(self.vertOwners, self.influences)
+        record = {"rigid" : rigid, "segments" : {}}
+        for jnt, seg in jntSegMap.items():
+            record["segments"][jnt] = {"mesh" : seg, "skin" : segSkins[jnt], "owned" : ownedHashes[jnt], "weights" : self.GetSegmentWeightsHash(jnt, rigid)}
+        return record
+
+    def GetSegmentWeightsHash(self, jnt, rigid):
+        # the rigid proxy never reads weights past ownership, so only skinned segments care when they change
+        if rigid:
+            return None
+        return GetArrayHash(self.skinWeights[self.segmentVertMaps[jnt]])
 
+    def SaveOwnershipRecord(self, globalProxyCtrl, record):
+        mc.setAttr(globalProxyCtrl + ".proxyOwnership", json.dumps(record), type="string")
 
+    def LoadOwnershipRecord(self, globalProxyCtrl):
+        if not mc.objExists(globalProxyCtrl + ".proxyOwnership"):
+            return None
+        return json.loads(mc.getAttr(globalProxyCtrl + ".proxyOwnership") or "null")
+
+    @InstrumentedOperation()
+    def UpdateProxyRigFromSelectedMesh(self):
+        # rebuilds only the segments whose owned vertices changed since the last build, everything else stays in place
+        modelShape = self.SetModel(mc.ls(sl=True)[0])
+        globalProxyCtrl = self.GetGlobalProxyCtrl()
+        record = self.LoadOwnershipRecord(globalProxyCtrl) if mc.objExists(globalProxyCtrl) else None
+        if record is None:
+            print(f"{self.model} has no proxy rig with an ownership record, building it from scratch")
+            return self.CreateProxyRigFromSelectedMesh()
+
+        # the rig is updated the way it was built, whatever the tool is set to build now
+        rigid = record["rigid"]
+        self.ReadSourceSkin()
+        ownedHashes = GetOwnershipHashes(self.vertOwners, self.influences)
+        oldSegments = record["segments"]
+
+        changedJnts = [jnt for jnt, owned in ownedHashes.items() if jnt not in oldSegments or oldSegments[jnt]["owned"] != owned]
+        removedJnts = [jnt for jnt in oldSegments if jnt not in ownedHashes]
+        print(f"Updating {self.model}: {len(changedJnts)} segments changed, {len(removedJnts)} removed, {len(ownedHashes) - len(changedJnts)} kept")
+
+        proxyTopGrp = self.GetRigGroup(globalProxyCtrl, "proxyGroup", self.GetProxyTopGrp())
+        ctrlTopGrp = self.GetRigGroup(globalProxyCtrl, "ctrlGroup", self.GetCtrlTopGrp())
+        with BuildTransaction("UpdateProxyRig"):
+            for jnt in removedJnts:
+                ctrlLocator = self.FindSegmentLocator(jnt, oldSegments[jnt]["mesh"])
+                oldNodes = [oldSegments[jnt]["mesh"]] + (mc.listRelatives(ctrlLocator, p=True) or [] if ctrlLocator else [])
+                existing = [node for node in oldNodes if mc.objExists(node)]
+                if existing:
+                    mc.delete(existing)
+                del oldSegments[jnt]
+
+            ctrlLocators = {}
+            for jnt in changedJnts:
+                if jnt in oldSegments:
+                    ctrlLocators[jnt] = self.FindSegmentLocator(jnt, oldSegments[jnt]["mesh"])
+                    if mc.objExists(oldSegments[jnt]["mesh"]):
+                        mc.delete(oldSegments[jnt]["mesh"])
+
+            self.segments = {}
+            jntSegMap = self.GenerateProxySegments(modelShape, rigid, changedJnts)
+            segSkins = {}
+            for jnt, newSeg in jntSegMap.items():
+                segSkins[jnt] = self.BindSegment(jnt, newSeg, rigid)
+                newSeg = mc.parent(newSeg, proxyTopGrp)[0]
+                jntSegMap[jnt] = newSeg
+                ctrlLocator = ctrlLocators.get(jnt)
+                if ctrlLocator:
+                    mc.connectAttr(ctrlLocator + ".vis", newSeg + ".v")
+                else:
+                    mc.parent(self.CreateProxyLocator(jnt, newSeg), ctrlTopGrp)
+            self.ConnectSegmentSkinsToToggle(globalProxyCtrl, segSkins.values())
+
+            record["segments"].update(self.BuildOwnershipRecord(jntSegMap, segSkins, rigid)["segments"])
+            if not rigid:
+                self.RefreshKeptSegmentWeights(record, changedJnts)
+            self.SaveOwnershipRecord(globalProxyCtrl, record)
+
+        return globalProxyCtrl
+
+    def RefreshKeptSegmentWeights(self, record, changedJnts):
+        # a kept segment has the same vertices, but its weights may still have been repainted
+        for jnt, segRecord in record["segments"].items():
+            if jnt in changedJnts:
+                continue
+
+            weightsHash = self.GetSegmentWeightsHash(jnt, False)
+            if weightsHash == segRecord["weights"]:
+                continue
 
+            self.UpdateSegmentWeights(jnt, segRecord["mesh"], segRecord["skin"])
+            segRecord["weights"] = weightsHash
+
+    def UpdateSegmentWeights(self, jnt, seg, skin):
+        segWeights = self.skinWeights[self.segmentVertMaps[jnt]]
+        segSkin = MayaSkin(skin, seg)
+        segInfluences = segSkin.GetInfluences()
+        missing = [self.influences[i] for i in GetActiveInfluences(segWeights) if self.influences[i] not in segInfluences]
+        if missing:
+            mc.skinCluster(segSkin.skin, e=True, ai=missing, wt=0)
+            segInfluences = segSkin.GetInfluences()
+        segSkin.SetWeights(RemapWeightsByName(segWeights, self.influences, segInfluences))
+
+    def AddProxyPlaybackToggle(self, globalProxyCtrl, proxyTopGrp, segSkins):
+        # on: the full res mesh is hidden and its skinCluster passes through, only the proxies are left to evaluate
+        # off: the proxies are hidden and their skinClusters pass through, only the full res mesh is left to evaluate.
+        # off by default, the rig looks and deforms like before the build until the animator switches it on
+        toggleAttr = globalProxyCtrl + ".proxyPlayback"
+        mc.addAttr(globalProxyCtrl, ln="proxyPlayback", at="bool", dv=0, k=True)
+        reverseNode = mc.createNode("reverse", n=GetShortName(self.model) + "_proxyPlayback_reverse")
+        mc.connectAttr(toggleAttr, reverseNode + ".inputX")
+        self.DriveVisibility(self.model, reverseNode + ".outputX", GetShortName(self.model) + "_proxyPlayback")
+        self.DriveVisibility(proxyTopGrp, toggleAttr, GetShortName(proxyTopGrp) + "_proxyPlayback")
+        mc.connectAttr(toggleAttr, self.skin + ".nodeState") # 1 is HasNoEffect
+        self.ConnectSegmentSkinsToToggle(globalProxyCtrl, segSkins)
+        return toggleAttr
+
+    def ConnectSegmentSkinsToToggle(self, globalProxyCtrl, segSkins):
+        reverseNodes = mc.listConnections(globalProxyCtrl + ".proxyPlayback", s=False, d=True, type="reverse")
+        if not reverseNodes:
+            return
+
+        for segSkin in segSkins:
+            if segSkin:
+                mc.connectAttr(reverseNodes[0] + ".outputX", segSkin + ".nodeState")
+
+    def DriveVisibility(self, node, srcAttr, name):
+        # a driver the node already has is kept by multiplying it in, and a locked visibility is unlocked just for the connection
+        visAttr = node + ".v"
+        drivers = mc.listConnections(visAttr, s=True, d=False, p=True)
+        if drivers:
+            multNode = mc.createNode("multDoubleLinear", n=name + "_mult")
+            mc.connectAttr(drivers[0], multNode + ".input1")
+            mc.connectAttr(srcAttr, multNode + ".input2")
+            srcAttr = multNode + ".output"
+
+        isLocked = mc.getAttr(visAttr, lock=True)
+        if isLocked:
+            mc.setAttr(visAttr, lock=False)
+        mc.connectAttr(srcAttr, visAttr, f=True)
+        if isLocked:
+            mc.setAttr(visAttr, lock=True)
+
+    def MeasureProxyPlayback(self, globalProxyCtrl, frameMin = None, frameMax = None):
+        # each run has to evaluate one representation only, a toggle that drives nothing would time both twice
+        toggleAttr = globalProxyCtrl + ".proxyPlayback"
+        if not mc.listConnections(toggleAttr, s=False, d=True):
+            raise Exception(f"{toggleAttr} does not switch anything, regenerate the proxy rig to measure it")
+
+        wasOn = mc.getAttr(toggleAttr)
+        fps = {}
+        for label, on in (("skinned", 0), ("proxy", 1)):
+            mc.setAttr(toggleAttr, on)
+            fps[label] = TimePlayback(frameMin, frameMax)
+        mc.setAttr(toggleAttr, wasOn)
+        return fps
+
+    @InstrumentedOperation()
+    def AttachRigidSegment(self, jnt, seg):
+        # the points were built in the joint's space, so the joint's world matrix places the segment with no deformer or constraint
+        mc.connectAttr(jnt + ".worldMatrix[0]", seg + ".offsetParentMatrix")
+
+    def ReadSourceSkin(self):
+        # a saved, unchanged scene loads the topology and weights from the asset cache instead of maya
+        data = GetAssetCache().LoadMeshSkin(self.model, self.skin) if self.useAssetCache else MeshSkinData.FromMaya(self.model, self.skin)
+        self.influences = data.influences
+        self.skinWeights = data.weights
+        self.vertOwners = data.dominant
+        self.topology = data.topology
+
+    @InstrumentedOperation()
+    def GenerateProxySegments(self, modelShape, rigid, jntsToCreate = None):
+        # only the segments of jntsToCreate are built when it is given, the kept ones only need their vertices to check their weights
+        facesPerOwner = GetFacesPerOwner(self.topology, self.vertOwners, len(self.influences))
+        ownersToBuild = None
+        self.segmentVertMaps = {}
+        if jntsToCreate is not None:
+            ownersToBuild = {i for i, jnt in enumerate(self.influences) if jnt in jntsToCreate}
+            if not rigid:
+                keptOwners = [i for i in range(len(self.influences)) if i not in ownersToBuild]
+                vertMaps = GetSegmentVertMaps(self.topology, facesPerOwner, keptOwners)
+                self.segmentVertMaps = {self.influences[owner] : vertMap for owner, vertMap in vertMaps.items()}
+
+        jntSegMap = {}
+        for segment in PartitionMesh(self.topology, self.vertOwners, len(self.influences), ownersToBuild, facesPerOwner):
+            if segment is None:
+                continue
+
+            jnt = self.influences[segment.owner]
+            self.segments[jnt] = segment
+            self.segmentVertMaps[jnt] = segment.vertMap
+
+            print (f"Joint {jnt} controls {len(segment.vertMap)} verts primarily")
+            segmentToCreate = GetSegmentInSpace(segment, mc.xform(jnt, q=True, m=True, ws=True)) if rigid else segment
+            jntSegMap[jnt] = CreateMeshFromSegment(segmentToCreate, self.GetSegmentName(jnt))
+
+        if jntSegMap:
+            AssignShadingLike(list(jntSegMap.values()), modelShape)
+
+        return jntSegMap
+
+    @InstrumentedOperation()
+    def TransferWeightsByIndex(self, jnt, seg):
+        # every segment vertex is a known source vertex, so the weights are just rows of the source matrix
+        segWeights = self.skinWeights[self.segments[jnt].vertMap]
+        activeInfluences = [self.influences[i] for i in GetActiveInfluences(segWeights)]
+
+        newSkinCluster = mc.skinCluster(activeInfluences, seg, tsb=True)[0]
+        segSkin = MayaSkin(newSkinCluster, seg)
+        segSkin.SetWeights(RemapWeightsByName(segWeights, self.influences, segSkin.GetInfluences()))
+        return newSkinCluster
+
+    @InstrumentedOperation()
     def CreateProxyModelForJntAndVerts(self, jnt, verts):
         if not verts:
             return None
@@ -82,29 +377,18 @@ class ProxyRigger:
         faces = mc.polyListComponentConversion(verts, fromvertex=True, toFace=True)
         faces = mc.ls(faces, fl=True)
 
-        labels = set() # a set is like a list, but only holds unique elements and it is not ordered, fast than list when it coems to looking for stuff inside.
-        for face in faces:
-            labels.add(face.replace(self.model, ""))
-
+        # the duplicate has the same face indices, compared as numbers so neither mesh's name or path matters
+        facesToKeep = GetComponentIndices(faces)
         dup = mc.duplicate(self.model)[0]
+        faceCount = mc.polyEvaluate(dup, face=True)
+        mc.delete([f"{dup}.f[{i}]" for i in range(faceCount) if i not in facesToKeep])
 
-        allDupFaces = mc.ls(f"{dup}.f[*]", fl=True)
-        facesToDelete = []
-        for dupFace in allDupFaces:
-            label = dupFace.replace(dup, "")
-            if label not in labels:
-                facesToDelete.append(dupFace)
-
-        mc.delete(facesToDelete)
-
-        dupName = self.model + "_" + jnt + "_proxy"
-        mc.rename(dup, dupName)
-        return dupName
-
+        return mc.rename(dup, self.GetSegmentName(jnt))
 
+    @InstrumentedOperation()
     def GenerateJntVertDict(self):
         dict = {}
-        for jnt in self.jnts:
+        for jnt in GetNodeNames(self.jnts):
             dict[jnt] = []
 
         verts = mc.ls(f"{self.model}.vtx[*]", fl=True)
@@ -128,22 +412,9 @@ class ProxyRigger:
 
         return jnts[maxWeightIndex]
 
-class ProxyRiggerWidget(QMayaWindow):
-    def __init__(self):
-        super().__init__()
-        self.proxyRigger = ProxyRigger()
-        self.setWindowTitle("Proxy Rigger")
-        self.masterLayout = QVBoxLayout()
-        self.setLayout(self.masterLayout)
-        generateProxyRigBtn = QPushButton("Generate Proxy Rig")
-        self.masterLayout.addWidget(generateProxyRigBtn)
-        generateProxyRigBtn.clicked.connect(self.GenerateProxyRigButtonClicked)
-
-    def GenerateProxyRigButtonClicked(self):
-        self.proxyRigger.CreateProxyRigFromSelectedMesh()
-
-    def GetWindowHash(self):
-        return "reydauuthdunanuudrajindahaad"
-
-ProxyRiggerWidget = ProxyRiggerWidget()
-ProxyRiggerWidget.show()
\ No newline at end of file
+def Show():
+    from ProxyRiggerUI import ProxyRiggerWidget
+    return ProxyRiggerWidget.ShowWindow()
+
+if __name__ == "__main__":
+    Show()
@@ -0,0 +1,54 @@
+from MayaUtils import *
+from MayaWidgets import QMayaWindow, TryAction
+from ProxyRigger import ProxyRigger
+from PySide2.QtWidgets import QCheckBox, QPushButton, QVBoxLayout
+import maya.cmds as mc
+
+class ProxyRiggerWidget(QMayaWindow):
+    usesSceneIndex = True
+
+    def __init__(self):
+        super().__init__()
+        self.proxyRigger = ProxyRigger()
+        self.setWindowTitle("Proxy Rigger")
+        self.masterLayout = QVBoxLayout()
+        self.setLayout(self.masterLayout)
+        self.rigidCheckBox = QCheckBox("Rigid Proxy (no skinning, fastest playback)")
+        self.rigidCheckBox.toggled.connect(self.RigidCheckBoxToggled)
+        self.masterLayout.addWidget(self.rigidCheckBox)
+        generateProxyRigBtn = QPushButton("Generate Proxy Rig")
+        self.masterLayout.addWidget(generateProxyRigBtn)
+        generateProxyRigBtn.clicked.connect(self.GenerateProxyRigButtonClicked)
+        updateProxyRigBtn = QPushButton("Update Proxy Rig After Weight Changes")
+        self.masterLayout.addWidget(updateProxyRigBtn)
+        updateProxyRigBtn.clicked.connect(self.UpdateProxyRigButtonClicked)
+        measureBtn = QPushButton("Measure Playback With and Without Proxy")
+        self.masterLayout.addWidget(measureBtn)
+        measureBtn.clicked.connect(self.MeasureBtnClicked)
+        self.globalProxyCtrl = None
+
+    def RigidCheckBoxToggled(self, checked):
+        self.proxyRigger.useRigidSegments = checked
+
+    def GenerateProxyRigButtonClicked(self):
+        self.globalProxyCtrl = GetNodeHandle(self.proxyRigger.CreateProxyRigFromSelectedMesh())
+
+    def UpdateProxyRigButtonClicked(self):
+        self.globalProxyCtrl = GetNodeHandle(self.proxyRigger.UpdateProxyRigFromSelectedMesh())
+
+    @TryAction
+    def MeasureBtnClicked(self):
+        selected = mc.ls(sl=True)
+        if selected and mc.objExists(selected[0] + ".proxyPlayback"):
+            globalProxyCtrl = selected[0]
+        else:
+            globalProxyCtrl = self.globalProxyCtrl.GetName() if self.globalProxyCtrl and self.globalProxyCtrl.IsValid() else None
+        if not globalProxyCtrl:
+            raise Exception("Select a proxy global controller, or generate a proxy rig first")
+
+        fps = self.proxyRigger.MeasureProxyPlayback(globalProxyCtrl)
+        print(f"{globalProxyCtrl}: {fps['skinned']:.1f} fps skinned, {fps['proxy']:.1f} fps with the proxy")
+
+    @classmethod
+    def GetWindowHash(cls):
+        return "reydauuthdunanuudrajindahaad"
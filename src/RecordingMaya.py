@@ -0,0 +1,555 @@
+import math
+import re
+import time
+import types
+import numpy as np
+import maya.cmds as stubCmds # the vendored stubs, only used to know which commands and flags exist
+
+from SkinWeights import FakeSkin
+from MeshPartition import MeshTopology
+from Skeleton import SkeletonIndex, GetSideOfName
+
+# Stand in for maya.cmds, maya.mel and the OpenMaya calls the tools make, backed by a small fake scene.
+# Every call is counted and timed so the tools can be measured on a machine without maya.
+
+ALWAYS_VALID_FLAGS = {"q", "query", "e", "edit"}
+
+class CallRecorder:
+    def __init__(self):
+        self.counts = {}
+        self.seconds = {}
+        self.unknownFlags = {}
+
+    def Record(self, name, seconds):
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+    def GetTotal(self, prefix = None):
+        return sum(count for name, count in self.counts.items() if prefix is None or name.startswith(prefix))
+
+    def Reset(self):
+        self.counts = {}
+        self.seconds = {}
+
+stubFlagCache = {}
+
+def GetStubFlags(commandName):
+    if commandName not in stubFlagCache:
+        command = getattr(stubCmds, commandName, None)
+        if command is None:
+            raise AttributeError(f"maya.cmds has no command {commandName}")
+
+        flags = set(command.__code__.co_varnames[:command.__code__.co_argcount])
+        for short, long in re.findall(r"^(\w+)\s*: (\w+) ", command.__doc__ or "", re.M):
+            flags.update((short, long))
+        stubFlagCache[commandName] = flags | ALWAYS_VALID_FLAGS
+
+    return stubFlagCache[commandName]
+
+# Vector with the MVector operations the tools use
+class FakeMVector:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+        if isinstance(x, (FakeMVector, tuple, list)):
+            x, y, z = x[0], x[1], x[2]
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __getitem__(self, i):
+        return (self.x, self.y, self.z)[i]
+
+    def __add__(self, other):
+        return FakeMVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return FakeMVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        return FakeMVector(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    def __truediv__(self, scalar):
+        return FakeMVector(self.x / scalar, self.y / scalar, self.z / scalar)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        length = self.length() or 1.0
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return self
+
+# Data oriented class
+class FakeNode:
+    def __init__(self, name, nodeType, parent = None):
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = []
+        self.attrs = {}
+        self.position = (0.0, 0.0, 0.0)
+
+# NodeHandle over a fake node, follows it through renames like the MObjectHandle does
+class FakeNodeHandle:
+    def __init__(self, scene, node:FakeNode):
+        self.scene = scene
+        self.node = node
+
+    def IsValid(self):
+        return self.scene.nodes.get(self.node.name) is self.node
+
+    def GetName(self):
+        if not self.IsValid():
+            raise Exception(f"The node {self.node.name} no longer exists")
+        return self.node.name
+
+    GetLongName = GetName
+
+    def GetShortName(self):
+        return self.GetName()
+
+    def __eq__(self, other):
+        return isinstance(other, FakeNodeHandle) and self.node is other.node
+
+    def __hash__(self):
+        return id(self.node)
+
+class FakeScene:
+    def __init__(self):
+        self.nodes = {}
+        self.selection = []
+        self.upstream = {}
+        self.downstream = {}
+        self.plugUpstream = {}
+        self.plugDownstream = {}
+        self.topologies = {}
+        self.skins = {}
+
+    def UniqueName(self, name):
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        i = 1
+        while f"{base}{i}" in self.nodes:
+            i += 1
+        return f"{base}{i}"
+
+    def CreateNode(self, nodeType, name = None, parent = None):
+        name = self.UniqueName(name or nodeType + "1")
+        node = FakeNode(name, nodeType, parent)
+        self.nodes[name] = node
+        if parent:
+            self.nodes[parent].children.append(name)
+        return name
+
+    def CreateTransformWithShape(self, name, shapeType):
+        transform = self.CreateNode("transform", name)
+        self.CreateNode(shapeType, transform + "Shape", transform)
+        return transform
+
+    def Reparent(self, name, parent):
+        node = self.nodes[name]
+        if node.parent:
+            self.nodes[node.parent].children.remove(name)
+        node.parent = parent
+        if parent:
+            self.nodes[parent].children.append(name)
+
+    def Delete(self, name):
+        node = self.nodes.pop(name, None)
+        if node is None:
+            return
+        for child in list(node.children):
+            self.Delete(child)
+        if node.parent in self.nodes:
+            self.nodes[node.parent].children.remove(name)
+
+    def Connect(self, srcAttr, dstAttr):
+        srcNode, dstNode = srcAttr.split(".")[0], dstAttr.split(".")[0]
+        self.upstream.setdefault(dstNode, []).append(srcNode)
+        self.downstream.setdefault(srcNode, []).append(dstNode)
+        self.plugUpstream[dstAttr] = srcAttr
+        self.plugDownstream.setdefault(srcAttr, []).append(dstAttr)
+
+    def GetShapes(self, name):
+        return [child for child in self.nodes[name].children if self.nodes[child].type not in ("transform", "joint")]
+
+    def GetDescendants(self, name):
+        descendants = []
+        for child in self.nodes[name].children:
+            descendants.append(child)
+            descendants.extend(self.GetDescendants(child))
+        return descendants
+
+    # synthetic content, sized by the benchmark
+
+    def AddSkeleton(self, limbCount):
+        root = self.CreateNode("joint", "root_jnt")
+        self.CreateNode("joint", "spine_01", root)
+        for i in range(limbCount):
+            side = "L" if i % 2 == 0 else "R"
+            parent = root
+            for part, position in zip(("upper", "lower", "end"), ((i * 10.0, 10.0, 0.0), (i * 10.0, 5.0, 1.0), (i * 10.0, 0.0, 0.0))):
+                parent = self.CreateNode("joint", f"limb_{i:02d}_{side}_{part}", parent)
+                self.nodes[parent].position = position
+        return root
+
+    def AddSkinnedMesh(self, name, jointCount, rows, cols):
+        topology = MeshTopology.Grid(rows, cols)
+        jnts = []
+        parent = None
+        for i in range(jointCount):
+            parent = self.CreateNode("joint", f"{name}_jnt_{i:03d}", parent)
+            self.nodes[parent].position = ((i + 0.5) * cols / jointCount, 0.0, 0.0)
+            jnts.append(parent)
+
+        mesh = self.CreateTransformWithShape(name, "mesh")
+        skin = self.CreateNode("skinCluster", name + "_skinCluster")
+        for i, jnt in enumerate(jnts):
+            self.Connect(jnt + ".worldMatrix[0]", f"{skin}.matrix[{i}]")
+        self.Connect(skin + ".outputGeometry[0]", mesh + "Shape.inMesh")
+
+        # each joint owns a band of the grid with soft falloff into its neighbours, like a skinned limb
+        centers = (np.arange(jointCount) + 0.5) * cols / jointCount
+        distance = np.abs(topology.points[:, 0][:, None] - centers[None, :])
+        weights = np.clip(1.0 - distance / (1.5 * cols / jointCount), 0.0, None)
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        self.topologies[mesh] = topology
+        self.skins[skin] = FakeSkin(jnts, weights)
+        return mesh
+
+    def AddControllers(self, count):
+        sides = ("L", "R", "C")
+        return [self.CreateTransformWithShape(f"ac_fk_limb_{i:04d}_{sides[i % 3]}", "nurbsCurve") for i in range(count)]
+
+    def AddMeshes(self, count):
+        return [self.CreateTransformWithShape(f"mesh_{i:04d}", "mesh") for i in range(count)]
+
+class RecordingCmds:
+    def __init__(self, scene:FakeScene, recorder:CallRecorder):
+        self.scene = scene
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        validFlags = GetStubFlags(name)
+        handler = getattr(self, "Cmd_" + name, None)
+
+        def RecordedCommand(*args, **kwargs):
+            unknown = [flag for flag in kwargs if flag not in validFlags]
+            if unknown:
+                self.recorder.unknownFlags.setdefault(name, set()).update(unknown)
+
+            startTime = time.perf_counter()
+            result = handler(*args, **kwargs) if handler else None
+            self.recorder.Record(name, time.perf_counter() - startTime)
+            return result
+
+        return RecordedCommand
+
+    def AsList(self, objs):
+        if objs is None:
+            return []
+        if isinstance(objs, str):
+            return [objs]
+        return list(objs)
+
+    def NodeOf(self, attr):
+        return attr.split(".")[0]
+
+    def Cmd_ls(self, *args, sl = False, selection = False, type = None, showType = False, **kwargs):
+        names = list(self.scene.selection) if (sl or selection) else self.AsList(args[0] if args else list(self.scene.nodes))
+        names = [name for name in names if name in self.scene.nodes]
+        if type:
+            names = [name for name in names if self.scene.nodes[name].type in self.AsList(type)]
+        if showType:
+            return [item for name in names for item in (name, self.scene.nodes[name].type)]
+        return names
+
+    def Cmd_listRelatives(self, objs, s = False, shapes = False, c = False, children = False, p = False, parent = False, ad = False, allDescendents = False, type = None, **kwargs):
+        found = []
+        for obj in self.AsList(objs):
+            if s or shapes:
+                found.extend(self.scene.GetShapes(obj))
+            elif p or parent:
+                if self.scene.nodes[obj].parent:
+                    found.append(self.scene.nodes[obj].parent)
+            elif ad or allDescendents:
+                found.extend(self.scene.GetDescendants(obj))
+            else:
+                found.extend(self.scene.nodes[obj].children)
+
+        if type:
+            found = [name for name in found if self.scene.nodes[name].type in self.AsList(type)]
+        return found or None
+
+    def Cmd_objectType(self, obj, **kwargs):
+        return self.scene.nodes[obj].type
+
+    def Cmd_objExists(self, obj):
+        node, _, attrName = obj.partition(".")
+        if node not in self.scene.nodes:
+            return False
+        return not attrName or attrName.split("[")[0] in ("v", "visibility") or attrName in self.scene.nodes[node].attrs
+
+    def Cmd_addAttr(self, obj, ln = None, longName = None, dv = None, defaultValue = None, **kwargs):
+        self.scene.nodes[obj].attrs[ln or longName] = dv if dv is not None else defaultValue
+
+    def Cmd_listConnections(self, objs, s = True, d = True, sh = False, type = None, p = False, plugs = False, **kwargs):
+        found = []
+        for obj in self.AsList(objs):
+            if "." in obj:
+                # a plug only lists what is connected to that plug
+                foundPlugs = ([self.scene.plugUpstream[obj]] if s and obj in self.scene.plugUpstream else []) + (self.scene.plugDownstream.get(obj, []) if d else [])
+                found.extend(foundPlugs if (p or plugs) else [self.NodeOf(plug) for plug in foundPlugs])
+                continue
+            if s:
+                found.extend(self.scene.upstream.get(self.NodeOf(obj), []))
+            if d:
+                found.extend(self.scene.downstream.get(self.NodeOf(obj), []))
+        found = [name for name in found if self.NodeOf(name) in self.scene.nodes]
+        if type:
+            found = [name for name in found if self.scene.nodes[self.NodeOf(name)].type == type]
+        return found or None
+
+    def Cmd_select(self, objs = None, r = False, cl = False, clear = False, **kwargs):
+        self.scene.selection = [] if (cl or clear) else self.AsList(objs)
+
+    def Cmd_createNode(self, nodeType, n = None, name = None, p = None, parent = None, **kwargs):
+        return self.scene.CreateNode(nodeType, n or name, p or parent)
+
+    def Cmd_group(self, objs = None, n = None, name = None, em = False, **kwargs):
+        grp = self.scene.CreateNode("transform", n or name)
+        for obj in self.AsList(objs):
+            self.scene.Reparent(obj, grp)
+        return grp
+
+    def Cmd_parent(self, *objs, w = False, world = False, **kwargs):
+        *children, parent = objs
+        for child in children:
+            for name in self.AsList(child):
+                self.scene.Reparent(name, None if (w or world) else parent)
+        return [name for child in children for name in self.AsList(child)]
+
+    def Cmd_circle(self, n = None, name = None, **kwargs):
+        curve = self.scene.CreateTransformWithShape(n or name or "nurbsCircle1", "nurbsCurve")
+        return [curve, self.scene.CreateNode("makeNurbCircle")]
+
+    def Cmd_curve(self, n = None, name = None, **kwargs):
+        return self.scene.CreateTransformWithShape(n or name or "curve1", "nurbsCurve")
+
+    def Cmd_spaceLocator(self, n = None, name = None, **kwargs):
+        return [self.scene.CreateTransformWithShape(n or name or "locator1", "locator")]
+
+    def Cmd_joint(self, n = None, name = None, **kwargs):
+        return self.scene.CreateNode("joint", n or name, self.scene.selection[0] if self.scene.selection else None)
+
+    def Cmd_rename(self, obj, newName, **kwargs):
+        node = self.scene.nodes.pop(obj)
+        node.name = self.scene.UniqueName(newName)
+        self.scene.nodes[node.name] = node
+        if node.parent:
+            siblings = self.scene.nodes[node.parent].children
+            siblings[siblings.index(obj)] = node.name
+        for child in node.children:
+            self.scene.nodes[child].parent = node.name
+        return node.name
+
+    def Cmd_delete(self, objs, **kwargs):
+        for obj in self.AsList(objs):
+            self.scene.Delete(self.NodeOf(obj))
+
+    def Cmd_xform(self, obj, m = False, matrix = False, **kwargs):
+        x, y, z = self.scene.nodes[obj].position
+        if m or matrix:
+            return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, x, y, z, 1.0]
+        return [x, y, z]
+
+    def Cmd_getAttr(self, attr, lock = False, l = False, **kwargs):
+        if lock or l:
+            return False
+        node, attrName = attr.split(".", 1)
+        return self.scene.nodes[node].attrs.get(attrName, 0.0)
+
+    def Cmd_setAttr(self, attr, *values, **kwargs):
+        node, attrName = attr.split(".", 1)
+        self.scene.nodes[node].attrs[attrName] = values[0] if len(values) == 1 else values
+
+    def Cmd_connectAttr(self, srcAttr, dstAttr, **kwargs):
+        self.scene.Connect(srcAttr, dstAttr)
+
+    def Cmd_undoInfo(self, q = False, query = False, state = False, st = False, **kwargs):
+        return True if (q or query) else None
+
+    def Cmd_evaluationManager(self, **kwargs):
+        return []
+
+    def Cmd_ikHandle(self, n = None, name = None, sj = None, ee = None, **kwargs):
+        handle = self.scene.CreateNode("ikHandle", n or name)
+        self.scene.nodes[handle].attrs["poleVector"] = [(0.0, 0.0, 1.0)]
+        return [handle, self.scene.CreateNode("ikEffector", "effector1", ee)]
+
+    def Cmd_orientConstraint(self, *objs, q = False, query = False, weightAliasList = False, wal = False, **kwargs):
+        if q or query:
+            constraint = self.scene.nodes[objs[0]]
+            return [f"{target}W{i}" for i, target in enumerate(constraint.attrs.get("targets", []))]
+
+        *targets, constrained = objs
+        constraint = constrained + "_orientConstraint1"
+        if constraint not in self.scene.nodes:
+            self.scene.CreateNode("orientConstraint", constraint, constrained)
+        self.scene.nodes[constraint].attrs.setdefault("targets", []).extend(targets)
+        for target in targets:
+            self.scene.Connect(target + ".rotate", constraint + ".target")
+        self.scene.Connect(constraint + ".constraintRotate", constrained + ".rotate")
+        return [constraint]
+
+    def Cmd_poleVectorConstraint(self, target, handle, **kwargs):
+        constraint = self.scene.CreateNode("poleVectorConstraint", handle + "_poleVectorConstraint1", handle)
+        self.scene.Connect(target + ".translate", constraint + ".target")
+        return [constraint]
+
+    def Cmd_skinCluster(self, *objs, q = False, query = False, e = False, edit = False, g = False, geometry = False, **kwargs):
+        if q or query:
+            return [dst for dst in self.scene.downstream.get(objs[0], []) if self.scene.nodes[dst].type == "mesh"]
+        if e or edit:
+            return None
+
+        objs = [name for obj in objs for name in self.AsList(obj)]
+        *jnts, mesh = objs
+        skin = self.scene.CreateNode("skinCluster", "skinCluster1")
+        for i, jnt in enumerate(jnts):
+            self.scene.Connect(jnt + ".worldMatrix[0]", f"{skin}.matrix[{i}]")
+        self.scene.Connect(skin + ".outputGeometry[0]", self.scene.GetShapes(mesh)[0] + ".inMesh")
+
+        vertCount = self.scene.topologies[mesh].GetVertCount() if mesh in self.scene.topologies else 0
+        self.scene.skins[skin] = FakeSkin(jnts, np.zeros((vertCount, len(jnts))))
+        return [skin]
+
+class RecordingMel:
+    def __init__(self, scene:FakeScene, recorder:CallRecorder):
+        self.scene = scene
+        self.recorder = recorder
+
+    def eval(self, command):
+        startTime = time.perf_counter()
+        curveName = re.match(r"\s*curve\s+-n\s+(\S+)", command)
+        if curveName:
+            self.scene.CreateTransformWithShape(curveName.group(1), "nurbsCurve")
+        self.recorder.Record("mel.eval", time.perf_counter() - startTime)
+
+# FakeSkin that counts its reads and writes as the MFnSkinCluster calls they stand for
+class RecordingSkin:
+    def __init__(self, fakeSkin:FakeSkin, recorder:CallRecorder):
+        self.fakeSkin = fakeSkin
+        self.recorder = recorder
+
+    def GetVertCount(self):
+        return self.fakeSkin.GetVertCount()
+
+    def GetInfluences(self):
+        self.recorder.Record("om.MFnSkinCluster.influenceObjects", 0.0)
+        return self.fakeSkin.GetInfluences()
+
+    def GetWeights(self):
+        startTime = time.perf_counter()
+        weights = self.fakeSkin.GetWeights()
+        self.recorder.Record("om.MFnSkinCluster.getWeights", time.perf_counter() - startTime)
+        return weights
+
+    def SetWeights(self, weights):
+        startTime = time.perf_counter()
+        self.fakeSkin.SetWeights(weights)
+        self.recorder.Record("om.MFnSkinCluster.setWeights", time.perf_counter() - startTime)
+
+# SkeletonIndex that reads the fake scene instead of iterating the dag
+class FakeSkeletonIndex(SkeletonIndex):
+    scene : FakeScene = None
+    recorder : CallRecorder = None
+
+    def Build(self):
+        pending = [self.root]
+        while pending:
+            jnt = pending.pop(0)
+            node = self.scene.nodes[jnt]
+            self.joints.append(jnt)
+            self.children[jnt] = [child for child in node.children if self.scene.nodes[child].type == "joint"]
+            self.positions[jnt] = FakeMVector(*node.position)
+            self.sides[jnt] = GetSideOfName(jnt)
+            for child in self.children[jnt]:
+                self.parents[child] = jnt
+            pending.extend(self.children[jnt])
+        self.recorder.Record("om.MItDag", 0.0)
+
+# Swaps maya.cmds, maya.mel and the OpenMaya backed pieces of the given tool modules for recording stand ins
+class RecordingMaya:
+    def __init__(self, scene:FakeScene, modules):
+        self.scene = scene
+        self.modules = modules
+        self.recorder = CallRecorder()
+        self.cmds = RecordingCmds(scene, self.recorder)
+        self.mel = RecordingMel(scene, self.recorder)
+        self.originals = []
+
+    def GetSkin(self, skin, mesh):
+        return RecordingSkin(self.scene.skins[skin], self.recorder)
+
+    def GetTopology(self, mesh):
+        self.recorder.Record("om.MFnMesh.getVertices", 0.0)
+        return self.scene.topologies[mesh]
+
+    def CreateMeshFromSegment(self, segment, name):
+        startTime = time.perf_counter()
+        mesh = self.scene.CreateTransformWithShape(name, "mesh")
+        self.scene.topologies[mesh] = MeshTopology(segment.points, segment.faceVertCounts, segment.faceVertIndices)
+        self.recorder.Record("om.MFnMesh.create", time.perf_counter() - startTime)
+        return mesh
+
+    def GetNodeHandles(self, names):
+        self.recorder.Record("om.MSelectionList.add", 0.0)
+        missing = [name for name in names if name not in self.scene.nodes]
+        if missing:
+            raise Exception(f"{missing[0]} does not exist or matches more than one node")
+        return [FakeNodeHandle(self.scene, self.scene.nodes[name]) for name in names]
+
+    def GetNodeHandle(self, name):
+        return self.GetNodeHandles([name])[0]
+
+    def ApplyOverrideColors(self, shapeColors):
+        if not shapeColors:
+            return 0
+        startTime = time.perf_counter()
+        for shape, colorRGB in shapeColors.items():
+            attrs = self.scene.nodes[shape].attrs
+            attrs.update({"overrideEnabled" : True, "overrideRGBColors" : True})
+            for channel, value in zip("RGB", colorRGB):
+                attrs["overrideColor" + channel] = value
+        self.recorder.Record("om.MDGModifier.doIt", time.perf_counter() - startTime)
+        return len(shapeColors)
+
+    def GetReplacements(self):
+        skeletonIndex = type("RecordedSkeletonIndex", (FakeSkeletonIndex,), {"scene" : self.scene, "recorder" : self.recorder})
+        return {
+            "mc" : self.cmds,
+            "mel" : self.mel,
+            "MVector" : FakeMVector,
+            "MayaSkin" : self.GetSkin,
+            "MeshTopology" : types.SimpleNamespace(FromMesh=self.GetTopology),
+            "CreateMeshFromSegment" : self.CreateMeshFromSegment,
+            "SkeletonIndex" : skeletonIndex,
+            "GetNodeHandles" : self.GetNodeHandles,
+            "GetNodeHandle" : self.GetNodeHandle,
+            "ApplyOverrideColors" : self.ApplyOverrideColors,
+        }
+
+    def __enter__(self):
+        replacements = self.GetReplacements()
+        for module in self.modules:
+            for attr, replacement in replacements.items():
+                if hasattr(module, attr):
+                    self.originals.append((module, attr, getattr(module, attr)))
+                    setattr(module, attr, replacement)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        for module, attr, original in reversed(self.originals):
+            setattr(module, attr, original)
+        self.originals = []
+        return False
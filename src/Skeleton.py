@@ -0,0 +1,102 @@
+import re
+import maya.api.OpenMaya as om
+
+SIDE_TOKENS = {
+    "left" : {"l", "lf", "lft", "left"},
+    "right" : {"r", "rt", "rgt", "right"},
+}
+
+def GetNameTokens(name):
+    # "mixamorig:LeftForeArm" -> ["Left", "Fore", "Arm"], "arm_L_01" -> ["arm", "L", "01"]
+    shortName = re.split(r"[|:]", name)[-1]
+    tokens = []
+    for part in shortName.split("_"):
+        tokens.extend(re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+", part))
+    return tokens
+
+def GetSideOfName(name):
+    tokens = {token.lower() for token in GetNameTokens(name)}
+    for side, sideTokens in SIDE_TOKENS.items():
+        if tokens & sideTokens:
+            return side
+    return "center"
+
+# The whole joint hierarchy under a root read in one dag iteration: parents, children, world positions and sides
+class SkeletonIndex:
+    def __init__(self, rootJnt):
+        self.root = rootJnt
+        self.joints = []
+        self.parents = {}
+        self.children = {}
+        self.positions = {}
+        self.sides = {}
+        self.Build()
+
+    def Build(self):
+        selection = om.MSelectionList()
+        selection.add(self.root)
+        dagIt = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kJoint)
+        dagIt.reset(selection.getDependNode(0), om.MItDag.kDepthFirst, om.MFn.kJoint)
+
+        while not dagIt.isDone():
+            path = dagIt.getPath()
+            jnt = path.partialPathName()
+            self.joints.append(jnt)
+            self.children[jnt] = []
+            self.positions[jnt] = om.MTransformationMatrix(path.inclusiveMatrix()).translation(om.MSpace.kWorld)
+            self.sides[jnt] = GetSideOfName(jnt)
+
+            if jnt != self.root:
+                parentPath = om.MDagPath(path)
+                parentPath.pop()
+                parent = parentPath.partialPathName()
+                self.parents[jnt] = parent
+                self.children.setdefault(parent, []).append(jnt)
+
+            dagIt.next()
+
+    def GetChains(self):
+        # runs of joints with no branching, parents always come before their children
+        chains = []
+        starts = [self.root]
+        while starts:
+            chain = [starts.pop(0)]
+            while len(self.children[chain[-1]]) == 1:
+                chain.append(self.children[chain[-1]][0])
+
+            chains.append(chain)
+            starts.extend(self.children[chain[-1]])
+
+        return chains
+
+    def GetBoneLength(self, parent, child):
+        return (self.positions[child] - self.positions[parent]).length()
+
+    def PickLimbInChain(self, chain):
+        # the three joints spanning the two longest consecutive bones, upperarm-forearm-hand rather than clavicle-upperarm-forearm
+        spans = [self.GetBoneLength(chain[i], chain[i + 1]) + self.GetBoneLength(chain[i + 1], chain[i + 2]) for i in range(len(chain) - 2)]
+        start = spans.index(max(spans))
+        return chain[start], chain[start + 1], chain[start + 2]
+
+    def FindLimbs(self, includeFingers = False):
+        limbs = []
+        limbEnds = set()
+        for chain in self.GetChains():
+            if len(chain) < 3:
+                continue
+
+            isFinger = self.parents.get(chain[0]) in limbEnds
+            if isFinger and not includeFingers:
+                continue
+
+            # a chain that does not end in a leaf fans out into more chains, a center one is the trunk (a spine under
+            # the arms and neck) and a sided one is a hand whose chains are its fingers
+            fansOut = bool(self.children[chain[-1]])
+            if fansOut and self.sides[chain[0]] == "center":
+                continue
+
+            limbs.append(self.PickLimbInChain(chain))
+            if fansOut and not isFinger:
+                limbEnds.add(chain[-1])
+
+        return limbs
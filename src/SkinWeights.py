@@ -0,0 +1,137 @@
+import hashlib
+import numpy as np
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+# Reads the whole vertex by influence weight matrix of a skinCluster in one api call,
+# instead of two skinPercent calls per vertex.
+class MayaSkin:
+    def __init__(self, skin, mesh):
+        self.skin = skin
+        self.mesh = mesh
+
+        selection = om.MSelectionList()
+        selection.add(skin)
+        selection.add(mesh)
+        self.skinFn = oma.MFnSkinCluster(selection.getDependNode(0))
+        self.meshPath = selection.getDagPath(1)
+        if self.meshPath.apiType() != om.MFn.kMesh:
+            self.meshPath.extendToShape()
+
+    def GetVertCount(self):
+        return om.MFnMesh(self.meshPath).numVertices
+
+    def GetInfluences(self):
+        return [path.partialPathName() for path in self.skinFn.influenceObjects()]
+
+    def GetAllVertsComponent(self):
+        componentFn = om.MFnSingleIndexedComponent()
+        component = componentFn.create(om.MFn.kMeshVertComponent)
+        componentFn.setCompleteData(self.GetVertCount())
+        return component
+
+    def GetWeights(self)->np.ndarray:
+        weights, influenceCount = self.skinFn.getWeights(self.meshPath, self.GetAllVertsComponent())
+        matrix = np.fromiter(weights, dtype=np.float64, count=len(weights))
+        return matrix.reshape(-1, influenceCount)
+
+    def SetWeights(self, weights:np.ndarray):
+        # one write for every vertex and influence, columns in GetInfluences order
+        influenceIndices = om.MIntArray(list(range(weights.shape[1])))
+        values = om.MDoubleArray(np.ascontiguousarray(weights, dtype=np.float64).ravel().tolist())
+        self.skinFn.setWeights(self.meshPath, self.GetAllVertsComponent(), influenceIndices, values, False)
+
+# Stand in for a skinCluster so the weight math can be checked without a maya session
+class FakeSkin:
+    def __init__(self, influences, weights):
+        self.influences = list(influences)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape[1] != len(self.influences):
+            raise ValueError(f"Weights have {self.weights.shape[1]} columns but there are {len(self.influences)} influences")
+
+    @classmethod
+    def Random(cls, vertCount, influenceCount, influencesPerVert = 4, seed = 0):
+        rng = np.random.default_rng(seed)
+        weights = np.zeros((vertCount, influenceCount))
+        influencesPerVert = min(influencesPerVert, influenceCount)
+        cols = np.argsort(rng.random((vertCount, influenceCount)), axis=1)[:, :influencesPerVert]
+        rows = np.arange(vertCount)[:, None]
+        weights[rows, cols] = rng.random((vertCount, influencesPerVert))
+        weights /= weights.sum(axis=1, keepdims=True)
+        return cls([f"jnt_{i}" for i in range(influenceCount)], weights)
+
+    def GetVertCount(self):
+        return self.weights.shape[0]
+
+    def GetInfluences(self):
+        return list(self.influences)
+
+    def GetWeights(self)->np.ndarray:
+        return self.weights.copy()
+
+    def SetWeights(self, weights:np.ndarray):
+        self.weights = np.asarray(weights, dtype=np.float64).reshape(self.weights.shape).copy()
+
+def GetDominantInfluences(weights:np.ndarray)->np.ndarray:
+    # argmax picks the first of equal weights, same as the per vertex loop used to
+    return np.argmax(weights, axis=1)
+
+def GetVertIndicesPerInfluence(dominantInfluences:np.ndarray, influenceCount):
+    order = np.argsort(dominantInfluences, kind="stable")
+    counts = np.bincount(dominantInfluences, minlength=influenceCount)
+    return np.split(order, np.cumsum(counts)[:-1])
+
+def GetInfluenceVertMap(skinSource):
+    influences = skinSource.GetInfluences()
+    dominant = GetDominantInfluences(skinSource.GetWeights())
+    return dict(zip(influences, GetVertIndicesPerInfluence(dominant, len(influences))))
+
+def GetOwnershipHashes(dominantInfluences:np.ndarray, influences):
+    # a digest of the vertices each influence owns, an unchanged digest means the same segment would be built again
+    vertsPerInfluence = GetVertIndicesPerInfluence(dominantInfluences, len(influences))
+    return {influence : GetArrayHash(verts) for influence, verts in zip(influences, vertsPerInfluence) if verts.size}
+
+def GetArrayHash(values:np.ndarray):
+    return hashlib.sha1(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+def GetActiveInfluences(weights:np.ndarray, tolerance = 0.0)->np.ndarray:
+    # influences carrying weight on at least one of the given rows
+    return np.flatnonzero((weights > tolerance).any(axis=0))
+
+def PruneWeights(weights:np.ndarray, maxInfluences, minWeight = 0.0)->np.ndarray:
+    # drops weights under minWeight, keeps the maxInfluences largest per vertex and renormalizes every row to 1
+    rows = np.arange(weights.shape[0])[:, None]
+    pruned = np.where(weights >= minWeight, weights, 0.0)
+    if pruned.shape[1] > maxInfluences:
+        keep = np.argpartition(-pruned, maxInfluences - 1, axis=1)[:, :maxInfluences]
+        kept = np.zeros(pruned.shape, dtype=bool)
+        kept[rows, keep] = True
+        pruned[~kept] = 0.0
+
+    # a vertex with every weight under the threshold keeps its dominant influence instead of losing all of them
+    empty = np.flatnonzero(pruned.sum(axis=1) == 0.0)
+    pruned[empty, GetDominantInfluences(weights[empty])] = 1.0
+
+    return pruned / pruned.sum(axis=1, keepdims=True)
+
+def QuantizeWeights(weights:np.ndarray, bits = 8)->np.ndarray:
+    # rounds to steps of 1 / (2^bits - 1) the way the engine stores them, handing the leftover steps of each row
+    # to the weights that lost the most in rounding so every row still sums to exactly 1
+    levels = 2 ** bits - 1
+    scaled = weights * levels
+    quantized = np.floor(scaled)
+    missing = np.rint(levels * (weights.sum(axis=1) > 0) - quantized.sum(axis=1)).astype(np.int64)
+
+    order = np.argsort(quantized - scaled, axis=1)
+    ranks = np.empty_like(order)
+    ranks[np.arange(weights.shape[0])[:, None], order] = np.arange(weights.shape[1])
+    quantized += ranks < missing[:, None]
+    return quantized / levels
+
+def GetInfluenceCountHistogram(weights:np.ndarray, tolerance = 0.0)->np.ndarray:
+    # histogram[n] is how many vertices have n influences over the tolerance
+    return np.bincount((weights > tolerance).sum(axis=1), minlength=weights.shape[1] + 1)
+
+def RemapWeightsByName(weights:np.ndarray, sourceInfluences, targetInfluences):
+    columnOfInfluence = {influence : i for i, influence in enumerate(sourceInfluences)}
+    return weights[:, [columnOfInfluence[influence] for influence in targetInfluences]]
@@ -0,0 +1,13 @@
+import json
+import os
+
+# What the batch workers and the tools that start them share, kept apart from Batch so a tool does not import the batch runner
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+PROGRESS_PREFIX = "MAYATOOLS_PROGRESS " # a worker started with --progress prints its events on stdout after this
+
+def GetWorkerEnv():
+    return dict(os.environ, PYTHONPATH=os.pathsep.join([SRC_DIR, os.environ.get("PYTHONPATH", "")]))
+
+def PrintProgressEvent(event):
+    print(PROGRESS_PREFIX + json.dumps(event), flush=True)
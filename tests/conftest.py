@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the tools import flat from src, and the vendored maya stubs stand in for maya outside of it
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.append(os.path.join(ROOT_DIR, "vendor", "mayaSDK"))
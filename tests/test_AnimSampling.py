@@ -0,0 +1,37 @@
+import numpy as np
+from AnimSampling import ReduceKeys, ReconstructFromKeys, GetReductionErrors, GetChannelTolerances, CHANNELS
+
+TOLERANCES = {"translate" : 0.01, "rotate" : 0.05, "scale" : 0.001}
+
+def MakeSamples(frameCount, jointCount, curve):
+    frames = np.arange(frameCount, dtype=np.float64)
+    return np.repeat(curve(frames)[:, None, None], jointCount, axis=1).repeat(len(CHANNELS), axis=2)
+
+def test_a_straight_line_keeps_only_its_end_keys():
+    samples = MakeSamples(30, 2, lambda frames: frames * 0.5)
+    keep = ReduceKeys(samples, GetChannelTolerances(TOLERANCES))
+    assert keep.sum(axis=0).tolist() == [[2] * len(CHANNELS)] * 2
+    assert keep[0].all() and keep[-1].all()
+
+def test_a_corner_is_kept():
+    samples = MakeSamples(21, 1, lambda frames: np.abs(frames - 10.0))
+    keep = ReduceKeys(samples, GetChannelTolerances(TOLERANCES))
+    np.testing.assert_array_equal(np.flatnonzero(keep[:, 0, 0]), [0, 10, 20])
+
+def test_the_reduced_curve_stays_within_tolerance():
+    rng = np.random.default_rng(3)
+    samples = np.cumsum(rng.normal(0, 0.2, (120, 4, len(CHANNELS))), axis=0)
+    keep = ReduceKeys(samples, GetChannelTolerances(TOLERANCES))
+
+    assert keep.sum() < keep.size
+    errors = GetReductionErrors(samples, keep)
+    for group, tolerance in TOLERANCES.items():
+        assert errors[group] <= tolerance + 1e-9
+
+def test_reconstruct_keeps_the_kept_samples():
+    samples = MakeSamples(10, 1, lambda frames: frames ** 2)
+    keep = np.zeros(samples.shape, dtype=bool)
+    keep[[0, 5, 9]] = True
+    reconstructed = ReconstructFromKeys(samples, keep)
+    np.testing.assert_allclose(reconstructed[[0, 5, 9]], samples[[0, 5, 9]])
+    np.testing.assert_allclose(reconstructed[2, 0, 0], 25 * 2 / 5)
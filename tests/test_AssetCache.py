@@ -0,0 +1,22 @@
+import os
+import numpy as np
+from AssetCache import AssetCache, MeshSkinData
+from MeshPartition import MeshTopology
+
+def MakeData(seed):
+    topology = MeshTopology.Grid(10, 10)
+    weights = np.random.default_rng(seed).random((topology.GetVertCount(), 4))
+    return MeshSkinData(topology, ["a", "b", "c", "d"], weights, np.argmax(weights, axis=1))
+
+def test_eviction_keeps_the_entry_just_stored_and_drops_dangling_links(tmp_path):
+    cache = AssetCache(str(tmp_path), maxBytes=1)
+    firstHash = cache.Store(MakeData(0))
+    cache.LinkSource("first", firstHash)
+    secondHash = cache.Store(MakeData(1))
+    cache.LinkSource("second", secondHash)
+
+    # every store goes over the limit, only the older entry and its link go
+    assert not os.path.exists(cache.GetEntryDir(firstHash))
+    assert os.path.exists(cache.GetEntryDir(secondHash))
+    assert sorted(os.listdir(cache.sourcesDir)) == ["second"]
+    assert cache.LoadSource("second").contentHash == secondHash
@@ -0,0 +1,29 @@
+import json
+from MayaToUE import MayaToUE, AnimClip
+
+def GetClipTuples(clips):
+    return [(clip.subfix, clip.frameMin, clip.frameMax, clip.shouldExport) for clip in clips]
+
+def test_csv_clips_skip_the_header_and_blank_lines(tmp_path):
+    path = tmp_path / "clips.csv"
+    path.write_text("subfix,min,max,export\nwalk,1,30\n\nrun cycle,31,50,0\nidle,-10,0,yes\n")
+    clips = MayaToUE().GetClipsFromFile(str(path))
+    assert GetClipTuples(clips) == [("walk", 1, 30, True), ("run_cycle", 31, 50, False), ("idle", -10, 0, True)]
+
+def test_json_clips_as_a_list_or_as_settings(tmp_path):
+    clipDicts = [{"subfix" : "walk", "frameMin" : 1, "frameMax" : 30}, {"subfix" : "run", "frameMin" : 31, "frameMax" : 50, "shouldExport" : False}]
+    listPath = tmp_path / "clips.json"
+    listPath.write_text(json.dumps(clipDicts))
+    settingsPath = tmp_path / "settings.JSON"
+    settingsPath.write_text(json.dumps({"clips" : clipDicts}))
+
+    expected = [("walk", 1, 30, True), ("run", 31, 50, False)]
+    assert GetClipTuples(MayaToUE().GetClipsFromFile(str(listPath))) == expected
+    assert GetClipTuples(MayaToUE().GetClipsFromFile(str(settingsPath))) == expected
+
+def test_clips_overlap_only_on_shared_frames():
+    walk, run, idle = AnimClip("walk", 1, 30), AnimClip("run", 30, 50), AnimClip("idle", 51, 60)
+    mayaToUE = MayaToUE()
+    assert mayaToUE.ClipsOverlap(run, [walk])
+    assert not mayaToUE.ClipsOverlap(idle, [walk, run])
+    assert not mayaToUE.ClipsOverlap(walk, [])
@@ -0,0 +1,178 @@
+import random
+import types
+import pytest
+import MayaUtils
+
+# Selection list over a few named nodes, several names can reach the same node like a short and a long path do
+class FakeSelectionList:
+    NODES = {"a" : "nodeA", "|a" : "nodeA", "b" : "nodeB", "|grp|b" : "nodeB", "c" : "nodeC"}
+
+    def __init__(self):
+        self.items = []
+
+    def add(self, name):
+        if name not in self.NODES:
+            raise RuntimeError(name)
+        if self.NODES[name] not in self.items:
+            self.items.append(self.NODES[name])
+
+    def length(self):
+        return len(self.items)
+
+    def getDependNode(self, i):
+        return self.items[i]
+
+@pytest.fixture
+def fakeOm(monkeypatch):
+    monkeypatch.setattr(MayaUtils, "om", types.SimpleNamespace(MSelectionList=FakeSelectionList))
+    monkeypatch.setattr(MayaUtils, "NodeHandle", lambda obj: obj)
+
+def test_node_handles_follow_the_names_in_order(fakeOm):
+    assert MayaUtils.GetNodeHandles(["b", "a", "c"]) == ["nodeB", "nodeA", "nodeC"]
+
+def test_repeated_names_and_other_paths_to_the_same_node_share_a_handle(fakeOm):
+    handles = MayaUtils.GetNodeHandles(["a", "b", "a", "|a", "|grp|b", "c"])
+    assert handles == ["nodeA", "nodeB", "nodeA", "nodeA", "nodeB", "nodeC"]
+
+def test_a_missing_name_fails(fakeOm):
+    with pytest.raises(Exception, match="missing does not exist"):
+        MayaUtils.GetNodeHandles(["a", "missing"])
+
+# Dependency nodes for NodeHandle, a referenced file loaded twice gives both copies the same uuid
+class FakeNode:
+    def __init__(self, name, uuid):
+        self.name = name
+        self.uuidString = uuid
+        self.alive = True
+
+    def hasFn(self, fn):
+        return False
+
+class FakeObjectHandle:
+    def __init__(self, obj):
+        self.obj = obj
+
+    def isValid(self):
+        return self.obj.alive
+
+    def object(self):
+        return self.obj
+
+class FakeDependencyNode:
+    def __init__(self, obj):
+        self.obj = obj
+
+    def uuid(self):
+        return types.SimpleNamespace(asString=lambda: self.obj.uuidString)
+
+    def name(self):
+        return self.obj.name
+
+@pytest.fixture
+def fakeNodeOm(monkeypatch):
+    fakeOm = types.SimpleNamespace(MObjectHandle=FakeObjectHandle, MFnDependencyNode=FakeDependencyNode, MFn=types.SimpleNamespace(kDagNode=0))
+    monkeypatch.setattr(MayaUtils, "om", fakeOm)
+
+def test_referenced_copies_sharing_a_uuid_are_different_handles(fakeNodeOm):
+    first, second = FakeNode("charA:body", "uuid-1"), FakeNode("charB:body", "uuid-1")
+    handles = {MayaUtils.NodeHandle(first) : "a", MayaUtils.NodeHandle(second) : "b"}
+    assert len(handles) == 2
+    assert handles[MayaUtils.NodeHandle(first)] == "a"
+
+def test_a_stale_handle_matches_the_node_by_uuid(fakeNodeOm):
+    node = FakeNode("body", "uuid-2")
+    stale = MayaUtils.NodeHandle(node)
+    node.alive = False
+    # an undone delete brings the node back as a new object with the same uuid
+    assert stale == MayaUtils.NodeHandle(FakeNode("body", "uuid-2"))
+
+# maya.cmds with an undo queue of step names, a chunk is only pushed when a command ran inside it
+class FakeUndoCmds:
+    def __init__(self):
+        self.queue = ["userStep"]
+        self.chunk = None
+
+    def undoInfo(self, q = False, state = False, undoName = False, openChunk = False, closeChunk = False, chunkName = None):
+        if q:
+            return True if state else self.queue[-1]
+        if openChunk:
+            self.chunk = (chunkName, [])
+        if closeChunk and self.chunk[1]:
+            self.queue.append(self.chunk[0])
+
+    def refresh(self, **kwargs):
+        pass
+
+    def createNode(self, nodeType):
+        self.chunk[1].append(nodeType)
+
+    def undo(self):
+        self.queue.pop()
+
+def test_a_failed_transaction_only_undoes_its_own_chunk(monkeypatch):
+    cmds = FakeUndoCmds()
+    monkeypatch.setattr(MayaUtils, "mc", cmds)
+
+    with pytest.raises(RuntimeError):
+        with MayaUtils.BuildTransaction("Empty"):
+            raise RuntimeError("failed before any command")
+    assert cmds.queue == ["userStep"]
+
+    with pytest.raises(RuntimeError):
+        with MayaUtils.BuildTransaction("Build"):
+            cmds.createNode("transform")
+            raise RuntimeError("failed after a command")
+    assert cmds.queue == ["userStep"]
+
+# Stand in for the maya dependency graph so a GraphWalk can be checked without maya
+class SyntheticGraph:
+    def __init__(self, upstreamMap, nodeTypes):
+        self.upstreamMap = upstreamMap
+        self.downstreamMap = {}
+        for node, sources in upstreamMap.items():
+            for source in sources:
+                self.downstreamMap.setdefault(source, []).append(node)
+        self.nodeTypes = nodeTypes
+
+    @classmethod
+    def Random(cls, nodeCount, fanIn = 2, typeNames = ("transform", "joint", "skinCluster", "mesh", "tweak"), seed = 0):
+        rng = random.Random(seed)
+        upstreamMap = {}
+        nodeTypes = {}
+        for i in range(nodeCount):
+            node = f"node{i}"
+            nodeTypes[node] = rng.choice(typeNames)
+            upstreamMap[node] = [f"node{rng.randrange(i)}" for _ in range(fanIn)] if i else []
+        return cls(upstreamMap, nodeTypes)
+
+    def GetNeighbours(self, nodes, upstream):
+        connectionMap = self.upstreamMap if upstream else self.downstreamMap
+        neighbours = []
+        for node in nodes:
+            neighbours.extend(connectionMap.get(node, []))
+        return neighbours
+
+    def GetNodeTypes(self, nodes):
+        return {node : self.nodeTypes[node] for node in nodes if node in self.nodeTypes}
+
+def GetAncestors(graph, node):
+    ancestors = set()
+    pending = list(graph.upstreamMap[node])
+    while pending:
+        source = pending.pop()
+        if source not in ancestors:
+            ancestors.add(source)
+            pending.extend(graph.upstreamMap[source])
+    return ancestors
+
+def test_graph_walk_finds_every_upstream_node_once():
+    graph = SyntheticGraph.Random(300, seed=2)
+    walk = MayaUtils.GraphWalk("node299", upstream=True, graph=graph)
+    assert len(walk.nodes) == len(set(walk.nodes))
+    assert set(walk.nodes) == GetAncestors(graph, "node299")
+    assert walk.GetNodesOfType("skinCluster") == [node for node in walk.nodes if graph.nodeTypes[node] == "skinCluster"]
+
+def test_graph_walk_stops_at_the_search_depth():
+    graph = SyntheticGraph({"a" : [], "b" : ["a"], "c" : ["b"], "d" : ["c"]}, {"a" : "joint", "b" : "transform", "c" : "tweak", "d" : "mesh"})
+    assert MayaUtils.GraphWalk("d", upstream=True, searchDepth=2, graph=graph).nodes == ["c", "b"]
+    assert MayaUtils.GraphWalk("a", upstream=False, graph=graph).nodes == ["b", "c", "d"]
@@ -0,0 +1,56 @@
+import numpy as np
+from MeshPartition import MeshTopology, PartitionMesh, GetFacesPerOwner, GetSegmentVertMaps
+
+def GetColumnOwners(topology, cols, owners):
+    # the grid split into vertical strips of columns, one owner per strip
+    vertCols = np.arange(topology.GetVertCount()) % (cols + 1)
+    return np.minimum(vertCols * owners // (cols + 1), owners - 1)
+
+def test_partition_covers_every_face_and_maps_back_to_the_source():
+    topology = MeshTopology.Grid(4, 6)
+    vertOwners = GetColumnOwners(topology, 6, 3)
+    segments = PartitionMesh(topology, vertOwners, 3)
+
+    assert [segment.owner for segment in segments] == [0, 1, 2]
+    coveredFaces = np.unique(np.concatenate([segment.faces for segment in segments]))
+    np.testing.assert_array_equal(coveredFaces, np.arange(topology.GetFaceCount()))
+
+    for segment in segments:
+        np.testing.assert_allclose(segment.points, topology.points[segment.vertMap])
+        assert segment.faceVertCounts.sum() == segment.faceVertIndices.size
+        # every segment face is the source face with its vertices renumbered
+        sourceIndices = segment.vertMap[segment.faceVertIndices]
+        np.testing.assert_array_equal(sourceIndices, topology.faceVertIndices[topology.GetFaceVertSlots(segment.faces)])
+
+def test_partition_gives_a_face_to_every_owner_of_its_vertices():
+    topology = MeshTopology.Grid(1, 2)
+    vertOwners = np.array([0, 1, 1, 0, 1, 1])
+    segments = PartitionMesh(topology, vertOwners, 2)
+    np.testing.assert_array_equal(segments[0].faces, [0])
+    np.testing.assert_array_equal(segments[1].faces, [0, 1])
+
+def test_partition_builds_only_the_owners_asked_for():
+    topology = MeshTopology.Grid(4, 6)
+    vertOwners = GetColumnOwners(topology, 6, 3)
+    full = PartitionMesh(topology, vertOwners, 3)
+    partial = PartitionMesh(topology, vertOwners, 3, ownersToBuild={1})
+
+    assert partial[0] is None and partial[2] is None
+    np.testing.assert_array_equal(partial[1].vertMap, full[1].vertMap)
+    np.testing.assert_array_equal(partial[1].faceVertIndices, full[1].faceVertIndices)
+
+def test_an_owner_with_no_vertices_has_no_segment():
+    topology = MeshTopology.Grid(2, 2)
+    segments = PartitionMesh(topology, np.zeros(topology.GetVertCount(), dtype=np.int64), 3)
+    assert segments[0] is not None and segments[1] is None and segments[2] is None
+
+def test_vert_maps_match_the_built_segments():
+    topology = MeshTopology.Grid(4, 6)
+    vertOwners = GetColumnOwners(topology, 6, 3)
+    facesPerOwner = GetFacesPerOwner(topology, vertOwners, 3)
+    vertMaps = GetSegmentVertMaps(topology, facesPerOwner, [0, 2])
+
+    segments = PartitionMesh(topology, vertOwners, 3, facesPerOwner=facesPerOwner)
+    assert sorted(vertMaps) == [0, 2]
+    for owner, vertMap in vertMaps.items():
+        np.testing.assert_array_equal(vertMap, segments[owner].vertMap)
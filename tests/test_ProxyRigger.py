@@ -0,0 +1,60 @@
+import numpy as np
+import AssetCache
+import ControllerShapes
+import LimbRiggingTool
+import MayaToUE
+import MayaUtils
+import MeshPartition
+import ProxyRigger
+from RecordingMaya import FakeScene, RecordingMaya
+
+TOOL_MODULES = [MayaUtils, MeshPartition, AssetCache, ControllerShapes, LimbRiggingTool, ProxyRigger, MayaToUE]
+
+def BuildProxyScene():
+    scene = FakeScene()
+    scene.selection = [scene.AddSkinnedMesh("body", 5, 10, 50)]
+    return scene
+
+def test_update_rebuilds_only_the_repainted_segments():
+    scene = BuildProxyScene()
+    with RecordingMaya(scene, TOOL_MODULES) as recording:
+        ProxyRigger.ProxyRigger().CreateProxyRigFromSelectedMesh()
+        assert recording.recorder.counts["om.MFnMesh.create"] == 5
+
+        # a few vertices of the first joint repainted to the second, only those two segments change
+        skin = scene.skins["body_skinCluster"]
+        ownedByFirst = np.flatnonzero(np.argmax(skin.weights, axis=1) == 0)[:10]
+        skin.weights[ownedByFirst] = np.eye(skin.weights.shape[1])[1]
+
+        recording.recorder.Reset()
+        ProxyRigger.ProxyRigger().UpdateProxyRigFromSelectedMesh()
+        assert recording.recorder.counts["om.MFnMesh.create"] == 2
+
+def test_proxy_playback_switches_both_representations():
+    scene = BuildProxyScene()
+    with RecordingMaya(scene, TOOL_MODULES):
+        globalProxyCtrl = ProxyRigger.ProxyRigger().CreateProxyRigFromSelectedMesh()
+
+    # off after a build, the model keeps its own skin until the toggle is switched on
+    assert scene.nodes[globalProxyCtrl].attrs["proxyPlayback"] == 0
+    driven = {plug.split(".")[1] for plug in scene.plugDownstream[globalProxyCtrl + ".proxyPlayback"]}
+    reverseNode = next(plug.split(".")[0] for plug in scene.plugDownstream[globalProxyCtrl + ".proxyPlayback"] if plug.endswith(".inputX"))
+    # on: the model skin passes through and the proxy group shows, off: the model shows and every segment skin passes through
+    assert {"inputX", "nodeState", "input2"} <= driven
+    assert scene.plugUpstream["body.v"] == reverseNode + ".outputX"
+    segmentSkins = [plug for plug in scene.plugDownstream[reverseNode + ".outputX"] if plug.endswith(".nodeState")]
+    assert len(segmentSkins) == 5
+
+def test_update_keeps_the_tool_setting_and_the_rig_mode():
+    scene = BuildProxyScene()
+    with RecordingMaya(scene, TOOL_MODULES):
+        rigger = ProxyRigger.ProxyRigger()
+        rigger.useRigidSegments = True
+        globalProxyCtrl = rigger.CreateProxyRigFromSelectedMesh()
+
+        rigger.useRigidSegments = False
+        rigger.UpdateProxyRigFromSelectedMesh()
+        record = rigger.LoadOwnershipRecord(globalProxyCtrl)
+
+    assert rigger.useRigidSegments is False
+    assert record["rigid"] is True
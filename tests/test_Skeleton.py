@@ -0,0 +1,57 @@
+import LimbRiggingTool
+import MayaUtils
+from RecordingMaya import FakeScene, RecordingMaya
+
+def test_chains_without_a_side_are_center_limbs():
+    scene = FakeScene()
+    root = scene.AddSkeleton(2)
+    parent = root
+    for part, position in zip(("tail_01", "tail_02", "tail_03"), ((0.0, 10.0, -2.0), (0.0, 8.0, -6.0), (0.0, 6.0, -10.0))):
+        parent = scene.CreateNode("joint", part, parent)
+        scene.nodes[parent].position = position
+
+    scene.selection = [root]
+    with RecordingMaya(scene, [MayaUtils, LimbRiggingTool]):
+        skeleton, limbs = LimbRiggingTool.LimbRigger().AutoFindAllLimbs()
+
+    assert ("tail_01", "tail_02", "tail_03") in limbs
+    assert len(limbs) == 3
+    assert skeleton.sides["tail_01"] == "center"
+
+def AddChain(scene, parent, joints):
+    for name, position in joints:
+        parent = scene.CreateNode("joint", name, parent)
+        scene.nodes[parent].position = position
+    return parent
+
+def BuildBiped(scene):
+    # hips, legs, a three joint spine, a neck and per side clavicle, arm, forearm and a hand with two fingers
+    hips = AddChain(scene, None, [("Hips", (0.0, 100.0, 0.0))])
+    spine = AddChain(scene, hips, [("Spine", (0.0, 110.0, 0.0)), ("Spine1", (0.0, 120.0, 0.0)), ("Spine2", (0.0, 130.0, 0.0))])
+    AddChain(scene, spine, [("Neck", (0.0, 145.0, 0.0)), ("Head", (0.0, 155.0, 0.0)), ("HeadTop_End", (0.0, 170.0, 0.0))])
+    for side, x in (("Left", 1.0), ("Right", -1.0)):
+        hand = AddChain(scene, spine, [(f"{side}Shoulder", (x * 5, 140.0, 0.0)), (f"{side}Arm", (x * 15, 140.0, 0.0)),
+                                       (f"{side}ForeArm", (x * 40, 140.0, 0.0)), (f"{side}Hand", (x * 65, 140.0, 0.0))])
+        for finger, z in (("Index", 2.0), ("Pinky", -2.0)):
+            AddChain(scene, hand, [(f"{side}Hand{finger}{i}", (x * (67 + i * 3), 140.0, z)) for i in range(1, 4)])
+        AddChain(scene, hips, [(f"{side}UpLeg", (x * 10, 95.0, 0.0)), (f"{side}Leg", (x * 10, 50.0, 0.0)), (f"{side}Foot", (x * 10, 8.0, 0.0)),
+                               (f"{side}ToeBase", (x * 10, 0.0, 10.0)), (f"{side}Toe_End", (x * 10, 0.0, 15.0))])
+    return hips
+
+def FindBipedLimbs(includeFingers):
+    scene = FakeScene()
+    scene.selection = [BuildBiped(scene)]
+    with RecordingMaya(scene, [MayaUtils, LimbRiggingTool]):
+        _, limbs = LimbRiggingTool.LimbRigger().AutoFindAllLimbs(includeFingers)
+    return limbs
+
+def test_biped_limbs_are_the_arms_legs_and_neck():
+    limbs = FindBipedLimbs(False)
+    expected = [("Neck", "Head", "HeadTop_End")]
+    for side in ("Left", "Right"):
+        expected += [(f"{side}Arm", f"{side}ForeArm", f"{side}Hand"), (f"{side}UpLeg", f"{side}Leg", f"{side}Foot")]
+    assert sorted(limbs) == sorted(expected)
+
+def test_biped_fingers_only_when_asked_for():
+    fingers = set(FindBipedLimbs(True)) - set(FindBipedLimbs(False))
+    assert sorted(fingers) == sorted(tuple(f"{side}Hand{finger}{i}" for i in range(1, 4)) for side in ("Left", "Right") for finger in ("Index", "Pinky"))
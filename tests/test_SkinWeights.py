@@ -0,0 +1,73 @@
+import types
+import numpy as np
+from SkinWeights import MayaSkin, FakeSkin, PruneWeights, QuantizeWeights, GetInfluenceVertMap
+
+def GetVertMapPerVertex(skinSource):
+    # the old per vertex loop: one weight query per vertex, the first of equal weights wins
+    influences = skinSource.GetInfluences()
+    vertMap = {influence : [] for influence in influences}
+    for vert, weights in enumerate(skinSource.GetWeights().tolist()):
+        maxWeightIndex = 0
+        for i in range(1, len(weights)):
+            if weights[i] > weights[maxWeightIndex]:
+                maxWeightIndex = i
+        vertMap[influences[maxWeightIndex]].append(vert)
+    return vertMap
+
+def test_bulk_vert_map_matches_the_per_vertex_queries():
+    skin = FakeSkin.Random(500, 12, seed=4)
+    skin.weights[:20] = 0.0
+    skin.weights[:20, [3, 7]] = 0.5 # ties go to the first influence either way
+    bulk = GetInfluenceVertMap(skin)
+    perVertex = GetVertMapPerVertex(skin)
+    assert list(bulk) == list(perVertex)
+    for influence, verts in perVertex.items():
+        assert bulk[influence].tolist() == verts
+
+def test_maya_skin_reads_every_weight_in_one_call():
+    fakeSkin = FakeSkin.Random(50, 6, seed=5)
+    calls = []
+    def getWeights(meshPath, component):
+        calls.append(component)
+        return fakeSkin.weights.ravel().tolist(), fakeSkin.weights.shape[1]
+
+    # the api objects swapped for the fake skin's flat weight list, everything after the one getWeights call is numpy
+    mayaSkin = MayaSkin.__new__(MayaSkin)
+    mayaSkin.skinFn = types.SimpleNamespace(getWeights=getWeights)
+    mayaSkin.meshPath = None
+    mayaSkin.GetAllVertsComponent = lambda: "allVerts"
+    np.testing.assert_array_equal(mayaSkin.GetWeights(), fakeSkin.weights)
+    assert calls == ["allVerts"]
+
+def test_prune_keeps_the_largest_influences_and_normalizes():
+    weights = np.array([[0.4, 0.3, 0.2, 0.1], [0.1, 0.1, 0.1, 0.7]])
+    pruned = PruneWeights(weights, 2)
+    np.testing.assert_allclose(pruned[0], [0.4 / 0.7, 0.3 / 0.7, 0.0, 0.0])
+    # the second row ties on its smaller weights, whichever one is kept the largest stays and the row sums to 1
+    assert (pruned > 0).sum(axis=1).tolist() == [2, 2]
+    np.testing.assert_allclose(pruned[1, 3], 0.7 / 0.8)
+    np.testing.assert_allclose(pruned.sum(axis=1), 1.0)
+
+def test_prune_drops_weights_under_the_minimum():
+    pruned = PruneWeights(np.array([[0.95, 0.04, 0.01]]), 4, minWeight=0.05)
+    np.testing.assert_allclose(pruned, [[1.0, 0.0, 0.0]])
+
+def test_prune_keeps_the_dominant_influence_of_a_vertex_under_the_minimum():
+    pruned = PruneWeights(np.array([[0.02, 0.03, 0.01]]), 4, minWeight=0.5)
+    np.testing.assert_allclose(pruned, [[0.0, 1.0, 0.0]])
+
+def test_quantize_rounds_to_steps_and_rows_sum_to_one():
+    rng = np.random.default_rng(7)
+    weights = rng.random((200, 5))
+    weights /= weights.sum(axis=1, keepdims=True)
+    quantized = QuantizeWeights(weights, bits=8)
+
+    steps = quantized * 255
+    np.testing.assert_allclose(steps, np.rint(steps), atol=1e-9)
+    np.testing.assert_allclose(quantized.sum(axis=1), 1.0)
+    assert np.abs(quantized - weights).max() < 1.0 / 255
+
+def test_quantize_leaves_empty_rows_empty():
+    quantized = QuantizeWeights(np.array([[0.0, 0.0], [0.5, 0.5]]))
+    np.testing.assert_allclose(quantized[0], [0.0, 0.0])
+    np.testing.assert_allclose(quantized[1].sum(), 1.0)